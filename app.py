@@ -1,54 +1,83 @@
-from flask import Flask, render_template, request, jsonify
-import glob
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import json
-import os
 
-app = Flask(__name__)
-DATA_FOLDER = "parsed_results"  # Folder with JSON trade files
+from trade_index import TradeIndex, DATA_FOLDER, MAX_LENGTH  # DATA_FOLDER: folder with JSON trade files
+from trade_stats import TradeStats, DIMENSIONS
 
-def load_all_trades():
-    files = glob.glob(os.path.join(DATA_FOLDER, "*.json"))
-    all_trades = []
-    for file in files:
-        with open(file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            all_trades.extend(data)
-    return all_trades
+app = Flask(__name__)
+STATS = TradeStats()
+TRADES = TradeIndex(DATA_FOLDER, listeners=[STATS])
 
 @app.route("/")
 def index():
     return render_template("index.html")
 
-@app.route("/api/trades")
-def api_trades():
-    all_trades = load_all_trades()
-
-    trader = request.args.get("trader")
-    symbol = request.args.get("symbol")
-    direction = request.args.get("direction")
-    missing_sl = request.args.get("missing_sl")
+def _filters():
+    return dict(
+        trader=request.args.get("trader"),
+        symbol=request.args.get("symbol"),
+        side=request.args.get("direction"),
+        missing_sl=request.args.get("missing_sl") == "true",
+        search=request.args.get("search[value]") or request.args.get("search"),
+    )
 
-    filtered = all_trades
-    if trader:
-        filtered = [t for t in filtered if t.get("trader","").lower() == trader.lower()]
-    if symbol:
-        filtered = [t for t in filtered if t.get("symbol","").lower() == symbol.lower()]
-    if direction:
-        filtered = [t for t in filtered if t.get("side","").lower() == direction.lower()]
-    if missing_sl == "true":
-        filtered = [t for t in filtered if not t.get("sl")]
+def _order():
+    """DataTables order[i][column] / columns[i][data] pairs, or plain sort/dir."""
+    order, i = [], 0
+    while f"order[{i}][column]" in request.args:
+        col = request.args.get(f"order[{i}][column]", type=int)
+        order.append((request.args.get(f"columns[{col}][data]"), request.args.get(f"order[{i}][dir]", "asc")))
+        i += 1
+    if not order and request.args.get("sort"):
+        order.append((request.args.get("sort"), request.args.get("dir", "asc")))
+    return order
 
-    # Pagination parameters
-    start = int(request.args.get("start", 0))
-    length = int(request.args.get("length", 50))
+@app.route("/api/trades")
+def api_trades():
+    # DataTables server-side protocol: draw / start / length / search / order
+    start = request.args.get("start", 0, type=int)
+    length = request.args.get("length", 50, type=int)
+    if length < 0:                  # "show all" – capped at MAX_LENGTH; use the export for more
+        length = MAX_LENGTH
 
-    data_page = filtered[start:start+length]
+    total, matched, data_page = TRADES.query(start=start, length=length, order=_order(), **_filters())
 
     return jsonify({
-        "recordsTotal": len(filtered),
-        "recordsFiltered": len(filtered),
+        "draw": request.args.get("draw", 0, type=int),
+        "recordsTotal": total,
+        "recordsFiltered": matched,
         "data": data_page
     })
 
+@app.route("/api/trades/export")
+def api_trades_export():
+    """Every matching trade as NDJSON, streamed in batches."""
+    filters = _filters()
+
+    def rows():
+        for t in TRADES.iter_query(**filters):
+            yield json.dumps(t, default=str) + "\n"
+
+    return Response(stream_with_context(rows()), mimetype="application/x-ndjson",
+                    headers={"Content-Disposition": "attachment; filename=trades.ndjson"})
+
+@app.route("/api/stats/<dim>")
+def api_stats(dim):
+    """Rollups for every trader / symbol / day / cell (trader|symbol|day)."""
+    if dim not in DIMENSIONS:
+        return jsonify({"error": f"unknown dimension, use one of {', '.join(DIMENSIONS)}"}), 404
+    TRADES.refresh()
+    return jsonify(STATS.table(dim))
+
+@app.route("/api/stats/<dim>/<path:key>")
+def api_stats_one(dim, key):
+    if dim not in DIMENSIONS:
+        return jsonify({"error": f"unknown dimension, use one of {', '.join(DIMENSIONS)}"}), 404
+    TRADES.refresh()
+    row = STATS.get(dim, key)
+    if row is None:
+        return jsonify({"error": f"no trades for {dim} {key}"}), 404
+    return jsonify(row)
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,177 @@
+"""
+backtest.py  –  vectorised replay of parsed signals against OHLCV candles
+-----------------------------------------------------------------------
+• loads every *_parsed.csv into one DataFrame (trader = file name stem), or
+  the parser's typed .parquet / .arrow / .ndjson output (trade_format)
+• per symbol, all trades are replayed at once on NumPy arrays: the entry
+  candle comes from a binary search, TP / SL / limit touches from one
+  window matrix, no per-trade Python loop
+• sizing follows risk_limits (shared with risk_manager): TRADER_RISK margin
+  of a fixed balance and the staged_entry_qty split (20 % / 100 % / 50 + 50 % limit at entry)
+• fills at the open of the first candle after the signal; SL is assumed to
+  hit first when a candle touches both levels (at the open if it gaps
+  through the stop); trades that hit neither
+  within the horizon are closed at the last close ("OPEN")
+usage:
+    python backtest.py *_parsed.csv --candles candles
+    python backtest.py Jotham_parsed.csv --horizon 2000 -o jotham_bt.csv
+candles come from candle_store (python candle_store.py ingest dumps/*.csv)
+"""
+from __future__ import annotations
+import argparse
+import pathlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from candle_store import CandleStore, STORE_DIR
+import trade_format
+from risk_limits import (TRADER_RISK, TEST_BALANCE_USDT, STAGE_FAR_PCT, STAGE_FAR_FRACTION,
+                         STAGE_NEAR_PCT, STAGE_NEAR_FRACTION)
+
+HORIZON = 1000          # candles a trade may stay open
+WINDOW_CELLS = 4_000_000  # trades × horizon per chunk, bounds memory
+
+
+# ── inputs ───────────────────────────────────────────────────
+def _read(p: pathlib.Path) -> pd.DataFrame|None:
+    """symbol, side, entry, tp1, sl, ts and trader of one parser output file."""
+    trader = p.stem.removesuffix("_parsed").lower()
+    if trade_format.format_for(p) != "csv":     # typed columns: nothing to split or parse
+        df = trade_format.read_frame(p, ["symbol", "side", "entry", "tp", "sl", "ts", "trader"])
+        return df.assign(tp=df["tp"].str[0], trader=df["trader"].fillna(trader).str.lower())
+    df = pd.read_csv(p, dtype=str)
+    if "ts" not in df:
+        print(f"[backtest] {p.name}: no ts column – re-run the parser to get signal times")
+        return None
+    return df.assign(tp=pd.to_numeric(df["tp"].str.split("|").str[0], errors="coerce"),
+                     ts=pd.to_datetime(df["ts"], utc=True, errors="coerce", format="ISO8601"),
+                     trader=trader)
+
+def load_trades(paths) -> pd.DataFrame:
+    """All parsed trades as columns: trader, symbol, dir, entry, tp, sl, ts (epoch ms)."""
+    frames = []
+    for p in map(pathlib.Path, paths):
+        df = _read(p)
+        if df is None:
+            continue
+        frames.append(pd.DataFrame({
+            "trader": df["trader"],
+            "symbol": df["symbol"].str.upper(),
+            "dir": np.where(df["side"].str.upper() == "LONG", 1, -1),
+            "entry": pd.to_numeric(df["entry"], errors="coerce"),
+            "tp": df["tp"],
+            "sl": pd.to_numeric(df["sl"], errors="coerce"),
+            "ts": df["ts"],
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["trader", "symbol", "dir", "entry", "tp", "sl", "ts"])
+    trades = pd.concat(frames, ignore_index=True).dropna()
+    trades["ts"] = trades["ts"].astype("datetime64[ns, UTC]").astype("int64") // 1_000_000
+    return trades.reset_index(drop=True)
+
+
+# ── engine ───────────────────────────────────────────────────
+def _first(mask: np.ndarray, none: int) -> np.ndarray:
+    """Index of the first True per row, `none` where a row has none."""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), none)
+
+def _replay(c, tr: pd.DataFrame, horizon: int) -> dict[str, np.ndarray]:
+    n = len(c["ts"])
+    start = np.searchsorted(c["ts"], tr["ts"].to_numpy(), side="right")
+    steps = np.arange(horizon)
+    pos = start[:, None] + steps
+    inside = pos < n
+    idx = np.minimum(pos, n - 1)
+    lo, hi = c["low"][idx], c["high"][idx]
+
+    d = tr["dir"].to_numpy()[:, None]
+    sl, tp, entry = (tr[k].to_numpy()[:, None] for k in ("sl", "tp", "entry"))
+    long_ = d > 0
+    i_sl = _first(np.where(long_, lo <= sl, hi >= sl) & inside, horizon)
+    i_tp = _first(np.where(long_, hi >= tp, lo <= tp) & inside, horizon)
+    i_touch = _first(np.where(long_, lo <= entry, hi >= entry) & inside, horizon)
+
+    last = np.minimum(horizon, n - start) - 1                      # last candle in the window
+    hit_sl = (i_sl <= i_tp) & (i_sl < horizon)
+    hit_tp = ~hit_sl & (i_tp < horizon)
+    exit_i = np.where(hit_sl, i_sl, np.where(hit_tp, i_tp, last))
+    at_exit = np.minimum(start + np.maximum(exit_i, 0), n - 1)
+    # a candle that opens through the stop fills at its open
+    sl_px = np.where(long_[:, 0], np.minimum(sl[:, 0], c["open"][at_exit]),
+                     np.maximum(sl[:, 0], c["open"][at_exit]))
+    exit_px = np.where(hit_sl, sl_px, np.where(hit_tp, tp[:, 0], c["close"][at_exit]))
+    return {"start": start, "price_now": c["open"][np.minimum(start, n - 1)],
+            "exit_px": exit_px, "limit_filled": i_touch <= exit_i,
+            "outcome": np.where(hit_sl, "SL", np.where(hit_tp, "TP", "OPEN")),
+            "exit_ts": c["ts"][at_exit],
+            "has_data": start < n}
+
+def run_backtest(trades: pd.DataFrame, store: CandleStore|str = STORE_DIR, horizon: int = HORIZON,
+                 balance: float = TEST_BALANCE_USDT) -> pd.DataFrame:
+    """One result row per trade that has candles after its signal time."""
+    if not isinstance(store, CandleStore):
+        store = CandleStore(store)
+    out = []
+    chunk = max(1, WINDOW_CELLS // horizon)
+    for symbol, tr in trades.groupby("symbol", sort=False):
+        c = store.get(symbol)
+        if c is None or not len(c):
+            continue
+        for i in range(0, len(tr), chunk):
+            part = tr.iloc[i:i + chunk]
+            r = _replay(c, part, horizon)
+            res = part.assign(**{k: v for k, v in r.items() if k != "start"})
+            out.append(res[res["has_data"]].drop(columns="has_data"))
+    if not out:
+        return pd.DataFrame()
+    res = pd.concat(out, ignore_index=True)
+
+    # staged_entry_qty, vectorised
+    margin = res["trader"].map(TRADER_RISK).fillna(TRADER_RISK["default"])
+    full_qty = balance * margin / res["entry"]
+    diff_pct = (res["price_now"] - res["entry"]).abs() / res["entry"] * 100
+    far, near = diff_pct >= STAGE_FAR_PCT, diff_pct < STAGE_NEAR_PCT
+    res["qty_now"] = np.round(full_qty * np.where(far, STAGE_FAR_FRACTION,
+                                                  np.where(near, STAGE_NEAR_FRACTION, 1.0)), 4)
+    res["qty_limit"] = np.where(near, np.round(full_qty * STAGE_NEAR_FRACTION, 4), 0.0)
+
+    filled_limit = res["qty_limit"] * res["limit_filled"]
+    res["pnl"] = res["dir"] * ((res["exit_px"] - res["price_now"]) * res["qty_now"]
+                               + (res["exit_px"] - res["entry"]) * filled_limit)
+    return res.drop(columns="limit_filled")
+
+def summarize(res: pd.DataFrame) -> pd.DataFrame:
+    if res.empty:
+        return pd.DataFrame()
+    g = res.groupby("trader")
+    return pd.DataFrame({
+        "trades": g.size(),
+        "tp": g["outcome"].apply(lambda s: (s == "TP").sum()),
+        "sl": g["outcome"].apply(lambda s: (s == "SL").sum()),
+        "open": g["outcome"].apply(lambda s: (s == "OPEN").sum()),
+        "win_rate": g["pnl"].apply(lambda s: (s > 0).mean()),
+        "pnl": g["pnl"].sum(),
+    })
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("csv", nargs="+", help="*_parsed.csv (or .parquet / .arrow / .ndjson) files")
+    ap.add_argument("--candles", default=str(STORE_DIR), help="candle_store directory")
+    ap.add_argument("--horizon", type=int, default=HORIZON, help="max candles per trade")
+    ap.add_argument("--balance", type=float, default=TEST_BALANCE_USDT)
+    ap.add_argument("-o", "--out", help="per-trade results CSV")
+    a = ap.parse_args()
+
+    t0 = time.perf_counter()
+    trades = load_trades(a.csv)
+    res = run_backtest(trades, a.candles, a.horizon, a.balance)
+    elapsed = time.perf_counter() - t0
+    if res.empty:
+        print(f"[backtest] no trades with candle data ({len(trades)} loaded)")
+    else:
+        print(summarize(res).to_string(float_format=lambda x: f"{x:.2f}"))
+        print(f"[backtest] {len(res)}/{len(trades)} trades replayed in {elapsed:.2f}s")
+        if a.out:
+            res.to_csv(a.out, index=False)
@@ -1,48 +1,142 @@
-import subprocess
+"""
+batch_parse.py  –  parse many trader exports in one process pool
+----------------------------------------------------------------
+• the parser (developerparserv2) is imported once per worker, not once per file
+• every JSON member of every zip is its own job, so one big archive is spread
+  over all cores instead of pinning one
+• members are stitched back in archive order; updates at the top of a member
+  attach to the last trade of the member before it, as in a serial run
+• per-trader trade/skip counts and errors come back as plain dicts and are
+  written to batch_summary.json next to the CSVs
+usage:
+    python batch_parse.py                              # archive_exports/*.zip → parsed_outputs/
+    python batch_parse.py Jotham.zip Tyler.zip -o .    # selected archives
+    python batch_parse.py archive_exports/unkn0wn -o parsed_outputs/unkn0wn -j 4
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
 import pathlib
-import csv
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import developerparserv2 as parser
+from discord_export import iter_export_messages
+from parser_registry import channel_from_path
 
 ARCHIVE_DIR = pathlib.Path("archive_exports")
 OUTPUT_DIR = pathlib.Path("parsed_outputs")
-OUTPUT_DIR.mkdir(exist_ok=True)
-
-def run_parser(zip_path: pathlib.Path):
-    out_csv = OUTPUT_DIR / f"{zip_path.stem}_parsed.csv"
-    cmd = [
-        "python",
-        "developerv1.py",
-        str(zip_path),
-        "-o",
-        str(out_csv),
-        "-v",
-    ]
-    print(f"Parsing {zip_path.name} -> {out_csv.name}")
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    if proc.returncode != 0:
-        print(f"Error parsing {zip_path.name}:")
-        print(proc.stderr)
-        return None
-    return out_csv
-
-def count_trades(csv_path: pathlib.Path):
-    with csv_path.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        return sum(1 for _ in reader)
+SUMMARY_NAME = "batch_summary.json"
 
-def main():
-    results = []
-    for zip_file in ARCHIVE_DIR.glob("*.zip"):
-        csv_file = run_parser(zip_file)
-        if csv_file and csv_file.exists():
-            count = count_trades(csv_file)
-            print(f"Parsed {count} trades from {zip_file.name}")
-            results.append((zip_file.name, count))
+
+def find_archives(paths) -> list[pathlib.Path]:
+    """Expand directories to the *.zip / *.json exports inside them."""
+    found = []
+    for p in map(pathlib.Path, paths):
+        if p.is_dir():
+            found += sorted(f for f in p.iterdir() if f.suffix in (".zip", ".json"))
         else:
-            results.append((zip_file.name, 0))
+            found.append(p)
+    return found
+
+def _members(path: pathlib.Path) -> list[str|None]:
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as z:
+            return [n for n in z.namelist() if n.endswith(".json")]
+    return [None]
+
+def _parse_member(path: str, member: str|None) -> tuple[list[dict], int, list[str]]:
+    """Worker: (trades, skipped, leading updates) for one export file."""
+    carry = {"updates": []}     # stands in for the previous member's last trade
+    channel = channel_from_path(path)       # export_<id>.json: routed like a serial run
+    if member is None:
+        with open(path, "rb") as fh:
+            trades, skipped = parser.extract_trades(iter_export_messages(fh), last_trade=carry, channel=channel)
+    else:
+        with zipfile.ZipFile(path) as z, z.open(member) as fh:
+            trades, skipped = parser.extract_trades(iter_export_messages(fh), last_trade=carry, channel=channel)
+    return trades, skipped, carry["updates"]
+
+def run_batch(archives, out_dir: pathlib.Path = OUTPUT_DIR, workers: int|None = None) -> list[dict]:
+    """Parse every archive and write <stem>_parsed.csv into out_dir.
+
+    Returns one summary dict per archive:
+    {"trader", "archive", "members", "trades", "skipped", "csv", "errors"}.
+    """
+    archives = [pathlib.Path(a) for a in archives]
+    out_dir = pathlib.Path(out_dir)
+    results, jobs = [], []
+    for a in archives:
+        res = {"trader": a.stem, "archive": str(a), "members": 0,
+               "trades": 0, "skipped": 0, "csv": None, "errors": []}
+        results.append(res)
+        try:
+            members = _members(a)
+        except (OSError, zipfile.BadZipFile) as e:
+            res["errors"].append(f"{type(e).__name__}: {e}")
+            continue
+        res["members"] = len(members)
+        jobs += [(res, m) for m in members]
+
+    if not jobs:
+        return results
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(res, m, pool.submit(_parse_member, res["archive"], m)) for res, m in jobs]
+
+        trades_by_archive = {id(r): [] for r in results}
+        for res, member, fut in futures:      # submission order = archive/member order
+            try:
+                trades, skipped, leading = fut.result()
+            except Exception as e:
+                res["errors"].append(f"{member or res['archive']}: {type(e).__name__}: {e}")
+                continue
+            acc = trades_by_archive[id(res)]
+            if leading and acc:
+                acc[-1].setdefault("updates", []).extend(leading)
+            acc += trades
+            res["skipped"] += skipped
+
+    for res in results:
+        trades = trades_by_archive[id(res)]
+        res["trades"] = len(trades)
+        if trades:
+            out = out_dir / f"{res['trader']}_parsed.csv"
+            parser.write_csv(trades, out)
+            res["csv"] = str(out)
+    return results
+
+def main():
+    ap = argparse.ArgumentParser(description="Parse trader exports in parallel.")
+    ap.add_argument("paths", nargs="*", default=[str(ARCHIVE_DIR)],
+                    help="zip/json exports or folders of them (default: archive_exports)")
+    ap.add_argument("-o", "--out-dir", default=str(OUTPUT_DIR))
+    ap.add_argument("-j", "--workers", type=int, help="processes (default: CPU count)")
+    a = ap.parse_args()
+
+    archives = find_archives(a.paths)
+    if not archives:
+        print("No exports found.")
+        return 1
+    out_dir = pathlib.Path(a.out_dir)
+    t0 = time.perf_counter()
+    results = run_batch(archives, out_dir, a.workers)
+    elapsed = time.perf_counter() - t0
 
     print("\nSummary:")
-    for trader, count in results:
-        print(f"{trader}: {count} trades parsed")
+    for r in results:
+        status = "ERROR" if r["errors"] else "OK"
+        print(f"[{status}] {r['trader']}: {r['trades']} trades, {r['skipped']} skipped"
+              + (f" → {pathlib.Path(r['csv']).name}" if r["csv"] else ""))
+        for err in r["errors"]:
+            print(f"    {err}")
+    print(f"{len(results)} archives in {elapsed:.1f}s")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / SUMMARY_NAME).write_text(json.dumps(results, indent=2))
+    return 1 if any(r["errors"] for r in results) else 0
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -1,19 +1,13 @@
-import subprocess
 import pathlib
 
+from batch_parse import find_archives, run_batch
+
 EXPORTS_DIR = pathlib.Path("./archive_exports")  # Your exports folder
-PARSER_SCRIPT = pathlib.Path("parserv1_1.py")   # Your parser script filename
 
 def main():
-    for file_path in EXPORTS_DIR.glob("*.zip"):
-        output_csv = EXPORTS_DIR / (file_path.stem + "_parsed.csv")
-        print(f"Parsing {file_path.name} -> {output_csv.name} ...")
-        subprocess.run([
-            "python", str(PARSER_SCRIPT),
-            str(file_path),
-            "-o", str(output_csv)
-        ])
+    # CSVs land next to the zips, as before
+    for r in run_batch(find_archives([EXPORTS_DIR]), EXPORTS_DIR):
+        print(f"{r['trader']}: {r['trades']} trades" + "".join(f"\n    {e}" for e in r["errors"]))
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,203 @@
+"""
+blofin_async.py  –  asyncio BloFin client
+-----------------------------------------
+• same surface as blofin_live (place_order / cancel_order / get_equity /
+  move_sl and the tp/sl calls), as coroutines, plus place_orders() to fan
+  out a batch
+• independent orders go out concurrently, at most MAX_CONCURRENCY in flight
+• shares blofin_live's config, signing, retry policy and latency_stats()
+usage:
+    results = asyncio.run(place_orders([{"symbol": "BTC-USDT", "side": "buy", "qty": 0.01}, ...]))
+    python blofin_async.py --bench 50        # sync vs async against blofin_mock_server
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlencode
+
+import aiohttp
+
+import blofin_live as live
+
+MAX_CONCURRENCY = int(os.getenv("BLOFIN_MAX_CONCURRENCY", "8"))
+
+_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+def _get_session() -> aiohttp.ClientSession:
+    # a ClientSession belongs to the loop it was made on
+    loop = asyncio.get_running_loop()
+    s = _sessions.get(loop)
+    if s is None or s.closed:
+        s = _sessions[loop] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=live.POOL_SIZE),
+            timeout=aiohttp.ClientTimeout(connect=live.CONNECT_TIMEOUT, sock_read=live.READ_TIMEOUT),
+            headers={"Content-Type": "application/json"},
+        )
+    return s
+
+async def close_session():
+    """Close this loop's session (call before the loop ends)."""
+    s = _sessions.pop(asyncio.get_running_loop(), None)
+    if s is not None:
+        await s.close()
+
+async def _make_request(method: str, endpoint: str, params: Dict = None, data: Any = None,
+                        metric: str = None, idempotent: Optional[bool] = None) -> Optional[Dict]:
+    """Async twin of blofin_live._make_request, with the same retry rules."""
+    safe = method in live.IDEMPOTENT if idempotent is None else idempotent
+    url = f"{live.BASE_URL}{endpoint}"
+    body = json.dumps(data) if data else ""
+    metric = metric or f"{method} {endpoint}"
+    session = _get_session()
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        last = None
+        try:
+            async with session.request(method, url, headers=live._auth_headers(method, endpoint, body),
+                                       params=params, data=body.encode() or None) as response:
+                last, status = response, response.status
+                retryable = status == 429 or (status in live.RETRY_STATUS and safe)
+                if not retryable or attempt >= live.MAX_RETRIES:
+                    response.raise_for_status()
+                    result = await response.json(content_type=None)
+                    live._record(metric, time.perf_counter() - start, True, attempt)
+                    return result
+        except aiohttp.ClientConnectorError as e:
+            # could not connect, so nothing was sent – safe to retry any method
+            if attempt >= live.MAX_RETRIES:
+                live._record(metric, time.perf_counter() - start, False, attempt)
+                print(f"API Error: {str(e)}")
+                return None
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if not safe or attempt >= live.MAX_RETRIES:
+                live._record(metric, time.perf_counter() - start, False, attempt)
+                print(f"API Error: {str(e)}")
+                return None
+        except Exception as e:
+            live._record(metric, time.perf_counter() - start, False, attempt)
+            print(f"API Error: {str(e)}")
+            return None
+        await asyncio.sleep(live._retry_delay(attempt, last))
+        attempt += 1
+
+async def get_equity() -> Optional[float]:
+    """Get account equity in USDT"""
+    response = await _make_request("GET", "/api/v1/account/balance")
+    if response and "data" in response:
+        for balance in response["data"]:
+            if balance["currency"] == "USDT":
+                return float(balance["equity"])
+    return None
+
+async def place_order(symbol: str, side: str, qty: float, price: Optional[float] = None,
+                      client_order_id: Optional[str] = None, reduce_only: bool = False) -> Optional[Dict[str, Any]]:
+    """Place a market or limit order (client_order_id: see order_intents)"""
+    data = {
+        "symbol": symbol,
+        "side": side.upper(),
+        "type": "LIMIT" if price else "MARKET",
+        "size": str(qty)
+    }
+    if price:
+        data["price"] = str(price)
+    if client_order_id:
+        data["clientOrderId"] = client_order_id
+    if reduce_only:
+        data["reduceOnly"] = "true"
+    return await _make_request("POST", "/api/v1/trade/order", data=data)
+
+async def cancel_order(order_id: str) -> Optional[Dict[str, Any]]:
+    """Cancel an existing order"""
+    return await _make_request("DELETE", f"/api/v1/trade/order/{order_id}", metric="DELETE /api/v1/trade/order/:id")
+
+async def place_tpsl(symbol: str, side: str, qty: float, tp: Optional[float] = None, sl: Optional[float] = None,
+                     client_order_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Attach a take-profit / stop-loss order (side closes the position)"""
+    return await _make_request("POST", live.TPSL_ENDPOINT,
+                               data=live._tpsl_data(symbol, side, qty, tp, sl, client_order_id))
+
+async def amend_tpsl(tpsl_id: str, sl: Optional[float] = None, tp: Optional[float] = None,
+                     qty: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Change the trigger prices / size of an attached tp/sl order in place"""
+    return await _make_request("POST", live.AMEND_TPSL_ENDPOINT, data=live._amend_data(tpsl_id, sl, tp, qty),
+                               idempotent=True)
+
+async def amend_tpsl_batch(amends: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Several amend_tpsl() calls in one request; each dict holds tpsl_id and sl/tp/qty"""
+    return await _make_request("POST", live.BATCH_AMEND_TPSL_ENDPOINT,
+                               data=[live._amend_data(**a) for a in amends], idempotent=True)
+
+async def cancel_tpsl(tpsl_ids: List[str]) -> Optional[Dict[str, Any]]:
+    """Cancel attached tp/sl orders, all in one request"""
+    return await _make_request("POST", live.CANCEL_TPSL_ENDPOINT,
+                               data=[{"tpslId": str(i)} for i in tpsl_ids], idempotent=True)
+
+async def pending_tpsl(symbol: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Attached tp/sl orders still open at the exchange, of one symbol or all"""
+    query = f"?{urlencode({'symbol': symbol})}" if symbol else ""
+    return await _make_request("GET", live.PENDING_TPSL_ENDPOINT + query, metric=f"GET {live.PENDING_TPSL_ENDPOINT}")
+
+async def move_sl(order_id: str, new_sl: float) -> Optional[Dict[str, Any]]:
+    """Move an attached stop (tp/sl order id) as blofin_live does, never cancel-first;
+    stop_manager is synchronous, so it runs in a worker thread"""
+    return await asyncio.to_thread(live.move_sl, order_id, new_sl)
+
+async def place_orders(orders: Iterable[Dict[str, Any]],
+                       concurrency: int = MAX_CONCURRENCY) -> List[Optional[Dict[str, Any]]]:
+    """Place independent orders concurrently; results come back in input order.
+
+    Each order is a dict of place_order() keyword arguments. At most
+    `concurrency` requests are in flight; a failed order yields None
+    without holding up the others.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(o):
+        async with sem:
+            return await place_order(**o)
+
+    return list(await asyncio.gather(*(one(o) for o in orders)))
+
+
+# ── benchmark ────────────────────────────────────────────────
+def _bench(n: int, latency: float, concurrency: int):
+    from blofin_mock_server import MockBlofinServer
+
+    srv = MockBlofinServer(latency=latency).start()
+    live.BASE_URL = srv.url
+    orders = [{"symbol": "BTC-USDT", "side": "buy", "qty": 0.001 * (i + 1)} for i in range(n)]
+
+    t = time.perf_counter()
+    for o in orders:
+        live.place_order(**o)
+    sync_s = time.perf_counter() - t
+
+    async def run():
+        try:
+            await get_equity()                  # open the first connection outside the timing
+            t = time.perf_counter()
+            res = await place_orders(orders, concurrency)
+            return time.perf_counter() - t, res
+        finally:
+            await close_session()
+
+    async_s, res = asyncio.run(run())
+    srv.shutdown()
+    ok = sum(r is not None for r in res)
+    print(f"{n} orders, {latency*1000:.0f} ms server latency")
+    print(f"  blofin_live  (sequential)      {sync_s:7.3f} s  {n/sync_s:8.1f} orders/s")
+    print(f"  blofin_async (concurrency {concurrency:>2})  {async_s:7.3f} s  {n/async_s:8.1f} orders/s  ({ok}/{n} ok)")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bench", type=int, metavar="N", default=50, help="orders per run")
+    ap.add_argument("--latency", type=float, default=0.05, help="mock server latency in seconds")
+    ap.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+    a = ap.parse_args()
+    _bench(a.bench, a.latency, a.concurrency)
@@ -6,4 +6,4 @@ MODE = os.getenv("MODE", "demo").lower()
 if MODE == "live":
     from blofin_live import get_equity as get_equity_usdt
 else:
-    from core.blofin_mock import get_equity_usdt
\ No newline at end of file
+    from blofin_mock import get_equity_usdt
\ No newline at end of file
@@ -3,43 +3,160 @@ import hmac
 import time
 import json
 import base64
+import sys
+import threading
 import requests
-from typing import Optional, Dict, Any
+from collections import deque
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List
 from urllib.parse import urlencode
 
 # API Configuration
-BASE_URL = "https://api.blofin.com"
+BASE_URL = os.getenv("BLOFIN_BASE_URL", "https://api.blofin.com")
 API_KEY = os.getenv("BLOFIN_API_KEY", "")
 API_SECRET = os.getenv("BLOFIN_API_SECRET", "").encode()
 PASSPHRASE = os.getenv("BLOFIN_PASSPHRASE", "")
 
+# HTTP client: one pooled keep-alive session, so only the first request pays TCP+TLS
+CONNECT_TIMEOUT = float(os.getenv("BLOFIN_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("BLOFIN_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("BLOFIN_MAX_RETRIES", "3"))
+BACKOFF = 0.25          # seconds, doubled per attempt
+MAX_BACKOFF = 4.0
+POOL_SIZE = 16          # concurrent connections kept open to the API host
+RETRY_STATUS = {429, 500, 502, 503, 504}
+IDEMPOTENT = {"GET", "DELETE"}   # a 5xx/dropped POST may have been executed; only 429 retries it
+LATENCY_WINDOW = 512    # recent samples kept per endpoint
+
+# TP/SL orders attached to a position (see stop_manager)
+TPSL_ENDPOINT = "/api/v1/trade/order-tpsl"
+CANCEL_TPSL_ENDPOINT = "/api/v1/trade/cancel-tpsl"
+PENDING_TPSL_ENDPOINT = "/api/v1/trade/orders-tpsl-pending"
+# amend endpoints: not in BloFin's public docs, so stop_manager only uses them once they are
+# confirmed against the account (BLOFIN_AMEND_TPSL=1); otherwise it places the new stop, then cancels the old
+AMEND_TPSL_ENDPOINT = os.getenv("BLOFIN_AMEND_TPSL_ENDPOINT", "/api/v1/trade/amend-tpsl")
+BATCH_AMEND_TPSL_ENDPOINT = os.getenv("BLOFIN_BATCH_AMEND_TPSL_ENDPOINT", "/api/v1/trade/batch-amend-tpsl")
+AMEND_TPSL = os.getenv("BLOFIN_AMEND_TPSL", "").lower() in ("1", "true", "yes")
+MARKET_PRICE = "-1"     # tp/sl order price meaning "close at market once triggered"
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_metrics: Dict[str, Dict[str, Any]] = {}
+_metrics_lock = threading.Lock()
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=0)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                s.headers["Content-Type"] = "application/json"
+                _session = s
+    return _session
+
+def close_session():
+    """Drop pooled connections (e.g. on shutdown or after changing BASE_URL)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def _record(name: str, seconds: float, ok: bool, retries: int):
+    with _metrics_lock:
+        m = _metrics.get(name)
+        if m is None:
+            m = _metrics[name] = {"count": 0, "errors": 0, "retries": 0, "total": 0.0,
+                                  "max": 0.0, "recent": deque(maxlen=LATENCY_WINDOW)}
+        m["count"] += 1
+        m["errors"] += not ok
+        m["retries"] += retries
+        m["total"] += seconds
+        m["max"] = max(m["max"], seconds)
+        m["recent"].append(seconds)
+
+def latency_stats() -> Dict[str, Dict[str, float]]:
+    """Per-endpoint call counts and latency (ms) since start-up."""
+    out = {}
+    with _metrics_lock:
+        for name, m in _metrics.items():
+            recent = sorted(m["recent"])
+            pct = lambda q: recent[min(len(recent) - 1, int(q * len(recent)))] * 1000
+            out[name] = {"count": m["count"], "errors": m["errors"], "retries": m["retries"],
+                         "mean_ms": m["total"] / m["count"] * 1000, "max_ms": m["max"] * 1000,
+                         "p50_ms": pct(0.50), "p95_ms": pct(0.95)}
+    return out
+
+def _retry_delay(attempt: int, response=None) -> float:
+    if response is not None:
+        try:
+            return min(float(response.headers["Retry-After"]), MAX_BACKOFF)
+        except (KeyError, ValueError):
+            pass
+    return min(BACKOFF * 2 ** attempt, MAX_BACKOFF)
+
 def _get_signature(timestamp: str, method: str, request_path: str, body: str = "") -> str:
     """Generate BloFin API signature"""
     message = timestamp + method + request_path + body
     mac = hmac.new(API_SECRET, message.encode(), digestmod='sha256')
     return base64.b64encode(mac.digest()).decode()
 
-def _make_request(method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Optional[Dict]:
-    """Make authenticated API request with error handling"""
-    try:
-        url = f"{BASE_URL}{endpoint}"
-        timestamp = str(int(time.time() * 1000))
-        body = json.dumps(data) if data else ""
-        
-        headers = {
-            "BL-ACCESS-KEY": API_KEY,
-            "BL-ACCESS-SIGN": _get_signature(timestamp, method, endpoint, body),
-            "BL-ACCESS-TIMESTAMP": timestamp,
-            "BL-ACCESS-PASSPHRASE": PASSPHRASE,
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.request(method, url, headers=headers, params=params, json=data)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"API Error: {str(e)}")
-        return None
+def _auth_headers(method: str, endpoint: str, body: str) -> Dict[str, str]:
+    timestamp = str(int(time.time() * 1000))
+    return {
+        "BL-ACCESS-KEY": API_KEY,
+        "BL-ACCESS-SIGN": _get_signature(timestamp, method, endpoint, body),
+        "BL-ACCESS-TIMESTAMP": timestamp,
+        "BL-ACCESS-PASSPHRASE": PASSPHRASE,
+    }
+
+def _make_request(method: str, endpoint: str, params: Dict = None, data: Any = None,
+                  metric: str = None, idempotent: Optional[bool] = None) -> Optional[Dict]:
+    """Make authenticated API request with error handling
+
+    Uses the pooled session; 429 (and, for GET/DELETE, 5xx, connection
+    errors and timeouts) are retried with exponential backoff, re-signed each time.
+    metric names the endpoint in latency_stats() (default "METHOD path").
+    idempotent overrides the per-method rule, e.g. for a POST that sets
+    absolute values and may safely be sent twice.
+    """
+    safe = method in IDEMPOTENT if idempotent is None else idempotent
+    url = f"{BASE_URL}{endpoint}"
+    body = json.dumps(data) if data else ""
+    metric = metric or f"{method} {endpoint}"
+    session = _get_session()
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        response = None
+        try:
+            headers = _auth_headers(method, endpoint, body)
+            response = session.request(method, url, headers=headers, params=params,
+                                       data=body.encode() or None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+            retryable = response.status_code == 429 or (
+                response.status_code in RETRY_STATUS and safe)
+            if not retryable or attempt >= MAX_RETRIES:
+                response.raise_for_status()
+                result = response.json()
+                _record(metric, time.perf_counter() - start, True, attempt)
+                return result
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # a connect timeout means nothing was sent, so even POST may retry;
+            # a read timeout may have landed, so only idempotent calls repeat
+            unsafe = not safe and not isinstance(e, requests.exceptions.ConnectTimeout)
+            if unsafe or attempt >= MAX_RETRIES:
+                _record(metric, time.perf_counter() - start, False, attempt)
+                print(f"API Error: {str(e)}")
+                return None
+        except Exception as e:
+            _record(metric, time.perf_counter() - start, False, attempt)
+            print(f"API Error: {str(e)}")
+            return None
+        time.sleep(_retry_delay(attempt, response))
+        attempt += 1
 
 def get_equity() -> Optional[float]:
     """Get account equity in USDT"""
@@ -54,8 +171,9 @@ def get_equity() -> Optional[float]:
         print(f"Error getting equity: {str(e)}")
         return None
 
-def place_order(symbol: str, side: str, qty: float, price: Optional[float] = None) -> Optional[Dict[str, Any]]:
-    """Place a market or limit order"""
+def place_order(symbol: str, side: str, qty: float, price: Optional[float] = None,
+                client_order_id: Optional[str] = None, reduce_only: bool = False) -> Optional[Dict[str, Any]]:
+    """Place a market or limit order (client_order_id: see order_intents)"""
     try:
         data = {
             "symbol": symbol,
@@ -65,6 +183,10 @@ def place_order(symbol: str, side: str, qty: float, price: Optional[float] = Non
         }
         if price:
             data["price"] = str(price)
+        if client_order_id:
+            data["clientOrderId"] = client_order_id
+        if reduce_only:
+            data["reduceOnly"] = "true"
             
         return _make_request("POST", "/api/v1/trade/order", data=data)
     except Exception as e:
@@ -74,32 +196,88 @@ def place_order(symbol: str, side: str, qty: float, price: Optional[float] = Non
 def cancel_order(order_id: str) -> Optional[Dict[str, Any]]:
     """Cancel an existing order"""
     try:
-        return _make_request("DELETE", f"/api/v1/trade/order/{order_id}")
+        return _make_request("DELETE", f"/api/v1/trade/order/{order_id}", metric="DELETE /api/v1/trade/order/:id")
     except Exception as e:
         print(f"Error canceling order: {str(e)}")
         return None
 
+def _tpsl_data(symbol: str, side: str, qty: float, tp: Optional[float], sl: Optional[float],
+               client_order_id: Optional[str]) -> Dict[str, str]:
+    data = {"symbol": symbol, "side": side.upper(), "size": str(qty)}
+    if tp:
+        data["tpTriggerPrice"] = str(tp)
+        data["tpOrderPrice"] = MARKET_PRICE
+    if sl:
+        data["slTriggerPrice"] = str(sl)
+        data["slOrderPrice"] = MARKET_PRICE
+    if client_order_id:
+        data["clientOrderId"] = client_order_id
+    return data
+
+def _amend_data(tpsl_id: str, sl: Optional[float] = None, tp: Optional[float] = None,
+                qty: Optional[float] = None) -> Dict[str, str]:
+    data = {"tpslId": str(tpsl_id)}
+    if sl is not None:
+        data["newSlTriggerPrice"] = str(sl)
+    if tp is not None:
+        data["newTpTriggerPrice"] = str(tp)
+    if qty is not None:
+        data["newSize"] = str(qty)
+    return data
+
+def place_tpsl(symbol: str, side: str, qty: float, tp: Optional[float] = None, sl: Optional[float] = None,
+               client_order_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Attach a take-profit / stop-loss order (side closes the position)"""
+    try:
+        return _make_request("POST", TPSL_ENDPOINT, data=_tpsl_data(symbol, side, qty, tp, sl, client_order_id))
+    except Exception as e:
+        print(f"Error placing tp/sl: {str(e)}")
+        return None
+
+def amend_tpsl(tpsl_id: str, sl: Optional[float] = None, tp: Optional[float] = None,
+               qty: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Change the trigger prices / size of an attached tp/sl order in place"""
+    try:
+        # absolute values: sending the same amendment twice is harmless, so 5xx retries
+        return _make_request("POST", AMEND_TPSL_ENDPOINT, data=_amend_data(tpsl_id, sl, tp, qty), idempotent=True)
+    except Exception as e:
+        print(f"Error amending tp/sl: {str(e)}")
+        return None
+
+def amend_tpsl_batch(amends: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Several amend_tpsl() calls in one request; each dict holds tpsl_id and sl/tp/qty"""
+    try:
+        data = [_amend_data(**a) for a in amends]
+        return _make_request("POST", BATCH_AMEND_TPSL_ENDPOINT, data=data, idempotent=True)
+    except Exception as e:
+        print(f"Error amending tp/sl: {str(e)}")
+        return None
+
+def cancel_tpsl(tpsl_ids: List[str]) -> Optional[Dict[str, Any]]:
+    """Cancel attached tp/sl orders, all in one request"""
+    try:
+        data = [{"tpslId": str(i)} for i in tpsl_ids]
+        return _make_request("POST", CANCEL_TPSL_ENDPOINT, data=data, idempotent=True)
+    except Exception as e:
+        print(f"Error canceling tp/sl: {str(e)}")
+        return None
+
+def pending_tpsl(symbol: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Attached tp/sl orders still open at the exchange, of one symbol or all"""
+    try:
+        # the query is part of the signed path
+        query = f"?{urlencode({'symbol': symbol})}" if symbol else ""
+        return _make_request("GET", PENDING_TPSL_ENDPOINT + query, metric=f"GET {PENDING_TPSL_ENDPOINT}")
+    except Exception as e:
+        print(f"Error reading tp/sl orders: {str(e)}")
+        return None
+
 def move_sl(order_id: str, new_sl: float) -> Optional[Dict[str, Any]]:
-    """Move stop loss by canceling and recreating the order"""
+    """Move an attached stop (tp/sl order id) via stop_manager: amended in place where
+    AMEND_TPSL, else the new stop is placed before the old one is canceled"""
+    import stop_manager     # imported here: stop_manager drives this module, not the other way round
     try:
-        # First get the original order details
-        order_info = _make_request("GET", f"/api/v1/trade/order/{order_id}")
-        if not order_info or "data" not in order_info:
-            return None
-            
-        order = order_info["data"]
-        
-        # Cancel the original order
-        if not cancel_order(order_id):
-            return None
-            
-        # Create new order with updated SL
-        return place_order(
-            symbol=order["symbol"],
-            side=order["side"],
-            qty=float(order["size"]),
-            price=float(order["price"]) if order["type"] == "LIMIT" else None
-        )
+        return stop_manager.move_order(sys.modules[__name__], order_id, new_sl)
     except Exception as e:
         print(f"Error moving stop loss: {str(e)}")
-        return None 
\ No newline at end of file
+        return None
@@ -3,13 +3,34 @@ LOG = pathlib.Path("mock_orders.jsonl")
 
 def _log(event): LOG.write_text("") if not LOG.exists() else None; LOG.open("a").write(json.dumps(event)+"\n")
 
-def place_order(symbol, side, qty, price=None):
+def place_order(symbol, side, qty, price=None, client_order_id=None, reduce_only=False):
     e = {"id": str(uuid.uuid4())[:8], "symbol":symbol, "side":side, "qty":qty,
-         "price": price or "market", "ts": int(time.time()*1000)}
+         "price": price or "market", "ts": int(time.time()*1000), "client_order_id": client_order_id,
+         "reduce_only": reduce_only}
     _log({"type":"place", **e}); return e
 
-def cancel_order(ord_id): _log({"type":"cancel","id":ord_id})
+def cancel_order(ord_id): _log({"type":"cancel","id":ord_id}); return {"id":ord_id}
 
 def move_sl(ord_id,new_sl): _log({"type":"move_sl","id":ord_id,"sl":new_sl})
 
-def get_equity(): return 10_000.0
\ No newline at end of file
+AMEND_TPSL = True    # stop_manager may amend tp/sl orders in place
+
+def place_tpsl(symbol, side, qty, tp=None, sl=None, client_order_id=None):
+    e = {"id": str(uuid.uuid4())[:8], "symbol":symbol, "side":side, "qty":qty, "tp":tp, "sl":sl,
+         "ts": int(time.time()*1000), "client_order_id": client_order_id}
+    _log({"type":"place_tpsl", **e}); return e
+
+def amend_tpsl(tpsl_id, sl=None, tp=None, qty=None):
+    e = {"id":tpsl_id, "sl":sl, "tp":tp, "qty":qty}
+    _log({"type":"amend_tpsl", **e}); return e
+
+def amend_tpsl_batch(amends):
+    e = [{"id":a["tpsl_id"], "sl":a.get("sl"), "tp":a.get("tp"), "qty":a.get("qty")} for a in amends]
+    _log({"type":"amend_tpsl_batch", "amends":e}); return {"data": e}
+
+def cancel_tpsl(tpsl_ids): _log({"type":"cancel_tpsl","ids":list(tpsl_ids)}); return {"data": [{"id":i} for i in tpsl_ids]}
+
+def pending_tpsl(symbol=None): return None    # no book kept here: open tp/sl orders unknown
+
+def get_equity(): return 10_000.0
+get_equity_usdt = get_equity    # blofin_gateway imports this name in demo mode
@@ -0,0 +1,150 @@
+"""
+blofin_mock_server.py  –  local HTTP stand-in for api.blofin.com
+----------------------------------------------------------------
+• answers the endpoints blofin_live / blofin_async call (balance, place,
+  look up and cancel orders; place, list, amend, batch-amend and cancel tp/sl)
+  with BloFin-shaped JSON; amend_tpsl=False answers the amend endpoints
+  404, like an account where they do not exist
+• optional artificial latency per request, to mimic the real round trip
+• threaded and keep-alive, so concurrent clients are served concurrently
+usage:
+    python blofin_mock_server.py --port 8088 --latency 0.05
+    BLOFIN_BASE_URL=http://127.0.0.1:8088 python ...
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+EQUITY = "10000.0"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = 1 << 16          # headers and body leave in one write
+
+    server: "MockBlofinServer"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, obj: dict, status: int = 200):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method: str):
+        srv = self.server
+        with srv.lock:
+            srv.inflight += 1
+            srv.peak_inflight = max(srv.peak_inflight, srv.inflight)
+        try:
+            if srv.latency:
+                time.sleep(srv.latency)
+            self._answer(method)
+        finally:
+            with srv.lock:
+                srv.inflight -= 1
+
+    def _answer(self, method: str):
+        srv = self.server
+        n = int(self.headers.get("Content-Length") or 0)
+        data = json.loads(self.rfile.read(n)) if n else {}
+        path, _, query = self.path.partition("?")
+        with srv.lock:
+            srv.requests.append((method, path))
+            if method == "GET" and path == "/api/v1/account/balance":
+                return self._reply({"code": "0", "data": [{"currency": "USDT", "equity": EQUITY}]})
+            if method == "POST" and path == "/api/v1/trade/order":
+                oid = str(next(srv.ids))
+                srv.orders[oid] = {"orderId": oid, **data}
+                return self._reply({"code": "0", "data": srv.orders[oid]})
+            if method == "POST" and path == "/api/v1/trade/order-tpsl":
+                tid = str(next(srv.ids))
+                srv.tpsl[tid] = {"tpslId": tid, **data}
+                return self._reply({"code": "0", "data": srv.tpsl[tid]})
+            if method == "GET" and path == "/api/v1/trade/orders-tpsl-pending":
+                symbol = parse_qs(query).get("symbol", [None])[0]
+                return self._reply({"code": "0", "data": [t for t in srv.tpsl.values()
+                                                          if symbol in (None, t["symbol"])]})
+            if method == "POST" and path == "/api/v1/trade/amend-tpsl" and srv.amend_tpsl:
+                res = srv.amend(data)
+                return self._reply({"code": res["code"], "data": res}, 200 if res["code"] == "0" else 404)
+            if method == "POST" and path == "/api/v1/trade/batch-amend-tpsl" and srv.amend_tpsl:
+                return self._reply({"code": "0", "data": [srv.amend(a) for a in data]})
+            if method == "POST" and path == "/api/v1/trade/cancel-tpsl":
+                res = [{"tpslId": c["tpslId"], "code": "0" if srv.tpsl.pop(c["tpslId"], None) else "51603"}
+                       for c in data]
+                return self._reply({"code": "0", "data": res})
+            if path.startswith("/api/v1/trade/order/"):
+                oid = path.rsplit("/", 1)[1]
+                order = srv.orders.get(oid)
+                if order is None:
+                    return self._reply({"code": "51603", "msg": "order not found"}, 404)
+                if method == "DELETE":
+                    del srv.orders[oid]
+                return self._reply({"code": "0", "data": order})
+        self._reply({"code": "404", "msg": "unknown endpoint"}, 404)
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+
+class MockBlofinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, amend_tpsl: bool = True):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.amend_tpsl = amend_tpsl
+        self.lock = threading.Lock()
+        self.orders: dict[str, dict] = {}
+        self.tpsl: dict[str, dict] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.ids = itertools.count(1)
+        self.inflight = 0
+        self.peak_inflight = 0
+
+    def amend(self, a: dict) -> dict:
+        """Apply one amendment ({"tpslId", "newSlTriggerPrice" …}); caller holds the lock."""
+        order = self.tpsl.get(a.get("tpslId"))
+        if order is None:
+            return {"tpslId": a.get("tpslId"), "code": "51603"}
+        for k, v in a.items():
+            if k.startswith("new"):
+                order[k[3].lower() + k[4:]] = v
+        return {"tpslId": order["tpslId"], "code": "0"}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self) -> "MockBlofinServer":
+        threading.Thread(target=self.serve_forever, name="mock-blofin", daemon=True).start()
+        return self
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8088)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    a = ap.parse_args()
+    srv = MockBlofinServer(a.port, a.latency)
+    print(f"[mock] BloFin stand-in on {srv.url} (latency {a.latency*1000:.0f} ms)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,279 @@
+"""
+candle_store.py  –  local OHLCV store, one memory-mapped columnar file per symbol
+--------------------------------------------------------------------------------
+• ingests CSV / JSON candle dumps (exchange kline arrays, lists of dicts,
+  {"data": [...]} API replies) into candles/<SYMBOL>.ohlcv
+• symbols are keyed by the canonical names the parsers emit (BTC, not
+  BTCUSDT / BTC-USDT / btc/usdt)
+• a file is mapped, not read: columns come back as zero-copy NumPy views and
+  only the pages a lookup touches are loaded
+• time ranges are a binary search on the sorted ts column (O(log n));
+  price() is one search plus one element read
+• re-ingesting merges by timestamp (newer rows win) and replaces the file
+  atomically, so readers never see half a file
+usage:
+    python candle_store.py ingest dumps/*.csv dumps/BTCUSDT_1h.json
+    python candle_store.py info [SYMBOL]
+    store = CandleStore(); store.get("BTC").between(t0, t1).close
+    store.price("ETH", ts_ms)
+
+file layout (little-endian): MAGIC, u64 n, then six columns of n values each –
+ts (i8, epoch ms, ascending, unique), open, high, low, close, volume (f8)
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import pathlib
+import re
+import struct
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from symbol_universe import ALIAS_MAP, UNIVERSE
+
+STORE_DIR = pathlib.Path("candles")
+SUFFIX = ".ohlcv"
+MAGIC = b"RPOHLCV1"
+COLUMNS = ("ts", "open", "high", "low", "close", "volume")
+TS_NAMES = ("ts", "timestamp", "time", "open_time", "opentime", "date", "datetime")
+
+_HEADER = struct.Struct("<8sQ")
+_QUOTE_RGX = re.compile(r"[-_/:]?(?:USDT|USDC|USD)(?:[-_:]?(?:PERP|SWAP))?$|[-_:]?(?:PERP|SWAP)$")
+
+
+def canonical(symbol: str) -> str:
+    """Parser-style key for a ticker: BTCUSDT, BTC-USDT-SWAP, btc/usdt → BTC; SUSD stays SUSD."""
+    s = symbol.strip().upper()
+    if s in ALIAS_MAP:
+        return ALIAS_MAP[s]
+    m = _QUOTE_RGX.search(s)
+    if not m or m.start() == 0:
+        return s
+    if m.group()[0] not in "-_/:" and s in UNIVERSE:
+        return s                                # a coin of its own (SUSD, BUSD), not S / B quoted in USD
+    base = s[:m.start()]
+    # one quote suffix, and only onto a known symbol (no index at all: trust the suffix)
+    return base if base in UNIVERSE or not len(UNIVERSE) else s
+
+
+def epoch_ms(col) -> np.ndarray:
+    """Timestamps (epoch s / ms, numeric strings or ISO text) as int64 epoch ms."""
+    col = pd.Series(col)
+    num = pd.to_numeric(col, errors="coerce")
+    if num.notna().all():
+        v = num.to_numpy(np.int64)
+        return v * 1000 if len(v) and v.max() < 10**11 else v      # seconds → ms
+    return pd.to_datetime(col, utc=True, format="ISO8601").astype("int64").to_numpy() // 1_000_000
+
+
+# ── candles ──────────────────────────────────────────────────
+class Candles:
+    """Column views over one symbol's candles; c.close, c["close"] and len(c)."""
+
+    __slots__ = COLUMNS
+
+    def __init__(self, cols: dict[str, np.ndarray]):
+        for k in COLUMNS:
+            setattr(self, k, cols[k])
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        return getattr(self, col)
+
+    def _rows(self, i: int, j: int) -> "Candles":
+        return Candles({k: getattr(self, k)[i:j] for k in COLUMNS})
+
+    def between(self, start: int|None = None, end: int|None = None) -> "Candles":
+        """Candles with start <= ts < end (epoch ms); views, nothing copied."""
+        i = 0 if start is None else int(np.searchsorted(self.ts, start, side="left"))
+        j = len(self) if end is None else int(np.searchsorted(self.ts, end, side="left"))
+        return self._rows(i, max(i, j))
+
+    def price(self, ts: int|None = None) -> float|None:
+        """Open of the first candle after ts, or the last close when there is none.
+
+        The same fill price the backtest assumes for a signal at ts; without
+        ts, the latest close.
+        """
+        n = len(self)
+        if not n:
+            return None
+        if ts is not None:
+            i = int(np.searchsorted(self.ts, ts, side="right"))
+            if i < n:
+                return float(self.open[i])
+        return float(self.close[-1])
+
+
+def _map(path: pathlib.Path) -> Candles:
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    magic, n = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or len(buf) != _HEADER.size + 8 * n * len(COLUMNS):
+        raise ValueError(f"{path}: not a candle file")
+    cols, pos = {}, _HEADER.size
+    for k in COLUMNS:
+        cols[k] = buf[pos:pos + 8 * n].view("<i8" if k == "ts" else "<f8")
+        pos += 8 * n
+    return Candles(cols)
+
+
+def write_file(path: str|os.PathLike, cols: dict[str, np.ndarray]) -> pathlib.Path:
+    """Write sorted, de-duplicated columns to path (atomic replace)."""
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n = len(cols["ts"])
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, n))
+        for k in COLUMNS:
+            f.write(np.ascontiguousarray(cols[k], dtype="<i8" if k == "ts" else "<f8").tobytes())
+    os.replace(tmp, path)
+    return path
+
+
+# ── reading dumps ────────────────────────────────────────────
+def _frame(rows) -> pd.DataFrame:
+    if isinstance(rows, dict):
+        rows = rows.get("data", rows.get("candles", rows))
+    if isinstance(rows, list) and rows and isinstance(rows[0], (list, tuple)):
+        # exchange kline arrays: ts, open, high, low, close, volume, ...
+        df = pd.DataFrame([r[:6] for r in rows])
+        df.columns = list(COLUMNS[:len(df.columns)])
+        return df
+    return pd.DataFrame(rows)
+
+def read_dump(path: str|os.PathLike) -> pd.DataFrame:
+    """A CSV or JSON dump as a frame with the COLUMNS (volume 0 when absent)."""
+    path = pathlib.Path(path)
+    if path.suffix.lower() == ".json":
+        with open(path, encoding="utf-8") as f:
+            df = _frame(json.load(f))
+    else:
+        df = pd.read_csv(path)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    ts = next((c for c in TS_NAMES if c in df), None)
+    if ts is None:
+        raise ValueError(f"{path.name}: no timestamp column ({', '.join(TS_NAMES)})")
+    out = pd.DataFrame({"ts": epoch_ms(df[ts])})
+    for k in COLUMNS[1:]:
+        if k in df:
+            out[k] = pd.to_numeric(df[k], errors="coerce").to_numpy(np.float64)
+        elif k == "volume":
+            out[k] = 0.0
+        else:
+            raise ValueError(f"{path.name}: no {k} column")
+    return out.dropna()
+
+def symbol_from_path(path: str|os.PathLike) -> str:
+    """BTCUSDT_1h.csv, btc-usdt.json, ETH.csv → BTC, BTC, ETH."""
+    return canonical(re.split(r"[_ .]", pathlib.Path(path).stem)[0])
+
+
+# ── store ────────────────────────────────────────────────────
+class CandleStore:
+    """Directory of per-symbol candle files; maps are opened once and reused."""
+
+    def __init__(self, root: str|os.PathLike = STORE_DIR):
+        self.root = pathlib.Path(root)
+        self._maps: dict[str, tuple[tuple[int, int], Candles]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, symbol: str) -> pathlib.Path:
+        return self.root / f"{canonical(symbol)}{SUFFIX}"
+
+    def symbols(self) -> list[str]:
+        return sorted(p.stem for p in self.root.glob(f"*{SUFFIX}"))
+
+    def __contains__(self, symbol: str) -> bool:
+        return self.path(symbol).exists()
+
+    def get(self, symbol: str) -> Candles|None:
+        """The symbol's candles as memory-mapped views, or None if there are none."""
+        path = self.path(symbol)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)      # a re-ingest replaces the file
+        with self._lock:
+            hit = self._maps.get(path.stem)
+            if hit is None or hit[0] != key:
+                hit = self._maps[path.stem] = (key, _map(path))
+            return hit[1]
+
+    def price(self, symbol: str, ts: int|None = None) -> float|None:
+        """Fill price for a signal at ts (epoch ms), latest close without ts; None if unknown."""
+        c = self.get(symbol)
+        return None if c is None else c.price(ts)
+
+    def ingest(self, symbol: str, rows: pd.DataFrame) -> int:
+        """Merge rows (COLUMNS) into symbol's file; returns its candle count."""
+        symbol = canonical(symbol)
+        new = {k: rows[k].to_numpy() for k in COLUMNS}
+        with self._lock:
+            hit = self._maps.pop(symbol, None)
+        old = hit[1] if hit else None
+        if old is None and self.path(symbol).exists():
+            old = _map(self.path(symbol))
+        if old is not None and len(old):
+            # stable sort, then keep the last row per ts: ingested rows win
+            cols = {k: np.concatenate([np.asarray(old[k]), new[k]]) for k in COLUMNS}
+        else:
+            cols = new
+        order = np.argsort(cols["ts"], kind="stable")
+        ts = cols["ts"][order]
+        keep = np.append(ts[1:] != ts[:-1], True) if len(ts) else np.zeros(0, bool)
+        cols = {k: v[order][keep] for k, v in cols.items()}
+        del old, hit                        # drop the map before the file is replaced
+        write_file(self.path(symbol), cols)
+        return int(keep.sum())
+
+    def ingest_file(self, path: str|os.PathLike, symbol: str|None = None) -> tuple[str, int]:
+        symbol = canonical(symbol) if symbol else symbol_from_path(path)
+        return symbol, self.ingest(symbol, read_dump(path))
+
+
+_DEFAULT = None
+
+def default_store() -> CandleStore:
+    """Shared store on STORE_DIR, for price lookups outside the backtest."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = CandleStore()
+    return _DEFAULT
+
+def _fmt(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--root", default=str(STORE_DIR))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ing = sub.add_parser("ingest", help="merge CSV / JSON dumps into the store")
+    ing.add_argument("files", nargs="+")
+    ing.add_argument("--symbol", help="symbol for all files (default: from each file name)")
+    inf = sub.add_parser("info", help="candle counts and time ranges")
+    inf.add_argument("symbol", nargs="?")
+    a = ap.parse_args()
+
+    store = CandleStore(a.root)
+    if a.cmd == "ingest":
+        for f in a.files:
+            try:
+                sym, n = store.ingest_file(f, a.symbol)
+                print(f"[candles] {f} → {sym}: {n} candles")
+            except (OSError, ValueError) as e:
+                print(f"[candles] {f} skipped: {e}")
+    else:
+        for sym in [canonical(a.symbol)] if a.symbol else store.symbols():
+            c = store.get(sym)
+            if c is None or not len(c):
+                print(f"{sym:<12} no candles")
+            else:
+                print(f"{sym:<12} {len(c):>9}  {_fmt(c.ts[0])} → {_fmt(c.ts[-1])}  last {c.close[-1]:g}")
@@ -22,6 +22,7 @@ import yaml, time, itertools
 from collections import deque
 from datetime import datetime, timedelta
 from dateutil.parser import isoparse
+from discord_export import iter_export_messages
 
 GROUP_WINDOW = timedelta(seconds=30)
 
@@ -40,23 +41,8 @@ def _group_messages(messages):
     if block:
         yield "\n".join(block)
 
-# ---- live symbol cache ------------------------------------------------------
-import ssl
-import certifi
-import urllib.request
-import json
-import pathlib
-import time
-
-def _valid_symbols(cache="symbols.json", max_age=86_400):
-    p = pathlib.Path(cache)
-    if not p.exists() or time.time() - p.stat().st_mtime > max_age:
-        url = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
-        context = ssl.create_default_context(cafile=certifi.where())
-        data = json.load(urllib.request.urlopen(url, context=context))
-        p.write_text(json.dumps([d["symbol"].upper() for d in data]))
-    return set(json.loads(p.read_text()))
-VALID_SYMBOLS = _valid_symbols()
+# Symbol universe: loaded lazily on first lookup, refreshed in the background
+from symbol_universe import VALID_SYMBOLS
 
 IGNORE = {"EVERYONE", "SHEIK", "RATS", "LONG", "SHORT", "BTC_USDT", ""}
 
@@ -135,9 +121,11 @@ def iter_messages(path: pathlib.Path)->Generator[dict[str,Any],None,None]:
         with zipfile.ZipFile(path) as z:
             for n in z.namelist():
                 if n.endswith(".json"):
-                    yield from json.loads(z.read(n).decode("utf-8","ignore")).get("messages",[])
+                    with z.open(n) as fh:
+                        yield from iter_export_messages(fh)
     elif path.suffix==".json":
-        yield from json.loads(path.read_bytes().decode("utf-8","ignore")).get("messages",[])
+        with path.open("rb") as fh:
+            yield from iter_export_messages(fh)
     else:
         raise ValueError("unsupported file")
 
@@ -8,13 +8,27 @@ trade_parser.py v2.5  –  universal, order-agnostic, chart-aware
 • range "0.18-0.16", single numbers, or comma-separated lists
 • ignores emojis, "(2.8 %)", duplicated Discord messages
 • if an image is attached, adds  chart=<url>  field
+• messages from a known channel / author go to that trader's plugin first
+  (parser_registry), everything else to the universal parser below
+• universal-parser results are memoised by normalised content (parse_cache);
+  --parse-cache keeps them in the state db across runs
+• with --resume --execute-updates, follow-ups ("SL to BE", "TP1 hit",
+  "cancel") become orders through order_router (update_executor)
+• -o x.parquet / .arrow / .ndjson writes typed columns (trade_format): tp and
+  updates as lists, ts, trader, message id and chart, streamed in row groups
 usage:
     python trade_parser.py export.zip                    # pretty JSON to console
     python trade_parser.py export.zip -o trades.csv      # CSV file
     python trade_parser.py export.zip --echo 40          # peek 40 raw lines
     python trade_parser.py export.zip -v                 # verbose parse / skip
+    python trade_parser.py latest.json -o t.csv --resume # only messages new since last --resume
+    python trade_parser.py export.zip --parse-cache      # reuse results from earlier runs
+    python trade_parser.py export.zip -o t.parquet       # typed columns (also --format arrow|ndjson)
+    python trade_parser.py export.zip -o t.csv --store   # also into state.db's trades table
+    python trade_parser.py latest.json --resume --execute-updates   # act on "SL to BE", "TP1 hit" …
 """
 from __future__ import annotations 
+import os
 import re
 import json
 import csv
@@ -27,35 +41,38 @@ import urllib.request
 import time
 import yaml
 import itertools
-from collections import deque
 from datetime import datetime, timedelta
+from typing import Iterator
 from dateutil.parser import isoparse
 import ssl
+from discord_export import iter_export_messages, iter_json_items, offset_mark, resume_offset
+from parser_registry import ParserRegistry, channel_from_path
+from keyword_filter import might_be_signal
+from parse_cache import ParseCache, version
+from trade_format import FORMATS, TradeWriter, format_for
+from trade_store import TradeStore
+from update_executor import UpdateExecutor
+import parserv1_2
+import keyword_filter
+import seen_cache
 
 GROUP_WINDOW = timedelta(seconds=30)
 
-# Download symbols from CoinGecko API, cache locally
-def _valid_symbols(cache="symbols.json", max_age=86_400):
-    p = pathlib.Path(cache)
-    if not p.exists() or time.time() - p.stat().st_mtime > max_age:
-        url = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        data = json.load(urllib.request.urlopen(url, context=ctx))
-        p.write_text(json.dumps([d["symbol"].upper() for d in data]))
-    return set(json.loads(p.read_text()))
-
-VALID_SYMBOLS = _valid_symbols()
+# Symbol universe: loaded lazily on first lookup, refreshed in the background
+from symbol_universe import VALID_SYMBOLS
 
 IGNORE = {"EVERYONE", "SHEIK", "RATS", "LONG", "SHORT", "BTC_USDT", ""}
 
 # Regex patterns
 SYMBOL_RE = re.compile(r"\$?([A-Za-z]{2,10})\b")
-SIDE_RE   = re.compile(r"\b(long|short|buy|sell)\b", re.I)
-ENTRY_RE  = re.compile(r"\b(entry|ep|cmp|limit|buy\s+zone|sell\s+zone)\b", re.I)
-TP_RE     = re.compile(r"\b(tp\d?|targets?|🎯|take\s*profit)\b", re.I)
-SL_RE     = re.compile(r"\b(sl|s\b|stop(?:\s*loss)?|invalid(?:ation)?)\b", re.I)
+SIDE_WORDS  = r"long|short|buy|sell"
+ENTRY_WORDS = r"entry|ep|cmp|limit|buy\s+zone|sell\s+zone"
+TP_WORDS    = r"tp\d?|targets?|🎯|take\s*profit"
+SL_WORDS    = r"sl|s\b|stop(?:\s*loss)?|invalid(?:ation)?"
+SIDE_RE   = re.compile(rf"\b({SIDE_WORDS})\b", re.I)
+ENTRY_RE  = re.compile(rf"\b({ENTRY_WORDS})\b", re.I)
+TP_RE     = re.compile(rf"\b({TP_WORDS})\b", re.I)
+SL_RE     = re.compile(rf"\b({SL_WORDS})\b", re.I)
 NUM_RE    = r"\d+(?:\.\d+)?(?:[eE]-?\d+)?"
 
 UPDATE_RGX = re.compile(r"\b(tp\d?|sl|stop|invalid|cancel|exit|close|update|book|breakeven|break\-even)\b", re.I)
@@ -75,6 +92,8 @@ def _extract_chart(msg: dict[str,any]) -> str|None:
     return None
 
 def parse_message(txt: str) -> dict|None:
+    if not might_be_signal(txt):
+        return None
     sym_m  = SYMBOL_RE.search(txt)
     side_m = SIDE_RE.search(txt)
     ent_m  = ENTRY_RE.search(txt)
@@ -111,41 +130,79 @@ def parse_message(txt: str) -> dict|None:
     return {"symbol":symbol,"side":side,"entry":round(entry,8),
             "tp":[round(x,8) for x in tp],"sl":round(sl,8)}
 
+# the filter's vocabularies live in parserv1_2: its rules are part of the version too
+PARSE_CACHE = ParseCache(parse_message, version("2.5", sys.modules[__name__], keyword_filter, parserv1_2))
+REGISTRY = ParserRegistry(PARSE_CACHE)
+
 def iter_messages(path: pathlib.Path) -> iter:
     if path.suffix==".zip":
         with zipfile.ZipFile(path) as z:
             for n in z.namelist():
                 if n.endswith(".json"):
-                    yield from json.loads(z.read(n).decode("utf-8","ignore")).get("messages",[])
+                    with z.open(n) as fh:
+                        yield from iter_export_messages(fh)
     elif path.suffix==".json":
-        yield from json.loads(path.read_bytes().decode("utf-8","ignore")).get("messages",[])
+        with path.open("rb") as fh:
+            yield from iter_export_messages(fh)
     else:
         raise ValueError("unsupported file")
 
+def _msg_ts(m: dict) -> datetime:
+    """Parsed message timestamp, cached on the message under "_ts"."""
+    ts = m.get("_ts")
+    if ts is None:
+        ts = m["_ts"] = isoparse(m.get("timestamp"))
+    return ts
+
 def _group_messages(msg_iter):
-    buf = deque()
+    """Yield each run of messages from one author, ≤ GROUP_WINDOW apart, once.
+
+    Consecutive messages join the current group while the author is the same
+    and the gap to the previous message is within GROUP_WINDOW; anything else
+    (new author, long pause, or time going backwards at an export-file
+    boundary) closes it. Every message lands in exactly one group, so it is
+    parsed once however busy the channel is.
+    """
+    group, last_author, last_ts = [], None, None
     for m in msg_iter:
-        buf.append(m)
-        while (buf and isoparse(m.get("timestamp")) - isoparse(buf[0].get("timestamp")) > GROUP_WINDOW):
-            yield list(buf)
-            buf.popleft()
-    if buf:
-        yield list(buf)
-
-def process(path: pathlib.Path, out: pathlib.Path|None, verbose=False):
-    seen = set()
-    trades = []
+        author = (m.get("author") or {}).get("id")
+        ts = _msg_ts(m)
+        if group and (author != last_author or not timedelta(0) <= ts - last_ts <= GROUP_WINDOW):
+            yield group
+            group = []
+        group.append(m)
+        last_author, last_ts = author, ts
+    if group:
+        yield group
+
+def iter_trades(messages, verbose=False, last_trade: dict|None=None, tail: list|None=None,
+                channel: str|None=None, counts: dict|None=None,
+                on_update=None) -> Iterator[tuple[dict, list[dict]]]:
+    """Group, parse and filter a message stream; yields (trade, its message group).
+
+    Each group goes to the parser REGISTRY routes its channel or author to.
+
+    Update messages seen before the first trade are appended to last_trade,
+    so a stream can pick up where the previous one (e.g. zip member) ended.
+    Later updates go to the trade yielded last, so a trade is final once the
+    next one is yielded. If tail is given it receives the final group when
+    that group produced nothing yet, so a later run can continue it with
+    newer messages. counts["skipped"] counts filtered-out signals.
+    on_update(trade, text, group) is called for every update attached.
+    """
     skipped = 0
-    last_trade = None
+    open_group = None
 
-    for group in _group_messages(iter_messages(path)):
+    for group in _group_messages(messages):
+        open_group = None
         # Merge grouped messages into one text block to improve multiline detection
         text = "\n".join(m.get("content","") for m in group)
-        t = parse_message(text)
+        t = REGISTRY.parser_for(channel, (group[0].get("author") or {}).get("id"))(text)
         if t:
             ch = _extract_chart(group[-1])
             if ch:
                 t["chart"] = ch
+            t["ts"] = group[-1].get("timestamp")   # when the full signal was posted
 
             sym = t["symbol"].upper()
             if sym in IGNORE or sym not in VALID_SYMBOLS:
@@ -158,8 +215,8 @@ def process(path: pathlib.Path, out: pathlib.Path|None, verbose=False):
                 skipped += 1
                 continue
 
-            trades.append(t)
             last_trade = t
+            yield t, group
             if verbose:
                 try:
                     print("✅", textwrap.shorten(text, 80))
@@ -168,55 +225,287 @@ def process(path: pathlib.Path, out: pathlib.Path|None, verbose=False):
         else:
             if last_trade and UPDATE_RGX.search(text):
                 last_trade.setdefault("updates", []).append(text.strip())
+                if on_update is not None:
+                    on_update(last_trade, text.strip(), group)
                 continue
-            elif verbose:
+            open_group = group
+            if verbose:
                 try:
                     print("❌", textwrap.shorten(text, 80))
                 except Exception:
                     print("❌", text[:80])
 
+    if tail is not None:
+        tail[:] = open_group or []
+    if counts is not None:
+        counts["skipped"] = counts.get("skipped", 0) + skipped
+
+def extract_trades(messages, verbose=False, last_trade: dict|None=None,
+                   tail: list|None=None, channel: str|None=None) -> tuple[list[dict], int]:
+    """iter_trades as a list; returns (trades, skipped)."""
+    counts = {"skipped": 0}
+    trades = [t for t, _ in iter_trades(messages, verbose, last_trade, tail, channel, counts)]
+    return trades, counts["skipped"]
+
+def _csv_row(t: dict) -> dict:
+    row = t.copy()
+    if isinstance(row.get("updates"), list):
+        row["updates"] = " | ".join(row["updates"])
+    if isinstance(row.get("tp"), list):
+        row["tp"] = " | ".join(map(str, row["tp"]))
+    return row
+
+def _write_rows(f, writer: csv.DictWriter, trades: list[dict]) -> int:
+    """Write trades; returns the offset where the last one starts."""
+    last = f.tell()
+    for t in trades:
+        last = f.tell()
+        writer.writerow(_csv_row(t))
+    return last
+
+def write_csv(trades: list[dict], out: pathlib.Path) -> int:
+    """Write trades as CSV (header: every key, first seen first); returns the
+    byte offset of the last row, where append_csv() may rewrite it."""
+    out.parent.mkdir(parents=True, exist_ok=True)
+    headers = []
+    for t in trades:
+        for k in t.keys():
+            if k not in headers:
+                headers.append(k)
+
+    with out.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=headers)
+        writer.writeheader()
+        return _write_rows(f, writer, trades)
+
+def _csv_header(path: pathlib.Path) -> list[str]:
+    with path.open(newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+def append_csv(trades: list[dict], out: pathlib.Path, mark: dict|None,
+               last: dict|None = None) -> dict|None:
+    """Add trades to the end of a CSV written by write_csv / append_csv.
+
+    mark is what the previous call returned (offset of the last row, file
+    size); last, if given, replaces that last row first (it gained updates).
+    Only the new rows are written, unless the file changed since mark or a
+    trade brings a column the header lacks – then the CSV is rewritten whole.
+    Returns the mark for the next call.
+    """
+    rows = ([last] if last else []) + trades
+    if not rows:
+        return mark
+    if mark and out.exists() and out.stat().st_size == mark["size"]:
+        header = _csv_header(out)
+        if all(k in header for t in rows for k in t):
+            if last:
+                os.truncate(out, mark["last"])
+            with out.open("a", newline="", encoding="utf-8") as f:
+                off = _write_rows(f, csv.DictWriter(f, fieldnames=header), rows)
+            return {"last": off, "size": out.stat().st_size}
+    old = _read_csv(out) if mark is not None and out.exists() else []
+    if last and old:
+        old[-1] = _csv_row(last)
+    off = write_csv(old + trades, out)
+    return {"last": off, "size": out.stat().st_size}
+
+def _signals(messages, path: pathlib.Path, verbose=False, on_update=None, last_id: str|None=None,
+             **kw) -> Iterator[tuple[dict, str, str|None]]:
+    """iter_trades over path's messages, with each trade's trader and message id
+    (routed trader, else the export name; id of the message that completed it).
+    on_update(message_id, trade, text, group) gets each update with the id of
+    the trade it belongs to; last_id is that of the trade before the stream."""
+    channel = channel_from_path(path)
+    default_trader = path.stem.lower()
+    current = {"id": last_id}
+    if on_update is not None:
+        kw["on_update"] = lambda t, text, group: on_update(current["id"], t, text, group)
+    for t, group in iter_trades(messages, verbose, channel=channel, **kw):
+        author = (group[0].get("author") or {}).get("id")
+        current["id"] = group[-1].get("id")
+        yield t, REGISTRY.trader_for(channel, author) or default_trader, current["id"]
+
+def write_columnar(path: pathlib.Path, out: pathlib.Path, fmt: str, verbose=False,
+                   store: TradeStore|None=None) -> int:
+    """Stream path's trades to a parquet / arrow / ndjson file; returns how many."""
+    with TradeWriter(out, fmt) as w:
+        for t, trader, mid in _signals(iter_messages(path), path, verbose):
+            w.write(t, trader, mid)
+            if store is not None:
+                store.add_parsed(t, trader, mid)
+    return w.count
+
+def process(path: pathlib.Path, out: pathlib.Path|None, verbose=False, fmt: str="csv",
+            store: TradeStore|None=None):
+    """Parse an export to out (or the console); with store, also record every trade there."""
+    if out and fmt != "csv":
+        n = write_columnar(path, out, fmt, verbose, store)
+        print(f"[OK] wrote {n} trades → {out.name}")
+        return
+    counts, trades = {"skipped": 0}, []
+    for t, trader, mid in _signals(iter_messages(path), path, verbose, counts=counts):
+        trades.append(t)
+        if store is not None:
+            store.add_parsed(t, trader, mid)
+    skipped = counts["skipped"]
+
     if out:
         if not trades:
             print("[OK] No trades found, CSV not written.")
             return
-
-        out.parent.mkdir(exist_ok=True)
-        headers = []
-        for t in trades:
-            for k in t.keys():
-                if k not in headers:
-                    headers.append(k)
-
-        with out.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            rows = []
-            for t in trades:
-                row = t.copy()
-                if "updates" in row:
-                    row["updates"] = " | ".join(row["updates"])
-                if "tp" in row:
-                    row["tp"] = " | ".join(map(str, row["tp"]))
-                rows.append(row)
-            writer.writerows(rows)
-
+        write_csv(trades, out)
         print(f"[OK] wrote {len(trades)} trades → {out.name}")
     else:
         print(json.dumps(trades, indent=2))
         print(f"[OK] trades: {len(trades)}  skipped: {skipped}")
 
+def _unseen_messages(path: pathlib.Path, cache: seen_cache.SeenCache, source: str,
+                     new: list[str], pos: dict) -> Iterator[dict]:
+    """Messages not recorded for source in cache; new ids (and zip members
+    read to the end) are added to new. Only the messages actually read are
+    looked up, one primary-key probe each, so a run costs the size of the
+    change, not of the history. Members already recorded unchanged are not
+    even decompressed. A .json export is read from the byte offset in pos
+    (see discord_export.resume_offset), which is moved past the last
+    complete message; a file cut off mid-write is read up to there."""
+    ran: set[str] = set()           # ids of this run, not yet in the cache
+    def fresh(msgs):
+        for m in msgs:
+            mid = m.get("id")
+            if mid is not None:
+                if mid in ran or cache.has(source, mid):
+                    continue
+                ran.add(mid)
+                new.append(mid)
+            yield m
+
+    if path.suffix==".zip":
+        with zipfile.ZipFile(path) as z:
+            for info in z.infolist():
+                if not info.filename.endswith(".json"):
+                    continue
+                mark = f"{info.filename}@{info.CRC:08x}:{info.file_size}"
+                if cache.has(source, mark):
+                    continue
+                with z.open(info) as fh:
+                    yield from fresh(iter_export_messages(fh))
+                new.append(mark)
+    elif path.suffix==".json":
+        with path.open("rb") as fh:
+            end = resume_offset(fh, pos)
+            try:
+                for m, end in iter_json_items(fh, end):
+                    yield from fresh([m])
+            except ValueError:
+                pass        # still being written – the next run reads on from end
+            if end:
+                pos.clear()
+                pos.update(offset_mark(fh, end))
+    else:
+        raise ValueError("unsupported file")
+
+def _read_csv(path: pathlib.Path) -> list[dict]:
+    with path.open(newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+def process_incremental(path: pathlib.Path, out: pathlib.Path|None, verbose=False,
+                        db: str=seen_cache.DB_PATH, store: TradeStore|None=None,
+                        updates: UpdateExecutor|None=None):
+    """process() that only parses messages an earlier run has not seen.
+
+    Progress lives in state.db (see seen_cache): the ids of handled messages,
+    plus the open message group and last trade, so grouping and update
+    attachment continue across runs as if the export had been read in one
+    go. A .json export is read on from the byte offset the last run stopped
+    at. With -o, new trades are appended to the existing CSV (only the last
+    row is rewritten, when it gained updates). With updates,
+    every follow-up is handed to that executor as soon as it is parsed.
+    """
+    source = path.resolve().as_posix()
+    with seen_cache.SeenCache(db) as cache:
+        state = cache.load_state(source)
+        first_run = not state       # state is saved with every run's ids
+        new, tail = [], []
+        carry = {"updates": []}     # stands in for the previous run's last trade
+        pos = dict(state.get("json_offset") or {})
+        msgs = itertools.chain(state.get("tail", []), _unseen_messages(path, cache, source, new, pos))
+        counts, trades, last_id = {"skipped": 0}, [], state.get("last_id")
+        on_update = None
+        if updates is not None:
+            def on_update(mid, t, text, group):
+                updates.add(mid, text, state.get("last_trade") if t is carry else t, group[-1].get("id"))
+        for t, trader, mid in _signals(msgs, path, verbose, on_update, last_id,
+                                       last_trade=carry, tail=tail, counts=counts):
+            trades.append(t)
+            last_id = mid
+            if store is not None:
+                store.add_parsed(t, trader, mid)
+        skipped = counts["skipped"]
+
+        leading, prev = carry["updates"], state.get("last_trade")
+        if leading and prev:
+            prev.setdefault("updates", []).extend(leading)
+        new_msgs = sum(1 for k in new if "@" not in k)
+
+        csv_mark = None if first_run else state.get("csv", {})     # {}: a CSV from before marks were kept
+        if out:
+            csv_mark = append_csv(trades, out, csv_mark, prev if leading and prev else None)
+            print(f"[OK] {new_msgs} new messages, +{len(trades)} trades → {out.name}")
+        else:
+            print(json.dumps(trades, indent=2))
+            print(f"[OK] new messages: {new_msgs}  new trades: {len(trades)}  skipped: {skipped}")
+
+        cache.add(source, new)
+        cache.save_state(source, {
+            "tail": [{k: v for k, v in m.items() if k != "_ts"} for m in tail],
+            "last_trade": trades[-1] if trades else prev,
+            "last_id": last_id,
+            "json_offset": pos,
+            "csv": csv_mark,
+        })
+        cache.commit()
+
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("path")
     ap.add_argument("-o", "--out")
     ap.add_argument("-v", "--verbose", action="store_true")
     ap.add_argument("--echo", type=int, metavar="N")
+    ap.add_argument("--resume", action="store_true", help="only parse messages not seen by an earlier --resume run")
+    ap.add_argument("--reset", action="store_true", help="forget --resume progress for this export first")
+    ap.add_argument("--state-db", default=seen_cache.DB_PATH)
+    ap.add_argument("--parse-cache", action="store_true", help="keep parse results in the state db across runs")
+    ap.add_argument("--format", choices=FORMATS, help="output format (default: from the -o suffix, else csv)")
+    ap.add_argument("--store", action="store_true", help="also record the trades in the state db trades table")
+    ap.add_argument("--execute-updates", action="store_true",
+                    help="with --resume: act on trader updates (move SL, partial close, cancel) via order_router")
     a = ap.parse_args()
     fp = pathlib.Path(a.path)
+    if a.reset:
+        with seen_cache.SeenCache(a.state_db) as cache:
+            cache.forget(fp.resolve().as_posix())
     if a.echo:
         for i,m in enumerate(iter_messages(fp)):
             if i >= a.echo:
                 break
             print(textwrap.shorten(m.get("content", ""), 120))
         sys.exit()
-    process(fp, pathlib.Path(a.out) if a.out else None, a.verbose)
+    out = pathlib.Path(a.out) if a.out else None
+    fmt = a.format or (format_for(out) if out else "csv")
+    if a.resume and fmt != "csv":
+        ap.error("--resume keeps its output as CSV")
+    if a.execute_updates and not a.resume:
+        ap.error("--execute-updates only acts on new messages, so it needs --resume")
+    if a.parse_cache:
+        PARSE_CACHE.attach(a.state_db)
+    store = TradeStore(a.state_db) if a.store else None
+    updates = UpdateExecutor() if a.execute_updates else None
+    with PARSE_CACHE:
+        if a.resume:
+            process_incremental(fp, out, a.verbose, a.state_db, store, updates)
+        else:
+            process(fp, out, a.verbose, fmt, store)
+    if store is not None:
+        store.close()
+    if updates is not None:
+        updates.close()
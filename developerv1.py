@@ -10,17 +10,10 @@ import textwrap
 import urllib.request
 import time
 import codecs
+from discord_export import iter_export_messages
 
-# Download symbols from CoinGecko API, cache locally
-def _download_symbol_list(cache="symbols.json", max_age=86_400):
-    p = pathlib.Path(cache)
-    if not p.exists() or time.time() - p.stat().st_mtime > max_age:
-        url = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
-        data = json.load(urllib.request.urlopen(url))
-        p.write_text(json.dumps([d["symbol"].upper() for d in data]))
-    return set(json.loads(p.read_text()))
-
-VALID_SYMBOLS = _download_symbol_list()  # e.g. {'BTC', 'ETH', ...}
+# Symbol universe: loaded lazily on first lookup, refreshed in the background
+from symbol_universe import VALID_SYMBOLS
 
 IGNORE = {"EVERYONE", "SHEIK", "RATS", "LONG", "SHORT", "BTC_USDT", ""}
 
@@ -88,9 +81,11 @@ def iter_messages(path: pathlib.Path):
         with zipfile.ZipFile(path) as z:
             for n in z.namelist():
                 if n.endswith(".json"):
-                    yield from json.loads(z.read(n).decode("utf-8","ignore")).get("messages",[])
+                    with z.open(n) as fh:
+                        yield from iter_export_messages(fh)
     elif path.suffix==".json":
-        yield from json.loads(path.read_bytes().decode("utf-8","ignore")).get("messages",[])
+        with path.open("rb") as fh:
+            yield from iter_export_messages(fh)
     else:
         raise ValueError("unsupported file")
 
@@ -0,0 +1,176 @@
+"""
+discord_export.py  –  incremental reader for DiscordChatExporter JSON
+---------------------------------------------------------------------
+• yields the entries of the top-level "messages" array one dict at a time
+• reads the export in fixed-size chunks, so memory stays flat however large
+  the file is and the first message is available before the rest is read
+• accepts a zip member (ZipFile.open), a binary or a text file handle
+• iter_json_items() also reports byte offsets, so a growing file can be
+  resumed right after the last element it already returned; offset_mark()
+  / resume_offset() save and check such an offset across runs
+"""
+from __future__ import annotations
+import io
+import json
+from typing import IO, Any, Iterator
+
+CHUNK = 1 << 16          # characters read per refill
+SIG_BYTES = 32           # bytes before a saved offset that must be unchanged to resume there
+_WS = " \t\n\r\ufeff"
+_decoder = json.JSONDecoder()
+
+
+class _Stream:
+    """Sliding text buffer that hands complete JSON values to raw_decode."""
+
+    def __init__(self, fh: IO, base: int|None = None):
+        self.fh = fh
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.base = base    # byte offset of buf[mark]; None = not tracked
+        self.mark = 0
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fh.read(CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.base is not None:
+            self.tell()
+            self.mark = 0
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def tell(self) -> int:
+        """Byte offset of the current position (needs base)."""
+        self.base += len(self.buf[self.mark:self.pos].encode("utf-8", "surrogateescape"))
+        self.mark = self.pos
+        return self.base
+
+    def peek(self) -> str:
+        """Next non-blank character ("" at end of input), not consumed."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str):
+        if self.peek() != ch:
+            raise json.JSONDecodeError(f"Expecting {ch!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def skip(self, ch: str) -> bool:
+        if self.peek() == ch:
+            self.pos += 1
+            return True
+        return False
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number at the very end of the buffer may continue in the next chunk
+            if end < len(self.buf) or not self._fill():
+                self.pos = end
+                return obj
+
+
+def iter_export_messages(fh: IO) -> Iterator[dict[str, Any]]:
+    """Yield each message of a DiscordChatExporter export from an open handle.
+
+    Binary handles are decoded as UTF-8 with undecodable bytes dropped, like
+    the old ``read().decode("utf-8", "ignore")``. Reading stops at the end of
+    the "messages" array; an export without one yields nothing.
+    """
+    if not isinstance(fh, io.TextIOBase):
+        fh = io.TextIOWrapper(fh, encoding="utf-8", errors="ignore")
+    s = _Stream(fh)
+    if not _open_messages(s) or s.skip("]"):
+        return
+    while True:
+        yield s.value()
+        if not s.skip(","):
+            s.expect("]")
+            return
+
+
+def iter_json_items(fh: IO[bytes], offset: int = 0) -> Iterator[tuple[Any, int]]:
+    """Yield (item, end) for each element of a JSON array file.
+
+    The file is either a plain top-level array or a DiscordChatExporter export
+    (its "messages" array). end is the byte offset just past the item; passing
+    it back as offset seeks straight there and yields only later elements.
+    fh must be a seekable binary handle. A file cut off mid-write raises
+    JSONDecodeError after the last complete element.
+    """
+    fh.seek(offset)
+    # newline="" and surrogateescape keep characters and bytes in step for tell()
+    text = io.TextIOWrapper(fh, encoding="utf-8", errors="surrogateescape", newline="")
+    s = _Stream(text, base=offset)
+    try:
+        if offset == 0:
+            if not s.skip("[") and not _open_messages(s):
+                return
+            if s.skip("]"):
+                return
+        elif not s.skip(","):
+            s.expect("]")
+            return
+        while True:
+            item = s.value()
+            yield item, s.tell()
+            if not s.skip(","):
+                s.expect("]")
+                return
+    finally:
+        text.detach()       # leave fh open for the caller
+
+
+def _open_messages(s: _Stream) -> bool:
+    """Consume an export object up to the "[" of its messages array."""
+    s.expect("{")
+    if s.skip("}"):
+        return False
+    while True:
+        key = s.value()
+        s.expect(":")
+        if key == "messages":
+            s.expect("[")
+            return True
+        s.value()
+        if not s.skip(","):
+            s.expect("}")
+            return False
+
+
+def offset_mark(fh: IO[bytes], end: int) -> dict[str, Any]:
+    """Resume point after byte end: the offset plus a signature of the bytes before it."""
+    start = max(0, end - SIG_BYTES)
+    fh.seek(start)
+    return {"offset": end, "sig": fh.read(end - start).hex()}
+
+
+def resume_offset(fh: IO[bytes], saved: dict) -> int:
+    """saved["offset"] if the file still has the same bytes before it, else 0.
+
+    A file rewritten with a different prefix (or cut shorter) is read again
+    from the start.
+    """
+    offset = saved.get("offset", 0)
+    fh.seek(0, io.SEEK_END)
+    if not offset or offset > fh.tell():
+        return 0
+    mark = offset_mark(fh, offset)
+    return offset if mark["sig"] == saved.get("sig") else 0
@@ -1,10 +1,25 @@
 import re
 
+# Compiled once at import; the parser registry calls this per message
+ENTRY_RE  = re.compile(r"(entry|buy in|buy at|buy):?\s*(\d+(?:\.\d+)?)")
+SL_RE     = re.compile(r"(stop.?loss|sl|stop):?\s*(\d+(?:\.\d+)?)")
+TARGET_RE = re.compile(r"(tp\d*|target\d*):?\s*(\d+(?:\.\d+)?)")
+COIN_RE   = re.compile(r"\$([A-Za-z]{2,10})\b|\b([A-Z]{2,10})(?:/USDT)?\b")
+NOT_COINS = {"LONG", "SHORT", "ENTRY", "BUY", "SELL", "SL", "TP", "STOP", "LOSS", "TARGET", "USDT"}
+
 def extract_trade_from_message(message: str) -> dict:
     """
     Extracts entry, stop loss, and targets from a raw Discord message string for Fatty's trade signals.
     """
 
+    # Match trading pair (e.g., $ETH, ETH/USDT) – before lower-casing, tickers are upper case
+    coin = None
+    for m in COIN_RE.finditer(message):
+        sym = (m.group(1) or m.group(2)).upper()
+        if sym not in NOT_COINS:
+            coin = sym
+            break
+
     # Normalize text
     message = message.lower().replace(",", "").replace("`", "")
 
@@ -16,22 +31,15 @@ def extract_trade_from_message(message: str) -> dict:
         direction = "SHORT"
 
     # Match entry price
-    entry_match = re.search(r"(entry|buy in|buy at|buy):?\s*(\d+\.\d+)", message)
+    entry_match = ENTRY_RE.search(message)
     entry = float(entry_match.group(2)) if entry_match else None
 
     # Match stop loss
-    sl_match = re.search(r"(stop.?loss|sl|stop):?\s*(\d+\.\d+)", message)
+    sl_match = SL_RE.search(message)
     stop_loss = float(sl_match.group(2)) if sl_match else None
 
     # Match targets (tp1, tp2, tp3 etc.)
-    targets = []
-    tp_matches = re.findall(r"(tp\d*|target\d*):?\s*(\d+\.\d+)", message)
-    if tp_matches:
-        targets = [float(tp[1]) for tp in tp_matches]
-
-    # Match trading pair (e.g., $ETH, ETH/USDT)
-    coin_match = re.search(r"(\$?[A-Z]{2,10})(/USDT)?", message)
-    coin = coin_match.group(1).replace("$", "") if coin_match else None
+    targets = [float(tp[1]) for tp in TARGET_RE.findall(message)]
 
     return {
         "entry": entry,
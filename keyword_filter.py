@@ -0,0 +1,87 @@
+"""
+keyword_filter.py  –  cheap reject for messages that cannot be a trade signal
+---------------------------------------------------------------------------
+• a signal needs a side, an entry, a TP and an SL keyword plus a number;
+  most Discord chatter lacks at least one, and is dropped here before the
+  parser runs its keyword regexes
+• the vocabularies are parserv1_2's SIDE / ENTRY / TP / SL word lists,
+  expanded once into the literal phrases they can match ("stop(?:\\s*loss)?"
+  → stop, stop loss, stoploss) and compiled into one word-level automaton:
+  a single scan splits the text into words, then one set lookup per kind
+  (phrases of several words only when no single word matched)
+• conservative by construction: it can pass a message the parser rejects,
+  never the reverse, so parser output does not change
+usage:
+    if might_be_signal(text): parse_message(text)
+"""
+from __future__ import annotations
+import re
+
+WORD_RE = re.compile(r"[^\W\d_]+|🎯")      # letter runs: \b-delimited keywords land on whole runs
+DIGIT_RE = re.compile(r"\d")
+_UNSUPPORTED = re.compile(r"[\\()\[\]*+?|{}^$]")
+
+
+def phrases(fragment: str) -> set[str]:
+    """Every literal a vocabulary regex fragment can match (for the syntax the vocabularies use)."""
+    frag = fragment.replace(r"\b", "").replace(r"\d?", "").replace(r"\.", ".")
+    m = re.search(r"\(\?:([^()]*)\)\?", frag)
+    if m:
+        return phrases(frag[:m.start()] + m.group(1) + frag[m.end():]) | phrases(frag[:m.start()] + frag[m.end():])
+    i = frag.find(r"\s*")
+    if i >= 0:
+        return phrases(frag[:i] + " " + frag[i+3:]) | phrases(frag[:i] + frag[i+3:])
+    i = frag.find("?")
+    if i > 0:
+        return phrases(frag[:i] + frag[i+1:]) | phrases(frag[:i-1] + frag[i+1:])
+    if _UNSUPPORTED.search(frag):
+        raise ValueError(f"keyword_filter cannot expand {fragment!r}")
+    return {frag.casefold()}
+
+
+class KeywordFilter:
+    """Passes text that holds a number and a keyword of every kind."""
+
+    def __init__(self, vocabularies: dict[str, list[str]]):
+        self.kinds = []             # (kind, single words, first words of phrases, multi-word phrases)
+        for kind, fragments in vocabularies.items():
+            words = {tuple(WORD_RE.findall(p)) for f in fragments for p in phrases(f)}
+            words.discard(())
+            singles = frozenset(w[0] for w in words if len(w) == 1)
+            # a phrase containing a single-word keyword can never decide the outcome
+            multi = tuple(w for w in words if len(w) > 1 and not singles.intersection(w))
+            self.kinds.append((kind, singles, frozenset(w[0] for w in multi), multi))
+
+    def missing(self, text: str) -> list[str]:
+        """Kinds with no keyword in text (empty: a candidate signal, if it has a number)."""
+        tokens = set(WORD_RE.findall(text.casefold()))
+        return [kind for kind, *sets in self.kinds if not self._has(tokens, *sets)]
+
+    @staticmethod
+    def _has(tokens: set, singles: frozenset, firsts: frozenset, multi: tuple) -> bool:
+        if not tokens.isdisjoint(singles):
+            return True
+        return not tokens.isdisjoint(firsts) and any(tokens.issuperset(w) for w in multi)
+
+    def __call__(self, text: str) -> bool:
+        if not DIGIT_RE.search(text):
+            return False
+        tokens = set(WORD_RE.findall(text.casefold()))
+        for _, singles, firsts, multi in self.kinds:
+            if tokens.isdisjoint(singles) and (tokens.isdisjoint(firsts)
+                                               or not any(tokens.issuperset(w) for w in multi)):
+                return False
+        return True
+
+
+_SIGNAL_FILTER = None
+
+def might_be_signal(text: str) -> bool:
+    """False when text cannot hold a side, entry, TP and SL keyword plus a number."""
+    global _SIGNAL_FILTER
+    if _SIGNAL_FILTER is None:
+        from parserv1_2 import SIDE_WORDS, ENTRY_WORDS, TP_WORDS, SL_WORDS
+        # SL first: its words are the rarest in chatter, so most messages stop there
+        _SIGNAL_FILTER = KeywordFilter({"SL": SL_WORDS, "TP": TP_WORDS,
+                                        "ENTRY": ENTRY_WORDS, "SIDE": SIDE_WORDS})
+    return _SIGNAL_FILTER(text)
@@ -7,16 +7,18 @@ def _write(event):
     with MOCK_LOG.open("a") as f:
         f.write(json.dumps(event) + "\n")
 
-def place_order(symbol, side, qty, price=None):
+def place_order(symbol, side, qty, price=None, client_order_id=None, reduce_only=False):
     """Return a fake BloFin order response."""
     event = {
         "mock": True,
         "ts": int(time.time()*1000),
         "orderId": str(uuid.uuid4())[:8],
+        "clientOrderId": client_order_id,
         "symbol": symbol,
         "side": side,
         "qty": qty,
         "price": price or "market",
+        "reduceOnly": reduce_only,
     }
     _write(event)
     return {"data": event}
@@ -51,6 +53,65 @@ def move_sl(order_id, new_sl):
     _write(event)
     return {"data": event}
 
+AMEND_TPSL = True       # stop_manager may amend tp/sl orders in place
+
+def place_tpsl(symbol, side, qty, tp=None, sl=None, client_order_id=None):
+    """Mock attached tp/sl order"""
+    event = {
+        "mock": True,
+        "ts": int(time.time()*1000),
+        "action": "place_tpsl",
+        "tpslId": str(uuid.uuid4())[:8],
+        "clientOrderId": client_order_id,
+        "symbol": symbol,
+        "side": side,
+        "qty": qty,
+        "tp": tp,
+        "sl": sl,
+    }
+    _write(event)
+    return {"data": event}
+
+def amend_tpsl(tpsl_id, sl=None, tp=None, qty=None):
+    """Mock in-place tp/sl amendment"""
+    event = {
+        "mock": True,
+        "ts": int(time.time()*1000),
+        "action": "amend_tpsl",
+        "tpslId": tpsl_id,
+        "sl": sl,
+        "tp": tp,
+        "qty": qty,
+    }
+    _write(event)
+    return {"data": event}
+
+def amend_tpsl_batch(amends):
+    """Mock batch amendment: one event, one result per order"""
+    event = {
+        "mock": True,
+        "ts": int(time.time()*1000),
+        "action": "amend_tpsl_batch",
+        "amends": amends,
+    }
+    _write(event)
+    return {"data": [{"tpslId": a["tpsl_id"], "code": "0"} for a in amends]}
+
+def cancel_tpsl(tpsl_ids):
+    """Mock tp/sl cancel"""
+    event = {
+        "mock": True,
+        "ts": int(time.time()*1000),
+        "action": "cancel_tpsl",
+        "tpslIds": list(tpsl_ids),
+    }
+    _write(event)
+    return {"data": [{"tpslId": i, "code": "0"} for i in tpsl_ids]}
+
+def pending_tpsl(symbol=None):
+    """Mock has no book of open tp/sl orders: unknown"""
+    return None
+
 from dotenv import load_dotenv ; load_dotenv()
 KEY     = os.getenv("BLOFIN_API_KEY")
 SECRET  = os.getenv("BLOFIN_API_SECRET", "").encode()
@@ -0,0 +1,226 @@
+"""
+order_intents.py  –  idempotent order placement: one order per signal leg
+------------------------------------------------------------------------
+• every order is an intent keyed by a client order id derived from the
+  Discord message id and the leg ("entry", "limit", "sl" …): the same
+  signal seen twice – overlapping exports, repeated watchdog events, a
+  replayed burst – maps to the same id
+• an intent is claimed before the network call: an in-memory dict answers
+  repeats in the same process, an INSERT OR IGNORE on order_intents in
+  state.db (WAL) answers them across processes; a duplicate returns None
+  without touching the exchange
+• states: pending (claimed, call in flight) → placed (exchange order id
+  known) → filled / canceled; failed when the call returned nothing – only
+  failed intents may be claimed again, and they resend the same client
+  order id, so the exchange can reject a copy of one that did go through
+• listeners (e.g. order_router.RiskHooks) hear of every accepted order and
+  every fill, with the intent row (trader, reduce_only …)
+usage:
+    intents = OrderIntents()
+    intents.submit(place_order, "1357…", "entry", "BTC-USDT", "buy", 0.01)   # places
+    intents.submit(place_order, "1357…", "entry", "BTC-USDT", "buy", 0.01)   # None, no call
+    intents.filled(client_order_id("1357…", "entry"))
+"""
+from __future__ import annotations
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+DB_PATH = "state.db"
+PREFIX = "rp"           # client order ids: letters and digits, 32 at most (BloFin's limit)
+
+PENDING, PLACED, FILLED, CANCELED, FAILED = "pending", "placed", "filled", "canceled", "failed"
+DONE = (FILLED, CANCELED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_intents(
+    coid TEXT PRIMARY KEY, message_id TEXT NOT NULL, leg TEXT NOT NULL,
+    symbol TEXT, side TEXT, qty REAL, price REAL, reduce_only INTEGER NOT NULL DEFAULT 0, trader TEXT,
+    status TEXT NOT NULL, order_id TEXT, created REAL NOT NULL, updated REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS order_intents_status ON order_intents(status);
+CREATE INDEX IF NOT EXISTS order_intents_message ON order_intents(message_id);
+"""
+
+
+def client_order_id(message_id, leg: str) -> str:
+    """Deterministic exchange client order id for one leg of one signal."""
+    digest = hashlib.blake2b(f"{message_id}:{leg}".encode(), digest_size=15).hexdigest()
+    return PREFIX + digest
+
+def order_id_of(res: Any) -> str|None:
+    """Exchange order id from a place_order result (live: {"data": {"orderId"}}; mock: {"id"})."""
+    if not isinstance(res, dict):
+        return None
+    data = res.get("data", res)
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    if not isinstance(data, dict):
+        return None
+    oid = data.get("orderId") or data.get("id")
+    return str(oid) if oid is not None else None
+
+
+class OrderIntents:
+    """Thread-safe; each thread gets its own connection, the status cache is shared."""
+
+    def __init__(self, db: str|os.PathLike = DB_PATH, clock=time.time, listeners=()):
+        self.db = str(db)
+        self.clock = clock
+        self.listeners = list(listeners)    # order_placed(intent) / order_filled(intent, realized_pnl)
+        self._local = threading.local()
+        self._status: dict[str, str] = {}      # coid -> status, for every intent this process has seen
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def _con(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            # autocommit: every claim / transition is one atomic statement
+            con = sqlite3.connect(self.db, timeout=10, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.executescript(SCHEMA)
+            self._local.con = con
+        return con
+
+    def close(self):
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+    # ── state ─────────────────────────────────────────────────
+    def claim(self, message_id, leg: str, symbol: str|None = None, side: str|None = None,
+              qty: float|None = None, price: float|None = None, reduce_only: bool = False,
+              trader: str|None = None) -> str|None:
+        """The leg's client order id if this caller may send it now, else None (a duplicate)."""
+        coid = client_order_id(message_id, leg)
+        with self._lock:
+            known = self._status.get(coid)
+            if known is not None and known != FAILED:
+                self.duplicates += 1
+                return None
+            self._status[coid] = PENDING        # holds off other threads while the db answers
+        now = self.clock()
+        con = self._con()
+        try:
+            cur = con.execute(
+                "INSERT INTO order_intents(coid, message_id, leg, symbol, side, qty, price, reduce_only, trader, "
+                "status, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(coid) DO UPDATE SET status = excluded.status, updated = excluded.updated "
+                "WHERE order_intents.status = ?",
+                (coid, str(message_id), leg, symbol, side, qty, price, int(reduce_only), trader, PENDING, now, now, FAILED))
+            claimed = cur.rowcount == 1
+            if not claimed:
+                row = con.execute("SELECT status FROM order_intents WHERE coid = ?", (coid,)).fetchone()
+        except BaseException:
+            with self._lock:
+                self._status.pop(coid, None)
+            raise
+        with self._lock:
+            if claimed:
+                return coid
+            self._status[coid] = row[0] if row else PENDING
+            self.duplicates += 1
+        return None
+
+    def _set(self, coid: str, status: str, order_id: str|None = None):
+        with self._lock:
+            self._status[coid] = status
+        self._con().execute("UPDATE order_intents SET status = ?, order_id = COALESCE(?, order_id), updated = ? "
+                            "WHERE coid = ?", (status, order_id, self.clock(), coid))
+
+    def placed(self, coid: str, order_id: str|None):
+        self._set(coid, PLACED, order_id)
+
+    def failed(self, coid: str):
+        self._set(coid, FAILED)
+
+    def filled(self, coid: str, realized_pnl: float = 0.0):
+        self._set(coid, FILLED)
+        self._notify("order_filled", coid, realized_pnl)
+
+    def canceled(self, coid: str):
+        self._set(coid, CANCELED)
+
+    def status(self, coid: str) -> str|None:
+        with self._lock:
+            s = self._status.get(coid)
+        if s is not None:
+            return s
+        row = self._con().execute("SELECT status FROM order_intents WHERE coid = ?", (coid,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, coid: str) -> dict|None:
+        cur = self._con().execute("SELECT * FROM order_intents WHERE coid = ?", (coid,))
+        row = cur.fetchone()
+        return dict(zip([d[0] for d in cur.description], row)) if row else None
+
+    def for_message(self, message_id) -> list[dict]:
+        """Every intent of one signal, oldest first."""
+        cur = self._con().execute("SELECT * FROM order_intents WHERE message_id = ? ORDER BY created",
+                                  (str(message_id),))
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+    def in_flight(self) -> list[dict]:
+        """Intents claimed or placed but not yet filled, canceled or failed."""
+        cur = self._con().execute("SELECT * FROM order_intents WHERE status IN (?, ?) ORDER BY created",
+                                  (PENDING, PLACED))
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+    # ── placing ───────────────────────────────────────────────
+    def submit(self, place_order: Callable[..., Optional[dict]], message_id, leg: str,
+               symbol: str, side: str, qty: float, price: float|None = None,
+               reduce_only: bool = False, trader: str|None = None) -> Optional[dict]:
+        """place_order once per (message, leg); None for a duplicate or a failed call."""
+        coid = self.claim(message_id, leg, symbol, side, qty, price, reduce_only, trader)
+        if coid is None:
+            return None
+        kw = {"reduce_only": True} if reduce_only else {}
+        try:
+            res = place_order(symbol, side, qty, price, client_order_id=coid, **kw)
+        except BaseException:
+            self.failed(coid)
+            raise
+        self._settle(coid, res)
+        return res
+
+    async def asubmit(self, place_order, message_id, leg: str,
+                      symbol: str, side: str, qty: float, price: float|None = None,
+                      reduce_only: bool = False, trader: str|None = None) -> Optional[dict]:
+        """submit() for the asyncio client (blofin_async.place_order)."""
+        coid = self.claim(message_id, leg, symbol, side, qty, price, reduce_only, trader)
+        if coid is None:
+            return None
+        kw = {"reduce_only": True} if reduce_only else {}
+        try:
+            res = await place_order(symbol, side, qty, price, client_order_id=coid, **kw)
+        except BaseException:
+            self.failed(coid)
+            raise
+        self._settle(coid, res)
+        return res
+
+    def _settle(self, coid: str, res):
+        if res:
+            self.placed(coid, order_id_of(res))
+            self._notify("order_placed", coid)
+        else:
+            self.failed(coid)
+
+    def _notify(self, event: str, coid: str, *args):
+        # the order stands either way: a listener error is logged, never raised into the caller
+        if not self.listeners:
+            return
+        intent = self.get(coid)
+        for listener in self.listeners:
+            try:
+                getattr(listener, event)(intent, *args)
+            except Exception as e:
+                print(f"[intents] {event} listener failed: {e}")
@@ -4,6 +4,82 @@ from dotenv import load_dotenv; load_dotenv()
 MODE = os.getenv("MODE", "demo").lower()
 
 if MODE == "live":
+    import blofin_live as exchange
     from blofin_live import place_order, get_equity, cancel_order, move_sl
 else:
-    from blofin_mock import place_order, get_equity, cancel_order, move_sl 
\ No newline at end of file
+    import blofin_mock as exchange
+    from blofin_mock import place_order, get_equity, cancel_order, move_sl 
+
+import time
+import risk_manager
+from order_intents import OrderIntents, client_order_id
+from stop_manager import StopManager
+from trade_store import TradeStore
+
+class RiskHooks:
+    """order_intents listener: keeps risk_manager's trade count, exposure and daily loss in step."""
+
+    def order_placed(self, intent):
+        opened = INTENTS.for_message(intent["message_id"]) if intent["reduce_only"] else []
+        price = (intent["price"] or next((i["price"] for i in opened if i["price"] and not i["reduce_only"]), None)
+                 or STOPS.entry(intent["message_id"]) or risk_manager.market_price(intent["symbol"]) or 0.0)
+        notional = (intent["qty"] or 0.0) * price
+        if intent["reduce_only"]:
+            trader = next((i["trader"] for i in opened if i["trader"]), None) or "default"
+            risk_manager.close_exposure(trader, intent["symbol"], notional)
+        else:
+            risk_manager.record_trade(intent["trader"] or "default", intent["symbol"], notional)
+        risk_manager.on_order_placed()
+
+    def order_filled(self, intent, realized_pnl=0.0):
+        risk_manager.on_fill(realized_pnl)
+
+class StoreHooks:
+    """order_intents listener: every entry fill lands in trade_store as an executed trade."""
+
+    def __init__(self, store=None):
+        self._store = store
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = TradeStore()      # state.db, opened on the first fill
+        return self._store
+
+    def order_placed(self, intent):
+        pass
+
+    def order_filled(self, intent, realized_pnl=0.0):
+        if intent["reduce_only"]:
+            return
+        key = intent["message_id"]
+        legs = STOPS.get(key)
+        trade = {"symbol": intent["symbol"], "side": "LONG" if intent["side"].lower() == "buy" else "SHORT",
+                 "entry": intent["price"] or STOPS.entry(key), "sl": STOPS.sl(key),
+                 "tp": [legs[leg]["tp"] for leg in sorted(legs) if leg.startswith("tp")], "ts": time.time()}
+        qty = {"qty_limit" if intent["price"] else "qty_now": intent["qty"]}
+        self.store.add_executed(trade, order_id=intent["order_id"], trader=intent["trader"], message_id=key, **qty)
+        self.store.flush()
+
+INTENTS = OrderIntents(listeners=[RiskHooks(), StoreHooks()])    # state.db is opened on first use
+STOPS = StopManager(exchange)
+
+def submit_order(message_id, leg, symbol, side, qty, price=None, reduce_only=False, trader=None):
+    """place_order, unless this leg of this signal was sent already (order_intents)."""
+    return INTENTS.submit(place_order, message_id, leg, symbol, side, qty, price, reduce_only, trader)
+
+def order_filled(message_id, leg, realized_pnl=0.0):
+    """Fill report for one leg (fill feed / poller): marks the intent filled, books the pnl."""
+    INTENTS.filled(client_order_id(message_id, leg), realized_pnl)
+
+def attach_stops(message_id, symbol, side, qty, entry=None, sl=None, tps=()):
+    """Exchange-side sl / tp orders for the position opened by this signal (stop_manager)."""
+    return STOPS.attach(message_id, symbol, side, qty, entry, sl, tps)
+
+def move_stops(moves):
+    """{message_id: new_sl} – every stop amended in one request."""
+    return STOPS.move_sls(moves)
+
+def breakeven(message_ids):
+    """Stops of these positions to their entry, in one request."""
+    return STOPS.breakeven(message_ids)
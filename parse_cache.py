@@ -0,0 +1,131 @@
+"""
+parse_cache.py  –  memoised parse results, keyed by message content
+------------------------------------------------------------------
+• key = parser version + BLAKE2 hash of the whitespace-normalised text, so a
+  re-post, an edit that only touched spacing, or the same message in
+  latest.json and an archive zip is parsed once
+• bounded LRU in memory; optionally backed by a parse_cache table in
+  state.db, so later runs and other processes start warm
+• the version includes a hash of the parser's source: changing a rule
+  changes every key, and rows of other versions are dropped when the
+  table is opened
+• negative results (chatter) are cached too – they are most messages
+• callers get their own copy of a result and may change it freely
+usage:
+    parse = ParseCache(parse_message, version("2.5", developerparserv2))
+    parse.attach("state.db"); parse(text); parse.flush()
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from collections import OrderedDict
+from typing import Callable
+
+MAXSIZE = 50_000            # results kept in memory
+FLUSH_EVERY = 1_000         # new results buffered before a write to the db
+_WS = re.compile(r"\s+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_cache(
+    key TEXT PRIMARY KEY, version TEXT NOT NULL, result TEXT NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def version(tag: str, *modules) -> str:
+    """tag plus a hash of the modules' source files (the parser rules)."""
+    h = hashlib.blake2b(digest_size=6)
+    for m in modules:
+        with open(m.__file__, "rb") as f:
+            h.update(f.read())
+    return f"{tag}:{h.hexdigest()}"
+
+def normalize(text: str) -> str:
+    return _WS.sub(" ", text).strip()
+
+def _copy(res):
+    # results are flat dicts of scalars and lists (parse_message's shape)
+    if res is None:
+        return None
+    return {k: list(v) if isinstance(v, list) else v for k, v in res.items()}
+
+
+class ParseCache:
+    """Callable stand-in for `parse`: same argument, same result, computed once."""
+
+    def __init__(self, parse: Callable[[str], "dict|None"], version: str, maxsize: int = MAXSIZE):
+        self.parse = parse
+        self.version = version
+        self.maxsize = maxsize
+        self._memo: OrderedDict[str, dict|None] = OrderedDict()
+        self._con = None
+        self._pending: list[tuple[str, str, str]] = []
+        self.hits = self.misses = 0
+
+    def key(self, text: str) -> str:
+        digest = hashlib.blake2b(normalize(text).encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        return f"{self.version}|{digest}"
+
+    # persistence
+    def attach(self, db: str|os.PathLike):
+        """Back the cache with db; rows from other parser versions are dropped."""
+        con = sqlite3.connect(str(db), timeout=10)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute(SCHEMA)
+        with con:
+            con.execute("DELETE FROM parse_cache WHERE version != ?", (self.version,))
+        self._con = con
+
+    def flush(self):
+        if self._con is not None and self._pending:
+            with self._con:
+                self._con.executemany("INSERT OR REPLACE INTO parse_cache(key, version, result) VALUES (?, ?, ?)",
+                                      self._pending)
+        self._pending.clear()
+
+    def close(self):
+        self.flush()
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+
+    def clear(self):
+        """Forget the in-memory results (the db table is kept)."""
+        self._memo.clear()
+        self.hits = self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # lookups
+    def __call__(self, text: str) -> dict|None:
+        k = self.key(text)
+        memo = self._memo
+        if k in memo:
+            memo.move_to_end(k)
+            self.hits += 1
+            return _copy(memo[k])
+        row = None
+        if self._con is not None:
+            row = self._con.execute("SELECT result FROM parse_cache WHERE key = ?", (k,)).fetchone()
+        if row is not None:
+            res = json.loads(row[0])
+            self.hits += 1
+        else:
+            res = self.parse(text)
+            self.misses += 1
+            if self._con is not None:
+                self._pending.append((k, self.version, json.dumps(res)))
+                if len(self._pending) >= FLUSH_EVERY:
+                    self.flush()
+        memo[k] = _copy(res)
+        if len(memo) > self.maxsize:
+            memo.popitem(last=False)
+        return res
@@ -0,0 +1,197 @@
+"""
+parser_bench.py  –  speed, memory and accuracy of every parser version
+---------------------------------------------------------------------
+• runs each parser module in-process over the bundled trader archives, the
+  same way its own CLI does (process(path, out); parserv1's per-trader loop
+  with no author filter)
+• speed: best of --repeat untraced runs → messages/sec; memory: one extra
+  run under tracemalloc → peak MB allocated while parsing
+• accuracy: the trades written are compared with the checked-in
+  <Archive>_parsed.csv baseline as a multiset of (symbol, side, entry, tps,
+  sl) – matched, precision = matched / extracted, recall = matched / baseline
+• memoising parsers (developerparserv2's PARSE_CACHE) start every run cold
+usage:
+    python parser_bench.py                                  # every parser × every archive
+    python parser_bench.py -p developerparserv2 Tyler.zip   # one parser, one archive
+    python parser_bench.py --json bench.json --min-recall 0.9
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import csv
+import importlib
+import io
+import json
+import pathlib
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from collections import Counter
+
+from discord_export import iter_export_messages
+
+PARSERS = ("parserv1", "parserv1_1", "parserv1_2", "parserv1_3",
+           "developerv1", "developerparser", "developerparserv2")
+ARCHIVES = ("illusion.zip", "Jotham.zip", "Khalil.zip", "Sn06.zip", "Tyler.zip", "xvek.zip")
+BASELINE_SUFFIX = "_parsed.csv"
+_NUM = re.compile(r"\d+(?:\.\d+)?(?:[eE]-?\d+)?")
+
+csv.field_size_limit(1 << 24)       # grouped updates can be long
+
+
+# ── trades ────────────────────────────────────────────────────
+def trade_key(row: dict) -> tuple|None:
+    """A trade as written by any version: "[1.0, 2.0]" and "1.0 | 2.0" tps compare equal."""
+    try:
+        entry, sl = round(float(row["entry"]), 8), round(float(row["sl"]), 8)
+    except (KeyError, TypeError, ValueError):
+        return None
+    tps = tuple(round(float(x), 8) for x in _NUM.findall(row.get("tp") or ""))
+    return str(row.get("symbol") or "").upper(), str(row.get("side") or "").upper(), entry, tps, sl
+
+def read_trades(path: pathlib.Path) -> Counter:
+    if not path.exists():           # most versions write nothing when there are no trades
+        return Counter()
+    with path.open(newline="", encoding="utf-8") as f:
+        return Counter(k for k in map(trade_key, csv.DictReader(f)) if k is not None)
+
+def agreement(got: Counter, want: Counter) -> dict:
+    matched = sum((got & want).values())
+    n_got, n_want = sum(got.values()), sum(want.values())
+    return {"trades": n_got, "baseline": n_want, "matched": matched,
+            "precision": matched / n_got if n_got else 0.0,
+            "recall": matched / n_want if n_want else 0.0}
+
+def count_messages(path: pathlib.Path) -> int:
+    if path.suffix != ".zip":
+        with path.open("rb") as fh:
+            return sum(1 for _ in iter_export_messages(fh))
+    with zipfile.ZipFile(path) as z:
+        n = 0
+        for name in z.namelist():
+            if name.endswith(".json"):
+                with z.open(name) as fh:
+                    n += sum(1 for _ in iter_export_messages(fh))
+        return n
+
+
+# ── runs ──────────────────────────────────────────────────────
+def run_parser(mod, src: pathlib.Path, workdir: pathlib.Path) -> pathlib.Path:
+    """Parse src with mod, quietly; returns the CSV it wrote (which may not exist)."""
+    cache = getattr(mod, "PARSE_CACHE", None)
+    if cache is not None:
+        cache.clear()
+    out = workdir / f"{src.stem}.csv"
+    out.unlink(missing_ok=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if hasattr(mod, "process"):
+            mod.process(src, out)
+        else:                       # parserv1
+            out = workdir / f"{src.stem}_parsed_trades.csv"
+            out.unlink(missing_ok=True)
+            mod.process_trades_for_trader(src, None, workdir)
+    return out
+
+def bench_one(mod, src: pathlib.Path, workdir: pathlib.Path, repeat: int = 3, memory: bool = True) -> dict:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        out = run_parser(mod, src, workdir)
+        best = min(best, time.perf_counter() - t0)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run_parser(mod, src, workdir)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    baseline = src.with_name(src.stem + BASELINE_SUFFIX)
+    return {"seconds": best, "peak_mb": peak,
+            **agreement(read_trades(out), read_trades(baseline))}
+
+def bench(parsers=PARSERS, archives=ARCHIVES, repeat: int = 3, memory: bool = True) -> list[dict]:
+    """One row per parser × archive (plus an "error" row for a parser or archive that fails)."""
+    archives = [pathlib.Path(a) for a in archives]
+    messages = {a: count_messages(a) for a in archives}
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = pathlib.Path(tmp)
+        for name in parsers:
+            try:
+                mod = importlib.import_module(name)
+            except Exception as e:
+                rows.append({"parser": name, "archive": None, "error": f"import: {e}"})
+                continue
+            for src in archives:
+                row = {"parser": name, "archive": src.name, "messages": messages[src]}
+                try:
+                    row.update(bench_one(mod, src, workdir, repeat, memory))
+                    row["msgs_per_sec"] = messages[src] / row["seconds"] if row["seconds"] else 0.0
+                except Exception as e:
+                    row["error"] = f"{type(e).__name__}: {e}"
+                rows.append(row)
+    return rows
+
+def totals(rows: list[dict]) -> list[dict]:
+    """Per-parser sums over its archives (rows with an error are left out)."""
+    out: dict[str, dict] = {}
+    for r in rows:
+        if "error" in r:
+            continue
+        t = out.setdefault(r["parser"], {"parser": r["parser"], "archive": "TOTAL", "messages": 0,
+                                         "seconds": 0.0, "peak_mb": None, "trades": 0,
+                                         "baseline": 0, "matched": 0})
+        for k in ("messages", "seconds", "trades", "baseline", "matched"):
+            t[k] += r[k]
+        if r["peak_mb"] is not None:
+            t["peak_mb"] = max(t["peak_mb"] or 0.0, r["peak_mb"])
+    for t in out.values():
+        t["msgs_per_sec"] = t["messages"] / t["seconds"] if t["seconds"] else 0.0
+        t["precision"] = t["matched"] / t["trades"] if t["trades"] else 0.0
+        t["recall"] = t["matched"] / t["baseline"] if t["baseline"] else 0.0
+    return list(out.values())
+
+
+# ── report ────────────────────────────────────────────────────
+COLUMNS = (("parser", 18, ""), ("archive", 12, ""), ("messages", 8, "d"), ("msgs_per_sec", 12, ".0f"),
+           ("peak_mb", 8, ".1f"), ("trades", 6, "d"), ("baseline", 8, "d"), ("matched", 7, "d"),
+           ("precision", 9, ".1%"), ("recall", 7, ".1%"))
+
+def format_table(rows: list[dict]) -> str:
+    def cell(v, width, spec):
+        if not spec:
+            return f"{str(v if v is not None else ''):<{width}}"
+        return f"{'-' if v is None else format(v, spec):>{width}}"
+    lines = [" ".join(f"{name:<{w}}" if not spec else f"{name:>{w}}" for name, w, spec in COLUMNS)]
+    for r in rows:
+        if "error" in r:
+            lines.append(f"{cell(r['parser'], 18, '')} {cell(r['archive'], 12, '')} ERROR {r['error']}")
+        else:
+            lines.append(" ".join(cell(r.get(name), w, spec) for name, w, spec in COLUMNS))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("archives", nargs="*", default=list(ARCHIVES))
+    ap.add_argument("-p", "--parsers", default=",".join(PARSERS), help="comma-separated module names")
+    ap.add_argument("-r", "--repeat", type=int, default=3, help="timed runs per parser × archive (best counts)")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    ap.add_argument("--json", metavar="FILE", help="also write every row and total as JSON")
+    ap.add_argument("--min-recall", type=float, metavar="R",
+                    help="exit 1 if a parser's total recall against the baselines is below R")
+    a = ap.parse_args()
+    rows = bench(a.parsers.split(","), a.archives, a.repeat, not a.no_memory)
+    summary = totals(rows)
+    print(format_table(rows + summary))
+    if a.json:
+        pathlib.Path(a.json).write_text(json.dumps({"rows": rows, "totals": summary}, indent=2))
+    failed = [t["parser"] for t in summary if a.min_recall is not None and t["recall"] < a.min_recall]
+    failed += sorted({r["parser"] for r in rows if "error" in r})
+    if failed:
+        print(f"[FAIL] {', '.join(dict.fromkeys(failed))}")
+        sys.exit(1)
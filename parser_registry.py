@@ -0,0 +1,104 @@
+"""
+parser_registry.py  –  route each message to its trader's parser plugin
+----------------------------------------------------------------------
+• channel id (the export_<id>.json names) or author id → trader → plugin,
+  two dict lookups per message group
+• plugins are the per-trader modules (fatty.py, illusion.py …) exposing
+  extract_trade_from_message(text) → {entry, stop_loss, targets, direction,
+  coin}; each is imported once (its patterns compile at import) and probed
+  with a sample signal – a stub that cannot parse it is not registered
+• a plugin result is turned into the parse_message shape; a message the
+  plugin cannot parse, and every unrouted message, goes to the universal
+  parser
+usage:
+    reg = ParserRegistry(parse_message)
+    parse = reg.parser_for(channel_id, author_id); parse(text)
+"""
+from __future__ import annotations
+import importlib
+import re
+from typing import Callable
+
+PLUGINS = ("fatty", "illusion", "jotham", "khalil", "sheikh", "sn06", "tyler", "xvek")
+
+# channel ids from the export_<id>.json names
+CHANNELS = {
+    "1337063214294368257": "illusion",
+    "1338523459990458460": "khalil",
+    "1338523694867157074": "sn06",
+    "1338558567564972072": "sheikh",
+    "1338857948511993891": "jotham",
+    "1339724987011043390": "tyler",
+    "1355605545775661127": "xvek",
+}
+# message author ids, for exports whose channel is not known
+AUTHORS = {
+    "535395946809262089": "illusion",
+    "892238147629498428": "jotham",
+    "863498054316851231": "sn06",
+    "1356303556101144757": "sn06",
+    "1356384141096255669": "sheikh",
+    "1348885150804742205": "tyler",
+    "1336678499695726634": "xvek",
+    # fatty: no export yet – add the channel / author id once there is one
+}
+
+PROBE = "LONG $BTC\nEntry: 100.5\nTP1: 110.5\nTP2: 120.5\nSL: 95.5"
+_CHANNEL_RGX = re.compile(r"export_(\d{15,20})")
+
+Parser = Callable[[str], "dict|None"]
+
+
+def channel_from_path(path) -> str|None:
+    """Channel id from an export_<id>.json style file name, if there is one."""
+    m = _CHANNEL_RGX.search(str(path))
+    return m.group(1) if m else None
+
+def from_plugin(res: dict|None) -> dict|None:
+    """A plugin's result in parse_message's shape, or None if incomplete."""
+    if not res:
+        return None
+    entry, sl, tps = res.get("entry"), res.get("stop_loss"), res.get("targets") or []
+    side, coin = (res.get("direction") or "").upper(), res.get("coin")
+    if not (entry and sl and tps and coin) or side not in ("LONG", "SHORT"):
+        return None
+    if (side == "LONG" and sl >= entry) or (side == "SHORT" and sl <= entry):
+        return None
+    return {"symbol": coin.upper().lstrip("$"), "side": side, "entry": round(float(entry), 8),
+            "tp": [round(float(x), 8) for x in tps], "sl": round(float(sl), 8)}
+
+
+class ParserRegistry:
+    """Dispatch table built once: trader → parser, plus the id → trader maps."""
+
+    def __init__(self, fallback: Parser, plugins=PLUGINS, channels=CHANNELS, authors=AUTHORS):
+        self.fallback = fallback
+        self.channels = dict(channels)
+        self.authors = dict(authors)
+        self.parsers: dict[str, Parser] = {}
+        for name in plugins:
+            try:
+                mod = importlib.import_module(name)
+            except ImportError as e:
+                print(f"[parsers] plugin {name} not loaded: {e}")
+                continue
+            self.register(name, mod.extract_trade_from_message)
+
+    def register(self, trader: str, extract, probe: bool = True) -> bool:
+        """Add a plugin for trader; returns False (and skips it) if it cannot parse PROBE."""
+        if probe and from_plugin(extract(PROBE)) is None:
+            return False
+        fallback = self.fallback
+
+        def parse(text: str, _extract=extract) -> dict|None:
+            return from_plugin(_extract(text)) or fallback(text)
+
+        self.parsers[trader.lower()] = parse
+        return True
+
+    def trader_for(self, channel_id=None, author_id=None) -> str|None:
+        return self.channels.get(str(channel_id)) or self.authors.get(str(author_id))
+
+    def parser_for(self, channel_id=None, author_id=None) -> Parser:
+        """The routed trader's plugin when it has a working one, else the universal parser."""
+        return self.parsers.get(self.trader_for(channel_id, author_id), self.fallback)
@@ -7,17 +7,10 @@ import time
 import urllib.request
 import textwrap
 from difflib import get_close_matches
+from discord_export import iter_export_messages
 
-# Download CoinGecko symbols (or read cached)
-def download_coingecko_symbols(cache="symbols.json", max_age=86400):
-    p = pathlib.Path(cache)
-    if not p.exists() or time.time() - p.stat().st_mtime > max_age:
-        url = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
-        data = json.load(urllib.request.urlopen(url))
-        p.write_text(json.dumps([d["symbol"].upper() for d in data]))
-    return set(json.loads(p.read_text()))
-
-VALID_SYMBOLS = download_coingecko_symbols()
+# Symbol universe: loaded lazily on first lookup, refreshed in the background
+from symbol_universe import VALID_SYMBOLS
 
 IGNORE = {"EVERYONE", "SHEIK", "RATS", "LONG", "SHORT", "BTC_USDT", ""}
 
@@ -81,8 +74,8 @@ def iter_messages_from_zip(zip_path):
     with zipfile.ZipFile(zip_path) as z:
         for n in z.namelist():
             if n.endswith(".json"):
-                data = json.loads(z.read(n).decode("utf-8","ignore"))
-                yield from data.get("messages", [])
+                with z.open(n) as fh:
+                    yield from iter_export_messages(fh)
 
 def process_trades_for_trader(zip_path, trader_name, output_dir):
     parsed_trades = []
@@ -95,7 +88,7 @@ def process_trades_for_trader(zip_path, trader_name, output_dir):
             continue
         seen.add(mid)
 
-        if msg.get("author", {}).get("name") != trader_name:
+        if trader_name and msg.get("author", {}).get("name") != trader_name:
             continue
 
         content = msg.get("content", "")
@@ -121,8 +114,9 @@ def process_trades_for_trader(zip_path, trader_name, output_dir):
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    trades_file = output_dir / f"{trader_name}_parsed_trades.csv"
-    edges_file = output_dir / f"{trader_name}_edge_cases.csv"
+    name = trader_name or pathlib.Path(zip_path).stem      # no trader_name: every author
+    trades_file = output_dir / f"{name}_parsed_trades.csv"
+    edges_file = output_dir / f"{name}_edge_cases.csv"
 
     if parsed_trades:
         with trades_file.open("w", newline="", encoding="utf-8") as f:
@@ -136,7 +130,7 @@ def process_trades_for_trader(zip_path, trader_name, output_dir):
             writer.writeheader()
             writer.writerows(edge_cases)
 
-    print(f"[{trader_name}] Parsed trades: {len(parsed_trades)} | Edge cases: {len(edge_cases)}")
+    print(f"[{name}] Parsed trades: {len(parsed_trades)} | Edge cases: {len(edge_cases)}")
 
 def batch_process_traders(export_folder, trader_names, output_folder):
     export_folder = pathlib.Path(export_folder)
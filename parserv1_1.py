@@ -8,17 +8,10 @@ import argparse
 import textwrap
 import urllib.request
 import time
+from discord_export import iter_export_messages
 
-# Download symbols from CoinGecko API, cache locally
-def _download_symbol_list(cache="symbols.json", max_age=86_400):
-    p = pathlib.Path(cache)
-    if not p.exists() or time.time() - p.stat().st_mtime > max_age:
-        url = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
-        data = json.load(urllib.request.urlopen(url))
-        p.write_text(json.dumps([d["symbol"].upper() for d in data]))
-    return set(json.loads(p.read_text()))
-
-VALID_SYMBOLS = _download_symbol_list()  # e.g. {'BTC', 'ETH', ...}
+# Symbol universe: loaded lazily on first lookup, refreshed in the background
+from symbol_universe import VALID_SYMBOLS
 
 IGNORE = {"EVERYONE", "SHEIK", "RATS", "LONG", "SHORT", "BTC_USDT", ""}
 
@@ -86,15 +79,14 @@ def iter_messages(path: pathlib.Path):
             for n in z.namelist():
                 if n.endswith(".json"):
                     try:
-                        data = json.loads(z.read(n).decode("utf-8", "ignore"))
-                        yield from data.get("messages", [])
+                        with z.open(n) as fh:
+                            yield from iter_export_messages(fh)
                     except json.JSONDecodeError as e:
                         print(f"Warning: Skipping corrupted file {n} in {path.name}: {e}")
     elif path.suffix == ".json":
         try:
             with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                yield from data.get("messages", [])
+                yield from iter_export_messages(f)
         except json.JSONDecodeError as e:
             print(f"Warning: Could not parse JSON file {path.name}: {e}")
     else:
@@ -8,17 +8,11 @@ import argparse
 import textwrap
 import urllib.request
 import time
+from discord_export import iter_export_messages
+from keyword_filter import might_be_signal
 
-# Download symbols from CoinGecko API, cache locally
-def _download_symbol_list(cache="symbols.json", max_age=86_400):
-    p = pathlib.Path(cache)
-    if not p.exists() or time.time() - p.stat().st_mtime > max_age:
-        url = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
-        data = json.load(urllib.request.urlopen(url))
-        p.write_text(json.dumps([d["symbol"].upper() for d in data]))
-    return set(json.loads(p.read_text()))
-
-VALID_SYMBOLS = _download_symbol_list()  # e.g. {'BTC', 'ETH', ...}
+# Symbol universe: loaded lazily on first lookup, refreshed in the background
+from symbol_universe import VALID_SYMBOLS
 
 IGNORE = {"EVERYONE", "SHEIK", "RATS", "LONG", "SHORT", "BTC_USDT", ""}
 
@@ -28,39 +22,46 @@ import re
 # Symbols (tickers): Allow 2-10 letters, with optional $ prefix
 SYMBOL_RE = re.compile(r"\$?([A-Za-z]{2,10})\b")
 
+# Keyword vocabularies – one regex fragment per alternative, shared with the
+# keyword_filter prefilter, which must know every phrase these can match
+
 # Trade side: Include long/short plus buy/sell variants and common shorthand
-SIDE_RE = re.compile(
-    r"\b(long|short|buy|sell|going\s*long|going\s*short|entry\s*long|entry\s*short|"
-    r"longer|shorter|longish|shortish|bullish|bearish|go\s*long|go\s*short|"
-    r"buying|selling)\b",
-    re.I
-)
+SIDE_WORDS = [
+    r"long", r"short", r"buy", r"sell", r"going\s*long", r"going\s*short", r"entry\s*long", r"entry\s*short",
+    r"longer", r"shorter", r"longish", r"shortish", r"bullish", r"bearish", r"go\s*long", r"go\s*short",
+    r"buying", r"selling",
+]
 
 # Entry keywords: lots of variations and synonyms
-ENTRY_RE = re.compile(
-    r"\b(entry|ep|e\.p\.|cmp|limit|buy\s*zone|sell\s*zone|open|open\s*price|"
-    r"trigger|entry\s*zone|zone\s*at|range|dip\s*zone|in\s*at|scaling\s*in\s*at|"
-    r"initiate|buy\s*between|buy\s*from|long\s*from|short\s*from|take\s*entry|"
-    r"consider|get\s*in\s*around|watch\s*for\s*reclaim|floor|bottom)\b",
-    re.I
-)
+ENTRY_WORDS = [
+    r"entry", r"ep", r"e\.p\.", r"cmp", r"limit", r"buy\s*zone", r"sell\s*zone", r"open", r"open\s*price",
+    r"trigger", r"entry\s*zone", r"zone\s*at", r"range", r"dip\s*zone", r"in\s*at", r"scaling\s*in\s*at",
+    r"initiate", r"buy\s*between", r"buy\s*from", r"long\s*from", r"short\s*from", r"take\s*entry",
+    r"consider", r"get\s*in\s*around", r"watch\s*for\s*reclaim", r"floor", r"bottom",
+]
 
 # Take Profit (TP) keywords with variations, emojis, and shorthand
-TP_RE = re.compile(
-    r"\b(tp\d?|t\.p\.?|targets?|target|take\s*profit|profit\s*target|"
-    r"first\s*target|second\s*target|final\s*target|scale\s*out|trim\s*at|"
-    r"close\s*partial|exit\s*at|objectives|tgt|🎯|pt|partial)\b",
-    re.I
-)
+TP_WORDS = [
+    r"tp\d?", r"t\.p\.?", r"targets?", r"target", r"take\s*profit", r"profit\s*target",
+    r"first\s*target", r"second\s*target", r"final\s*target", r"scale\s*out", r"trim\s*at",
+    r"close\s*partial", r"exit\s*at", r"objectives", r"tgt", r"🎯", r"pt", r"partial",
+]
 
 # Stop Loss (SL) keywords and common variants
-SL_RE = re.compile(
-    r"\b(sl|s\b|stop(?:\s*loss)?|invalid(?:ation)?|risk|cut|exit\s*if\s*below|"
-    r"exit\s*if\s*under|close\s*if\s*below|invalidate\s*below|risk\s*under|"
-    r"stop\s*under|loss\s*if\s*below|protect\s*at|drop\s*below|flush\s*below|"
-    r"pullback\s*under|manual\s*sl|tight\s*sl|tight\s*stop|stoploss|stoplosses)\b",
-    re.I
-)
+SL_WORDS = [
+    r"sl", r"s\b", r"stop(?:\s*loss)?", r"invalid(?:ation)?", r"risk", r"cut", r"exit\s*if\s*below",
+    r"exit\s*if\s*under", r"close\s*if\s*below", r"invalidate\s*below", r"risk\s*under",
+    r"stop\s*under", r"loss\s*if\s*below", r"protect\s*at", r"drop\s*below", r"flush\s*below",
+    r"pullback\s*under", r"manual\s*sl", r"tight\s*sl", r"tight\s*stop", r"stoploss", r"stoplosses",
+]
+
+def _alternation(words: list[str]) -> re.Pattern:
+    return re.compile(r"\b(" + "|".join(words) + r")\b", re.I)
+
+SIDE_RE  = _alternation(SIDE_WORDS)
+ENTRY_RE = _alternation(ENTRY_WORDS)
+TP_RE    = _alternation(TP_WORDS)
+SL_RE    = _alternation(SL_WORDS)
 
 # Numbers - including scientific notation
 NUM_RE = r"\d+(?:\.\d+)?(?:[eE]-?\d+)?"
@@ -81,6 +82,8 @@ def _extract_chart(msg):
     return None
 
 def parse_message(txt):
+    if not might_be_signal(txt):
+        return None
     sym_m  = SYMBOL_RE.search(txt)
     side_m = SIDE_RE.search(txt)
     ent_m  = ENTRY_RE.search(txt)
@@ -122,15 +125,14 @@ def iter_messages(path: pathlib.Path):
             for n in z.namelist():
                 if n.endswith(".json"):
                     try:
-                        data = json.loads(z.read(n).decode("utf-8", "ignore"))
-                        yield from data.get("messages", [])
+                        with z.open(n) as fh:
+                            yield from iter_export_messages(fh)
                     except json.JSONDecodeError as e:
                         print(f"Warning: Skipping corrupted file {n} in {path.name}: {e}")
     elif path.suffix == ".json":
         try:
             with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                yield from data.get("messages", [])
+                yield from iter_export_messages(f)
         except json.JSONDecodeError as e:
             print(f"Warning: Could not parse JSON file {path.name}: {e}")
     else:
@@ -8,34 +8,14 @@ import argparse
 import textwrap
 import urllib.request
 import time
+from discord_export import iter_export_messages
 
-# Download symbols from CoinGecko API, cache locally
-def _download_symbol_list(cache="symbols.json", max_age=86_400):
-    p = pathlib.Path(cache)
-    if not p.exists() or time.time() - p.stat().st_mtime > max_age:
-        url = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
-        data = json.load(urllib.request.urlopen(url))
-        p.write_text(json.dumps([d["symbol"].upper() for d in data]))
-    return set(json.loads(p.read_text()))
-
-VALID_SYMBOLS = _download_symbol_list()  # e.g. {'BTC', 'ETH', ...}
+# Symbol universe: loaded lazily on first lookup, refreshed in the background
+from symbol_universe import VALID_SYMBOLS, ALIAS_MAP
 
 # List of words to ignore as symbols (like chat commands or keywords)
 IGNORE = {"EVERYONE", "SHEIK", "RATS", "LONG", "SHORT", "BTC_USDT", ""}
 
-# Map common aliases or suffix variants to canonical symbols
-ALIAS_MAP = {
-    "BTCUSDT": "BTC",
-    "ETHUSDT": "ETH",
-    "PEPE3L": "PEPE",
-    "ORDIPERP": "ORDI",
-    "GMXUSDT": "GMX",
-    "APT-PERP": "APT",
-    "RNDRPERP": "RNDR",
-    "FLOKIUSDT": "FLOKI",
-    # Add more as needed
-}
-
 def clean_symbol(symbol: str) -> str:
     # Remove common suffixes
     suffixes = ['USDT', 'BUSD', 'PERP', '3L', '3S', '1X', '2X', '5X']
@@ -127,9 +107,11 @@ def iter_messages(path: pathlib.Path):
         with zipfile.ZipFile(path) as z:
             for n in z.namelist():
                 if n.endswith(".json"):
-                    yield from json.loads(z.read(n).decode("utf-8", "ignore")).get("messages", [])
+                    with z.open(n) as fh:
+                        yield from iter_export_messages(fh)
     elif path.suffix == ".json":
-        yield from json.loads(path.read_bytes().decode("utf-8", "ignore")).get("messages", [])
+        with path.open("rb") as fh:
+            yield from iter_export_messages(fh)
     else:
         raise ValueError("Unsupported file")
 
@@ -4,11 +4,13 @@ import re
 import random
 import time
 
+from candle_store import default_store, epoch_ms
+
 # === CONFIGURATION === #
 EXPORT_FOLDER = "./exports/"
 MARGIN_ALLOCATION = 1.0  # percent of total balance per trade
 BALANCE = 1000  # simulated account balance
-MOCK_PRICE_RANGE = 0.98, 1.02  # mock current price fluctuation (±2%)
+MOCK_PRICE_RANGE = 0.98, 1.02  # mock current price fluctuation (±2%), when there are no local candles
 
 # === Signal Pattern === #
 SIGNAL_REGEX = re.compile(
@@ -17,10 +19,15 @@ SIGNAL_REGEX = re.compile(
 )
 
 # === Trade Simulator === #
-def simulate_trade(entry, target, stoploss, symbol="BTC/USDT"):
-    current_price = entry * random.uniform(*MOCK_PRICE_RANGE)
+def simulate_trade(entry, target, stoploss, symbol="BTC/USDT", timestamp=None):
+    ts = int(epoch_ms([timestamp])[0]) if timestamp else None
+    current_price = default_store().price(symbol, ts)
+    source = "Candle"
+    if current_price is None:
+        current_price = entry * random.uniform(*MOCK_PRICE_RANGE)
+        source = "Mock"
     print(f"\n📈 Simulating Trade for {symbol}")
-    print(f"Mock Price: {current_price:.4f} | Entry: {entry} | TP: {target} | SL: {stoploss}")
+    print(f"{source} Price: {current_price:.4f} | Entry: {entry} | TP: {target} | SL: {stoploss}")
 
     distance = abs(current_price - entry) / entry
 
@@ -51,7 +58,7 @@ def parse_signals(folder):
                         sl = float(match.group(3))
                         user = msg["author"]["name"]
                         print(f"\n🧠 Signal From: {user}")
-                        simulate_trade(entry, tp, sl)
+                        simulate_trade(entry, tp, sl, timestamp=msg.get("timestamp"))
 
 # === MAIN === #
 if __name__ == "__main__":
@@ -0,0 +1,21 @@
+# ── risk_limits.py ──
+# Sizing constants shared by risk_manager (live) and backtest (replay); no exchange imports.
+
+DAILY_LOSS_LIMIT_PCT = 0.15  # 15% daily cap
+
+# Default margin per trade if trader not specified
+TRADER_RISK = {
+    "fatty": 0.04,
+    "illusion": 0.03,
+    "khalil": 0.025,
+    "jotham": 0.025,
+    "ty": 0.02,
+    "default": 0.01
+}
+
+TEST_BALANCE_USDT = 5000.0  # fallback if API fails
+
+# Staged entry by how far price is from the signal entry (%):
+# ≥ FAR → FAR_FRACTION at market; < NEAR → NEAR_FRACTION at market + the same at entry; else all at market
+STAGE_FAR_PCT, STAGE_FAR_FRACTION = 1.0, 0.20
+STAGE_NEAR_PCT, STAGE_NEAR_FRACTION = 0.5, 0.50
@@ -1,46 +1,113 @@
 
 # ── risk_manager.py ──
 import os
-import json
-from core.blofin_gateway import get_equity_usdt
-
-STATE_FILE = "state.json"
-DAILY_LOSS_LIMIT_PCT = 0.15  # 15% daily cap
-
-# Default margin per trade if trader not specified
-TRADER_RISK = {
-    "fatty": 0.04,
-    "illusion": 0.03,
-    "khalil": 0.025,
-    "jotham": 0.025,
-    "ty": 0.02,
-    "default": 0.01
-}
-
-TEST_BALANCE_USDT = 5000.0  # fallback if API fails
-
-def load_state():
-    if not os.path.exists(STATE_FILE):
-        return {"daily_loss": 0.0}
-    with open(STATE_FILE, "r") as f:
-        return json.load(f)
-
-def save_state(state):
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f)
+import time
+import threading
+from blofin_gateway import get_equity_usdt
+from risk_store import RiskStore
+from risk_limits import (DAILY_LOSS_LIMIT_PCT, TRADER_RISK, TEST_BALANCE_USDT, STAGE_FAR_PCT,
+                         STAGE_FAR_FRACTION, STAGE_NEAR_PCT, STAGE_NEAR_FRACTION)
+
+EQUITY_TTL = float(os.getenv("EQUITY_TTL", "30"))  # seconds a fetched balance is trusted
+
+class AccountState:
+    """Equity cache plus the shared risk store, used by the sizing calls.
+
+    Equity is fetched once, then served from memory; after `ttl` seconds, or
+    after invalidate_equity() (an order or fill changed the balance), the old
+    value keeps being served while a background thread fetches a new one.
+    Daily loss, cooldown counters and exposure live in state.db (risk_store),
+    so every worker process sees the same numbers.
+    """
+
+    def __init__(self, fetch_equity=None, ttl: float = EQUITY_TTL, store: RiskStore|None = None):
+        self.fetch_equity = fetch_equity or get_equity_usdt
+        self.ttl = ttl
+        self._store = store
+        self._lock = threading.Lock()
+        self._equity = None
+        self._fetched = 0.0
+        self._refreshing = None
+
+    @property
+    def store(self) -> RiskStore:
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = RiskStore()
+        return self._store
+
+    # equity
+    def equity(self) -> float:
+        if self._equity is None:
+            self.refresh_equity(block=True)        # first call only
+        elif time.monotonic() - self._fetched > self.ttl:
+            self.refresh_equity()
+        return self._equity
+
+    def invalidate_equity(self):
+        self._fetched = float("-inf")
+        self.refresh_equity()
+
+    def refresh_equity(self, block: bool = False):
+        with self._lock:
+            t = self._refreshing
+            if t is None or not t.is_alive():
+                t = self._refreshing = threading.Thread(target=self._fetch, name="equity-refresh", daemon=True)
+                t.start()
+        if block:
+            t.join()
+
+    def _fetch(self):
+        try:
+            eq = self.fetch_equity()
+        except Exception as e:
+            print(f"[risk] equity refresh failed: {e}")
+            eq = None
+        self._equity = eq or self._equity or TEST_BALANCE_USDT
+        self._fetched = time.monotonic()
+
+    # daily loss (resets at 00:00 UTC)
+    @property
+    def daily_loss(self) -> float:
+        return self.store.get("daily_loss")
+
+    def add_loss(self, amount: float) -> float:
+        return self.store.add("daily_loss", amount)
+
+ACCOUNT = AccountState()
 
 def get_per_trader_risk(trader_name: str) -> float:
     return TRADER_RISK.get(trader_name.lower(), TRADER_RISK["default"])
 
 def check_daily_loss_cap():
-    state = load_state()
-    equity = get_equity_usdt() or TEST_BALANCE_USDT
-    return state["daily_loss"] < (equity * DAILY_LOSS_LIMIT_PCT)
+    return ACCOUNT.daily_loss < (ACCOUNT.equity() * DAILY_LOSS_LIMIT_PCT)
 
 def update_daily_loss(loss_amount):
-    state = load_state()
-    state["daily_loss"] += loss_amount
-    save_state(state)
+    ACCOUNT.add_loss(loss_amount)
+
+def record_trade(trader_name: str, symbol: str = None, notional: float = 0.0) -> int:
+    """Count a new trade for the cooldown rules and add its exposure."""
+    if notional:
+        ACCOUNT.store.add_exposure(trader_name, symbol, notional)
+    return ACCOUNT.store.record_trade(trader_name, symbol)
+
+def close_exposure(trader_name: str, symbol: str, notional: float):
+    """Release exposure when a position (partly) closes."""
+    ACCOUNT.store.add_exposure(trader_name, symbol, -notional)
+
+def trader_exposure(trader_name: str) -> float:
+    return ACCOUNT.store.exposure(trader_name)
+
+def on_order_placed():
+    """Call after an order is accepted: margin in use changed."""
+    ACCOUNT.invalidate_equity()
+
+def on_fill(realized_pnl: float = 0.0):
+    """Call on a fill; a realised loss counts towards the daily cap."""
+    if realized_pnl < 0:
+        ACCOUNT.add_loss(-realized_pnl)
+    ACCOUNT.invalidate_equity()
 
 def position_size(entry_price: float,
                   balance: float = TEST_BALANCE_USDT,
@@ -49,17 +116,27 @@ def position_size(entry_price: float,
     qty = allocation / entry_price
     return round(qty, 4)
 
-def staged_entry_qty(entry, current_price, trader_name="default"):
-    balance = get_equity_usdt() or TEST_BALANCE_USDT
+def market_price(symbol: str|None, ts: int|None = None) -> float|None:
+    """Price from the local candle store (fill price at ts, else latest close), or None."""
+    if not symbol:
+        return None
+    from candle_store import default_store      # numpy / pandas only when prices are needed
+    return default_store().price(symbol, ts)
+
+def staged_entry_qty(entry, current_price=None, trader_name="default", symbol=None, ts=None):
+    """current_price=None looks symbol up in the candle store; with no candles it counts as at entry."""
+    if current_price is None:
+        current_price = market_price(symbol, ts) or entry
+    balance = ACCOUNT.equity()
     margin_pct = get_per_trader_risk(trader_name)
     allocation_usd = balance * margin_pct
     full_qty = allocation_usd / entry
 
     diff_pct = abs(current_price - entry) / entry * 100
 
-    if diff_pct >= 1.0:
-        return {"qty_now": round(full_qty * 0.20, 4), "qty_limit": 0.0}
-    elif diff_pct < 0.5:
-        return {"qty_now": round(full_qty * 0.50, 4), "qty_limit": round(full_qty * 0.50, 4)}
+    if diff_pct >= STAGE_FAR_PCT:
+        return {"qty_now": round(full_qty * STAGE_FAR_FRACTION, 4), "qty_limit": 0.0}
+    elif diff_pct < STAGE_NEAR_PCT:
+        return {"qty_now": round(full_qty * STAGE_NEAR_FRACTION, 4), "qty_limit": round(full_qty * STAGE_NEAR_FRACTION, 4)}
     else:  # between 0.5–1 %
         return {"qty_now": round(full_qty, 4), "qty_limit": 0.0}
@@ -0,0 +1,182 @@
+"""
+risk_store.py  –  shared risk state in state.db (WAL mode)
+----------------------------------------------------------
+• daily counters (daily_loss, cooldown total_loss …) keyed by UTC day, so a
+  new day starts at zero with nothing to reset
+• trades taken today, per trader, for the cooldown rules
+• open exposure per trader / symbol
+• every change is one atomic UPSERT; any number of threads or processes can
+  update concurrently without lost updates, and every read is a primary-key
+  or index lookup
+• state.json / cooldown.json are imported once when the tables are created,
+  and only if they were written today (yesterday's loss is not today's)
+"""
+from __future__ import annotations
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+DB_PATH = "state.db"
+KEEP_DAYS = 30          # older daily rows are pruned at rollover
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS risk_daily(
+    day TEXT NOT NULL, name TEXT NOT NULL, value REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY(day, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS risk_trades(
+    id INTEGER PRIMARY KEY, day TEXT NOT NULL, trader TEXT NOT NULL,
+    symbol TEXT, ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS risk_trades_day_trader ON risk_trades(day, trader);
+CREATE TABLE IF NOT EXISTS risk_exposure(
+    trader TEXT NOT NULL, symbol TEXT NOT NULL, notional REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY(trader, symbol)
+) WITHOUT ROWID;
+"""
+
+
+def utc_day(ts: float|None = None) -> str:
+    return datetime.fromtimestamp(time.time() if ts is None else ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+class RiskStore:
+    """Thread-safe handle; each thread gets its own connection."""
+
+    def __init__(self, db: str|os.PathLike = DB_PATH, clock=time.time):
+        self.db = str(db)
+        self.clock = clock
+        self._local = threading.local()
+        self._day = None
+        con = self._con()
+        con.execute("BEGIN IMMEDIATE")      # one process creates the tables and imports
+        try:
+            if not con.execute("SELECT 1 FROM sqlite_master WHERE name = 'risk_daily'").fetchone():
+                for stmt in SCHEMA.split(";"):
+                    if stmt.strip():
+                        con.execute(stmt)
+                self._import_json()
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+
+    def _con(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            # autocommit: each UPSERT is its own atomic transaction
+            con = sqlite3.connect(self.db, timeout=10, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def close(self):
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+    def today(self) -> str:
+        day = utc_day(self.clock())
+        if day != self._day:
+            self._day = day
+            self._rollover(day)
+        return day
+
+    def _rollover(self, day: str):
+        cutoff = utc_day(datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+                         - KEEP_DAYS * 86_400)
+        con = self._con()
+        con.execute("DELETE FROM risk_daily WHERE day < ?", (cutoff,))
+        con.execute("DELETE FROM risk_trades WHERE day < ?", (cutoff,))
+
+    # daily counters
+    def add(self, name: str, amount: float) -> float:
+        """Atomically add to today's counter; returns the new value."""
+        row = self._con().execute(
+            "INSERT INTO risk_daily(day, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(day, name) DO UPDATE SET value = value + excluded.value RETURNING value",
+            (self.today(), name, amount)).fetchall()   # fetch all: ends the statement
+        return row[0][0]
+
+    def get(self, name: str) -> float:
+        row = self._con().execute("SELECT value FROM risk_daily WHERE day = ? AND name = ?",
+                                  (self.today(), name)).fetchone()
+        return row[0] if row else 0.0
+
+    def set(self, name: str, value: float):
+        self._con().execute(
+            "INSERT INTO risk_daily(day, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(day, name) DO UPDATE SET value = excluded.value",
+            (self.today(), name, value))
+
+    # trades today
+    def record_trade(self, trader: str, symbol: str|None = None) -> int:
+        """Log a trade for today; returns the trader's trade count today."""
+        day = self.today()
+        con = self._con()
+        con.execute("INSERT INTO risk_trades(day, trader, symbol, ts) VALUES (?, ?, ?, ?)",
+                    (day, trader.lower(), symbol, self.clock()))
+        return self.trades_today(trader)
+
+    def trades_today(self, trader: str|None = None) -> int:
+        if trader is None:
+            q, args = "SELECT COUNT(*) FROM risk_trades WHERE day = ?", (self.today(),)
+        else:
+            q, args = ("SELECT COUNT(*) FROM risk_trades WHERE day = ? AND trader = ?",
+                       (self.today(), trader.lower()))
+        return self._con().execute(q, args).fetchone()[0]
+
+    # exposure
+    def add_exposure(self, trader: str, symbol: str, notional: float) -> float:
+        """Atomically change open notional for trader/symbol; returns the new value."""
+        row = self._con().execute(
+            "INSERT INTO risk_exposure(trader, symbol, notional) VALUES (?, ?, ?) "
+            "ON CONFLICT(trader, symbol) DO UPDATE SET notional = notional + excluded.notional "
+            "RETURNING notional",
+            (trader.lower(), symbol, notional)).fetchall()
+        return row[0][0]
+
+    def exposure(self, trader: str, symbol: str|None = None) -> float:
+        if symbol is None:
+            q, args = "SELECT TOTAL(notional) FROM risk_exposure WHERE trader = ?", (trader.lower(),)
+        else:
+            q, args = ("SELECT TOTAL(notional) FROM risk_exposure WHERE trader = ? AND symbol = ?",
+                       (trader.lower(), symbol))
+        return self._con().execute(q, args).fetchone()[0]
+
+    # one-time import of the old JSON files
+    def _import_json(self, state_file: str = "state.json", cooldown_file: str = "cooldown.json"):
+        # the files carry no day of their own: only counters written today are today's
+        try:
+            with open(state_file) as f:
+                state = json.load(f)
+            if state.get("daily_loss") and self._file_day(state_file, state.get("date")) == self.today():
+                self.set("daily_loss", state["daily_loss"])
+        except (OSError, ValueError, AttributeError):
+            pass
+        try:
+            with open(cooldown_file) as f:
+                cd = json.load(f)
+            if self._file_day(cooldown_file, cd.get("timestamp")) != self.today():
+                return
+        except (OSError, ValueError, AttributeError):
+            return
+        if cd.get("total_loss"):
+            self.set("total_loss", cd["total_loss"])
+        for t in cd.get("trades_today") or []:
+            if isinstance(t, dict) and t.get("trader"):
+                self.record_trade(t["trader"], t.get("symbol"))
+
+    @staticmethod
+    def _file_day(path: str, stamp=None) -> str:
+        """UTC day of a state file: its own date / timestamp field, else when it was last written."""
+        if isinstance(stamp, (int, float)) and not isinstance(stamp, bool):
+            return utc_day(stamp / 1000 if stamp > 1e11 else stamp)
+        if isinstance(stamp, str) and stamp[:10].count("-") == 2:
+            return stamp[:10]
+        return utc_day(os.path.getmtime(path))
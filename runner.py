@@ -1,14 +1,22 @@
 import os
 import json
 import time
+import hashlib
 import logging
+import threading
 from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+import developerparserv2 as parser
+from discord_export import iter_json_items, offset_mark, resume_offset
+from seen_cache import SeenCache, DB_PATH
+
 # CONFIG
 EXPORT_FOLDER = "live_exports"
 RUN_MODE = "LIVE"  # Set to "DEMO" or "LIVE"
+DEBOUNCE = 0.2     # seconds of quiet before a changed file is read
+SIGNALS_SOURCE = "live"   # processed-table namespace shared by all watched files
 
 # Logger Setup (emoji-safe)
 logging.basicConfig(
@@ -18,29 +26,230 @@ logging.basicConfig(
 )
 logger = logging.getLogger("Bot")
 
+def handle_trade(trade):
+    trader = trade.get("trader")
+    symbol = trade.get("symbol")
+    direction = trade.get("direction")
+    entry = trade.get("entry")
+    stop = trade.get("stop")
+    tp1 = trade.get("tp1")
+    logger.info(f"📈 Trade from {trader}: {direction} {symbol} at {entry}, SL: {stop}, TP1: {tp1}")
+    # Future: Add trade execution or routing logic here
+
+def signal_id(item: dict) -> str:
+    """Discord message id when there is one, else a hash of the signal."""
+    if item.get("id"):
+        return str(item["id"])
+    return hashlib.sha1(json.dumps(item, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+def _as_trades(group: list[dict], trader: str) -> list[dict]:
+    """Trades of one closed group of raw Discord messages, keyed by its first message."""
+    trades, _ = parser.extract_trades(group)
+    sid = signal_id(group[0])
+    return [{"trader": trader, "symbol": t["symbol"], "direction": t["side"], "entry": t["entry"],
+             "stop": t["sl"], **{f"tp{i}": tp for i, tp in enumerate(t["tp"][:3], 1)},
+             "timestamp": t.get("ts"), "id": sid if n == 0 else f"{sid}:{n}"}
+            for n, t in enumerate(trades)]
+
+def _plain(item: dict) -> dict:
+    """A message as read, without the parser's cached fields, for the saved state."""
+    return {k: v for k, v in item.items() if not k.startswith("_")}
+
+def _update_context(trade: dict) -> dict:
+    """What update_executor.classify needs of the signal an update follows."""
+    return {"symbol": trade.get("symbol"), "tp": [trade[k] for k in ("tp1", "tp2", "tp3") if trade.get(k)]}
+
+class LiveIngestor:
+    """Reads only what was appended to each watched file since the last read.
+
+    The byte offset after the last element read (plus a signature of the bytes
+    just before it) is kept per file in state.db's checkpoints table, so the
+    cost of a change is the size of the change, not of latest.json. A rewritten
+    file whose prefix no longer matches is re-read from the start; every
+    signal is checked against the processed table, so nothing is handed on twice.
+
+    Raw Discord messages are grouped as the parser groups them (one author,
+    at most GROUP_WINDOW apart), so a signal split over several messages is
+    parsed whole: a group is parsed, marked processed and handed on only
+    once it is closed – by the next message or, failing that, by the clock.
+    The open group is kept with the offsets.
+
+    Follow-up messages ("TP1 hit", "SL to BE") go to `updates` (an
+    update_executor.UpdateExecutor), keyed by the id of the file's latest
+    signal, which is kept with the offsets so it survives a restart.
+    """
+
+    def __init__(self, on_trade=handle_trade, db=DB_PATH, debounce=DEBOUNCE, updates=None, clock=time.time):
+        self.on_trade = on_trade
+        self.updates = updates
+        self.db = db
+        self.debounce = debounce
+        self.clock = clock
+        self._cache = None
+        self._offsets = {}
+        self._pending = {}          # path -> time of the latest event
+        self._closing = {}          # path -> monotonic time its open message group closes
+        self._wake = threading.Condition()
+        self._stop = False
+
+    @property
+    def cache(self) -> SeenCache:
+        # created lazily on the thread that ingests (sqlite3 connections are per thread)
+        if self._cache is None:
+            self._cache = SeenCache(self.db)
+        return self._cache
+
+    # events
+    def notify(self, path):
+        """Note a change; bursts of events for one file collapse into one read."""
+        with self._wake:
+            self._pending[os.path.abspath(path)] = time.monotonic()
+            self._wake.notify()
+
+    def run(self):
+        """Ingest changed files until stop(); meant for a worker thread."""
+        while True:
+            with self._wake:
+                while not self._pending and not self._closing and not self._stop:
+                    self._wake.wait()
+                if self._stop:
+                    break
+                now = time.monotonic()
+                due = [p for p, t in self._pending.items() if now - t >= self.debounce]
+                due += [p for p, t in self._closing.items() if t <= now and p not in due]
+                if not due:
+                    wake = [t + self.debounce for t in self._pending.values()] + list(self._closing.values())
+                    self._wake.wait(min(wake) - now)
+                    continue
+                for p in due:
+                    self._pending.pop(p, None)
+                    self._closing.pop(p, None)
+            for p in due:
+                self.ingest(p)
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+    def stop(self):
+        with self._wake:
+            self._stop = True
+            self._wake.notify()
+
+    # reading
+    def ingest(self, path) -> int:
+        """Hand on the new signals of one file; returns how many there were."""
+        path = Path(path).resolve()
+        source = f"live:{path.as_posix()}"
+        saved = self._offsets.get(source)
+        if saved is None:
+            saved = self._offsets[source] = self.cache.load_state(source)
+        trader = path.parent.name
+
+        group = saved.get("group") or []                # the open message group, not yet processed
+        held = {signal_id(m) for m in group}
+        signals, messages, end = [], [], 0
+        try:
+            with path.open("rb") as fh:
+                offset = end = resume_offset(fh, saved)
+                try:
+                    for item, end in iter_json_items(fh, offset):
+                        if not isinstance(item, dict):
+                            continue
+                        sid = signal_id(item)
+                        if "symbol" in item:                # ready-made signal dict
+                            if self.cache.mark(SIGNALS_SOURCE, sid):
+                                signals.append(item)
+                        elif sid not in held and not self.cache.has(SIGNALS_SOURCE, sid):
+                            held.add(sid)
+                            messages.append(item)
+                except ValueError:
+                    pass            # still being written – the next event picks up the rest
+                if end:
+                    saved = {**offset_mark(fh, end), "last": saved.get("last"), "group": group}
+        except OSError as e:
+            self.cache.rollback()
+            logger.error(f"❌ Failed to read {path}: {e}")
+            return 0
+
+        todo, last = [], saved.get("last")      # [message id, trade] of the latest signal
+        for item in signals:
+            last = [signal_id(item), item]
+            todo.append((item, None))
+        closed, group = self._split_groups(group + messages)
+        for msgs in closed:
+            for m in msgs:
+                self.cache.mark(SIGNALS_SOURCE, signal_id(m))
+            trades = _as_trades(msgs, trader)
+            for trade in trades:
+                last = [trade["id"], trade]
+                todo.append((trade, None))
+            if trades or not last or self.updates is None:
+                continue
+            for m in msgs:
+                if parser.UPDATE_RGX.search(m.get("content") or ""):
+                    todo.append((None, (last[0], m["content"], _update_context(last[1]), m.get("id"))))
+        saved = {**saved, "last": last, "group": [_plain(m) for m in group]}
+        self._offsets[source] = saved
+        with self._wake:
+            if group:
+                left = parser.GROUP_WINDOW.total_seconds() - (self.clock() - parser._msg_ts(group[-1]).timestamp())
+                self._closing[str(path)] = time.monotonic() + max(left, 0.0)
+            else:
+                self._closing.pop(str(path), None)
+        self.cache.save_state(source, saved)
+        self.cache.commit()         # recorded before dispatch: a signal is never handed on twice
+
+        count = 0
+        for trade, update in todo:
+            try:
+                if update is not None:
+                    self.updates.add(*update)
+                    continue
+                count += 1
+                self.on_trade(trade)
+            except Exception as e:
+                logger.error(f"❌ Failed to handle {'update' if update else 'signal'} from {path}: {e}")
+        if count:
+            logger.info(f"📝 {count} new trade(s) from {path}")
+        return count
+
+    def _split_groups(self, messages: list[dict]) -> tuple[list[list[dict]], list[dict]]:
+        """Closed message groups, and the last one if it may still grow (parser's GROUP_WINDOW rule)."""
+        groups = list(parser._group_messages(messages))
+        if groups:
+            age = self.clock() - parser._msg_ts(groups[-1][-1]).timestamp()
+            if age <= parser.GROUP_WINDOW.total_seconds():
+                return groups[:-1], groups[-1]
+        return groups, []
+
 def process_trade_file(filepath):
+    """One-shot read of a whole file (kept for manual runs)."""
     try:
         with open(filepath, "r", encoding="utf-8") as f:
             trades = json.load(f)
         logger.info(f"📝 Loaded {len(trades)} trade(s) from {filepath}")
         for trade in trades:
-            trader = trade.get("trader")
-            symbol = trade.get("symbol")
-            direction = trade.get("direction")
-            entry = trade.get("entry")
-            stop = trade.get("stop")
-            tp1 = trade.get("tp1")
-            logger.info(f"📈 Trade from {trader}: {direction} {symbol} at {entry}, SL: {stop}, TP1: {tp1}")
-            # Future: Add trade execution or routing logic here
+            handle_trade(trade)
     except Exception as e:
         logger.error(f"❌ Failed to process {filepath}: {e}")
 
 class TradeFileHandler(FileSystemEventHandler):
+    def __init__(self, ingestor: LiveIngestor):
+        self.ingestor = ingestor
+
+    def _changed(self, path):
+        if path.endswith("latest.json"):
+            self.ingestor.notify(path)
+
     def on_modified(self, event):
-        if event.is_directory or not event.src_path.endswith("latest.json"):
-            return
-        logger.info(f"📂 Detected update: {event.src_path}")
-        process_trade_file(event.src_path)
+        if not event.is_directory:
+            self._changed(event.src_path)
+
+    on_created = on_modified
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._changed(event.dest_path)
 
 def watch_folder(folder_path):
     abs_path = os.path.abspath(folder_path)
@@ -48,7 +257,13 @@ def watch_folder(folder_path):
     logger.info(f"[Bot] Watching folder: {abs_path}")
     logger.info("[Bot] Watching for new exports...")
 
-    event_handler = TradeFileHandler()
+    # no update_executor yet: handle_trade only logs, so there are no positions for follow-ups
+    # to act on; pass updates=UpdateExecutor() once entries go through order_router
+    ingestor = LiveIngestor()
+    worker = threading.Thread(target=ingestor.run, name="ingest", daemon=True)
+    worker.start()
+
+    event_handler = TradeFileHandler(ingestor)
     observer = Observer()
     observer.schedule(event_handler, abs_path, recursive=True)
     observer.start()
@@ -59,6 +274,8 @@ def watch_folder(folder_path):
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    ingestor.stop()
+    worker.join()
 
 if __name__ == "__main__":
     watch_folder(EXPORT_FOLDER)
@@ -1 +1,81 @@
-# seen_cache.py placeholder
+"""
+seen_cache.py  –  checkpoint index on state.db
+----------------------------------------------
+• processed(id TEXT PRIMARY KEY) records every message a consumer has
+  handled, keyed "<source>#<message id>"; a source is one export file or
+  live feed, so the same message can be tracked separately per consumer
+• zip members that were read completely are recorded as
+  "<source>#<member>@<crc32>:<size>" and skipped unopened while unchanged
+• checkpoints(source, state) holds small JSON state carried between runs
+  (e.g. the parser's open message group and last trade)
+• everything for one run is committed in a single transaction
+"""
+from __future__ import annotations
+import json
+import os
+import sqlite3
+from typing import Iterable
+
+DB_PATH = "state.db"
+
+
+class SeenCache:
+    def __init__(self, db: str|os.PathLike = DB_PATH):
+        self.con = sqlite3.connect(db)
+        self.con.execute("CREATE TABLE IF NOT EXISTS processed(id TEXT PRIMARY KEY)")
+        self.con.execute("CREATE TABLE IF NOT EXISTS checkpoints(source TEXT PRIMARY KEY, state TEXT)")
+        self.con.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.con.close()
+
+    @staticmethod
+    def key(source: str, item: str) -> str:
+        return f"{source}#{item}"
+
+    def seen(self, source: str) -> set[str]:
+        """Every item recorded for source (without the "<source>#" prefix)."""
+        # '$' sorts right after '#', so this is a primary-key range scan
+        rows = self.con.execute("SELECT id FROM processed WHERE id >= ? AND id < ?",
+                                (source + "#", source + "$"))
+        cut = len(source) + 1
+        return {r[0][cut:] for r in rows}
+
+    def add(self, source: str, items: Iterable[str]):
+        self.con.executemany("INSERT OR IGNORE INTO processed(id) VALUES (?)",
+                             ((self.key(source, i),) for i in items))
+
+    def has(self, source: str, item: str) -> bool:
+        """Whether one item is recorded; a primary-key lookup."""
+        return self.con.execute("SELECT 1 FROM processed WHERE id = ?", (self.key(source, item),)).fetchone() is not None
+
+    def mark(self, source: str, item: str) -> bool:
+        """Record one item; False if it had been recorded already."""
+        cur = self.con.execute("INSERT OR IGNORE INTO processed(id) VALUES (?)", (self.key(source, item),))
+        return cur.rowcount == 1
+
+    def load_state(self, source: str) -> dict:
+        row = self.con.execute("SELECT state FROM checkpoints WHERE source = ?", (source,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save_state(self, source: str, state: dict):
+        self.con.execute("INSERT OR REPLACE INTO checkpoints(source, state) VALUES (?, ?)",
+                         (source, json.dumps(state)))
+
+    def commit(self):
+        self.con.commit()
+
+    def rollback(self):
+        self.con.rollback()
+
+    def forget(self, source: str):
+        """Drop everything recorded for source, so the next run starts over."""
+        self.con.execute("DELETE FROM processed WHERE id >= ? AND id < ?", (source + "#", source + "$"))
+        self.con.execute("DELETE FROM checkpoints WHERE source = ?", (source,))
+        self.con.commit()
@@ -0,0 +1,318 @@
+"""
+stop_manager.py  –  attached TP/SL orders per position, amended in place
+------------------------------------------------------------------------
+• every position (keyed by the signal's message id) gets exchange-side
+  tp/sl orders: one "sl" leg for the full size, one "tp1", "tp2" … leg per
+  target, the size split evenly; client order ids come from order_intents,
+  so re-attaching after a restart is a no-op at the exchange
+• moving a stop is one amend request where the exchange module confirms
+  its amend endpoint (AMEND_TPSL); otherwise, or when the amend request
+  fails, the new stop is placed first and the old one canceled after it –
+  never cancel-first, so the position is not left naked in between; the
+  new stop is only withdrawn again when the old one is confirmed still
+  open (an unanswered cancel is checked against the open tp/sl orders)
+• several moves (a trader's "all to breakeven") go out as one batch-amend
+  request, at most BATCH_MAX orders per request (replacements: one cancel
+  for the whole batch)
+• the book lives in memory and in state.db (table stops, WAL), so a
+  restarted bot still knows which order protects which position
+usage:
+    stops = StopManager(blofin_live)          # any module with place_tpsl / cancel_tpsl / amend_tpsl …
+    stops.attach("1357…", "BTC-USDT", "LONG", 0.01, entry=64000, sl=63000, tps=[65000, 66000])
+    stops.move_sl("1357…", 63500)
+    stops.breakeven(["1357…", "2468…"])       # one request
+    move_order(blofin_live, tpsl_id, 63500)   # a stop outside the book (blofin_live.move_sl)
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable
+
+from order_intents import client_order_id, order_id_of
+
+DB_PATH = "state.db"
+BATCH_MAX = 20          # orders per batch-amend request (exchange limit)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stops(
+    key TEXT NOT NULL, leg TEXT NOT NULL, symbol TEXT NOT NULL, side TEXT NOT NULL,
+    entry REAL, size REAL, tp REAL, sl REAL, tpsl_id TEXT, updated REAL NOT NULL,
+    PRIMARY KEY(key, leg)
+) WITHOUT ROWID;
+"""
+COLUMNS = ("key", "leg", "symbol", "side", "entry", "size", "tp", "sl", "tpsl_id", "updated")
+
+
+def close_side(side: str) -> str:
+    """Order side that closes a position opened with `side`."""
+    return "sell" if side.upper() in ("LONG", "BUY") else "buy"
+
+def tpsl_id_of(res: Any) -> str|None:
+    """Exchange id of a tp/sl order from a place_tpsl result."""
+    data = res.get("data", res) if isinstance(res, dict) else None
+    if isinstance(data, dict) and data.get("tpslId") is not None:
+        return str(data["tpslId"])
+    return order_id_of(res)
+
+def amended_ids(res: Any) -> set[str]:
+    """Order ids an amend / batch-amend result reports as done."""
+    if not isinstance(res, dict):
+        return set()
+    data = res.get("data", res)
+    items = data if isinstance(data, list) else [data]
+    return {str(i.get("tpslId", i.get("id"))) for i in items
+            if isinstance(i, dict) and str(i.get("code", "0")) == "0"}
+
+def pending_orders(res: Any) -> dict[str, dict]|None:
+    """tpsl id -> order from a pending_tpsl result; None when the read failed."""
+    data = res.get("data") if isinstance(res, dict) else None
+    if not isinstance(data, list):
+        return None
+    return {str(o["tpslId"]): o for o in data if isinstance(o, dict) and o.get("tpslId") is not None}
+
+
+class StopManager:
+    """Thread-safe; each thread gets its own connection, the book is shared."""
+
+    def __init__(self, exchange, db: str|os.PathLike = DB_PATH, clock=time.time):
+        self.exchange = exchange
+        self.db = str(db)
+        self.clock = clock
+        self._local = threading.local()
+        self._book: dict[str, dict[str, dict]] | None = None     # key -> leg -> row, loaded on first use
+        self._lock = threading.RLock()
+        self.requests = 0       # exchange calls made, for latency accounting
+
+    def _con(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.db, timeout=10, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.executescript(SCHEMA)
+            self._local.con = con
+        return con
+
+    def close(self):
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+    @property
+    def book(self) -> dict[str, dict[str, dict]]:
+        with self._lock:
+            if self._book is None:
+                cur = self._con().execute(f"SELECT {', '.join(COLUMNS)} FROM stops")
+                book: dict[str, dict[str, dict]] = {}
+                for r in cur.fetchall():
+                    row = dict(zip(COLUMNS, r))
+                    book.setdefault(row["key"], {})[row["leg"]] = row
+                self._book = book
+            return self._book
+
+    def _save(self, row: dict):
+        row["updated"] = self.clock()
+        self._con().execute(f"INSERT OR REPLACE INTO stops({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                            [row[c] for c in COLUMNS])
+
+    def _call(self, name: str, *args, **kw):
+        self.requests += 1
+        return getattr(self.exchange, name)(*args, **kw)
+
+    # ── book ──────────────────────────────────────────────────
+    def get(self, key) -> dict[str, dict]:
+        """The position's legs ({"sl": row, "tp1": row …}); empty if none are attached."""
+        with self._lock:
+            return {leg: dict(row) for leg, row in self.book.get(str(key), {}).items()}
+
+    def positions(self) -> list[str]:
+        with self._lock:
+            return list(self.book)
+
+    def sl(self, key) -> float|None:
+        row = self.book.get(str(key), {}).get("sl")
+        return row["sl"] if row else None
+
+    def entry(self, key) -> float|None:
+        legs = self.book.get(str(key), {})
+        return next((row["entry"] for row in legs.values() if row["entry"] is not None), None)
+
+    def size(self, key) -> float:
+        """Position size the legs protect: the sl leg's, else the tp legs' together."""
+        legs = self.book.get(str(key), {})
+        if "sl" in legs:
+            return legs["sl"]["size"]
+        return sum(row["size"] for row in legs.values())
+
+    # ── placing ───────────────────────────────────────────────
+    def attach(self, key, symbol: str, side: str, qty: float, entry: float|None = None,
+               sl: float|None = None, tps: Iterable[float] = ()) -> dict[str, dict]:
+        """Place the sl leg and one tp leg per target; legs already attached are left alone."""
+        key = str(key)
+        tps = [tp for tp in tps if tp]
+        legs = ([("sl", qty, None, sl)] if sl else []) + \
+               [(f"tp{i}", qty / len(tps), tp, None) for i, tp in enumerate(tps, 1)]
+        with self._lock:
+            have = self.book.setdefault(key, {})
+            for leg, size, tp, stop in legs:
+                if leg in have:
+                    continue
+                res = self._call("place_tpsl", symbol, close_side(side), size, tp=tp, sl=stop,
+                                 client_order_id=client_order_id(key, leg))
+                tid = tpsl_id_of(res)
+                if tid is None:
+                    continue
+                have[leg] = row = {"key": key, "leg": leg, "symbol": symbol, "side": side.upper(),
+                                   "entry": entry, "size": size, "tp": tp, "sl": stop, "tpsl_id": tid}
+                self._save(row)
+            if not have:
+                del self.book[key]
+        return self.get(key)
+
+    # ── moving ────────────────────────────────────────────────
+    def move_sl(self, key, sl: float) -> bool:
+        """Amend the position's stop in place: one request."""
+        return self.move_sls({key: sl}).get(str(key), False)
+
+    def move_sls(self, moves: dict) -> dict[str, bool]:
+        """Move several stops ({key: new_sl}); one batch request per BATCH_MAX orders.
+
+        Returns key -> moved; a position without an sl leg, or whose stop is
+        gone at the exchange (triggered), is False, one already at the price
+        is True without a request.
+        """
+        amend = getattr(self.exchange, "AMEND_TPSL", False)
+        done: dict[str, bool] = {}
+        with self._lock:
+            todo = []
+            for key, sl in moves.items():
+                key = str(key)
+                row = self.book.get(key, {}).get("sl")
+                if row is None or sl is None:
+                    done[key] = False
+                elif row["sl"] == sl:
+                    done[key] = True
+                else:
+                    todo.append((row, sl))
+            for i in range(0, len(todo), BATCH_MAX):
+                chunk = todo[i:i + BATCH_MAX]
+                res = None
+                if amend and len(chunk) == 1:
+                    row, sl = chunk[0]
+                    res = self._call("amend_tpsl", row["tpsl_id"], sl=sl)
+                elif amend:
+                    res = self._call("amend_tpsl_batch", [{"tpsl_id": row["tpsl_id"], "sl": sl} for row, sl in chunk])
+                if res is None:                 # no amend, or the request itself failed
+                    done.update(self._replace(chunk))
+                    continue
+                ok = amended_ids(res)
+                for row, sl in chunk:
+                    done[row["key"]] = row["tpsl_id"] in ok
+                    if done[row["key"]]:
+                        row["sl"] = sl
+                        self._save(row)
+        return done
+
+    def _open_ids(self, symbols: Iterable[str]) -> set[str]|None:
+        """Ids of the tp/sl orders still open for these symbols; None if they cannot be read."""
+        if not hasattr(self.exchange, "pending_tpsl"):
+            return None
+        ids: set[str] = set()
+        for symbol in set(symbols):
+            orders = pending_orders(self._call("pending_tpsl", symbol))
+            if orders is None:
+                return None
+            ids.update(orders)
+        return ids
+
+    def _replace(self, chunk: list[tuple[dict, float]]) -> dict[str, bool]:
+        """Move stops without amend: place each new stop, then cancel the old ones in one request.
+
+        An old stop the cancel does not confirm is looked up among the open
+        tp/sl orders: only if it is still there is the new one withdrawn.
+        Gone, or unknown because the lookup failed too, the new stop stays
+        (two stops beat none) and an unknown old one is sent its cancel again.
+        """
+        placed = []
+        for row, sl in chunk:
+            res = self._call("place_tpsl", row["symbol"], close_side(row["side"]), row["size"], sl=sl,
+                             client_order_id=client_order_id(row["key"], f"sl@{sl}"))
+            tid = tpsl_id_of(res)
+            if tid is not None:                 # else the old stop stays as it was
+                placed.append((row, sl, tid))
+        done = {row["key"]: False for row, _ in chunk}
+        if not placed:
+            return done
+        canceled = amended_ids(self._call("cancel_tpsl", [row["tpsl_id"] for row, _, _ in placed]))
+        unsure = [row for row, _, _ in placed if row["tpsl_id"] not in canceled]
+        still_open = self._open_ids(row["symbol"] for row in unsure) if unsure else set()
+        stale, retry = [], []
+        for row, sl, tid in placed:
+            old = row["tpsl_id"]
+            if old not in canceled:
+                if still_open is not None and old in still_open:
+                    stale.append(tid)           # the old stop still protects the position
+                    continue
+                if still_open is None:
+                    retry.append(old)
+            row["tpsl_id"], row["sl"] = tid, sl
+            self._save(row)
+            done[row["key"]] = True
+        if stale:
+            self._call("cancel_tpsl", stale)
+        if retry:
+            self._call("cancel_tpsl", retry)
+        return done
+
+    def breakeven(self, keys: Iterable) -> dict[str, bool]:
+        """Move each position's stop to its entry, all in one batch."""
+        with self._lock:
+            moves = {str(k): self.entry(k) for k in keys}
+        return self.move_sls(moves)
+
+    # ── removing ──────────────────────────────────────────────
+    def detach(self, key) -> bool:
+        """Cancel every leg of the position in one request and forget it."""
+        key = str(key)
+        with self._lock:
+            legs = self.book.get(key)
+            if not legs:
+                return False
+            if self._call("cancel_tpsl", [row["tpsl_id"] for row in legs.values()]) is None:
+                return False
+            self.forget(key)
+        return True
+
+    def forget(self, key):
+        """Drop a closed position from the book (its orders are gone at the exchange)."""
+        key = str(key)
+        with self._lock:
+            self.book.pop(key, None)
+            self._con().execute("DELETE FROM stops WHERE key = ?", (key,))
+
+
+def move_order(exchange, tpsl_id, sl: float) -> dict|None:
+    """Move one stop known only by its exchange id, the way StopManager moves its own.
+
+    The order is read from the open tp/sl orders, so no book is needed;
+    returns {"tpslId", "sl"} of the stop now in place, None if it could not move.
+    """
+    orders = pending_orders(exchange.pending_tpsl())
+    order = (orders or {}).get(str(tpsl_id))
+    if order is None:
+        return None
+    key = str(tpsl_id)
+    side = "SELL" if order["side"].upper() in ("BUY", "LONG") else "BUY"     # position side
+    stops = StopManager(exchange, ":memory:")
+    stops.book[key] = {"sl": {"key": key, "leg": "sl", "symbol": order["symbol"], "side": side,
+                              "entry": None, "size": float(order["size"]), "tp": None,
+                              "sl": float(order.get("slTriggerPrice") or 0) or None, "tpsl_id": key}}
+    try:
+        if not stops.move_sl(key, sl):
+            return None
+        return {"tpslId": stops.book[key]["sl"]["tpsl_id"], "sl": sl}
+    finally:
+        stops.close()
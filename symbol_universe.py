@@ -0,0 +1,256 @@
+"""
+symbol_universe.py  –  lazy, offline-first ticker universe shared by the parsers
+-------------------------------------------------------------------------------
+• nothing is read at import; the index is loaded on the first lookup
+• symbols (CoinGecko), aliases (BTCUSDT → BTC …) and BloFin-listed perps live
+  in one compact binary file, symbols.idx, searched in place (no JSON parse)
+• a stale or missing index is refreshed on a daemon thread; lookups keep
+  answering from what is on disk, and with no network nothing else changes
+• symbols.json stays the raw CoinGecko cache, so older tools keep working
+
+index layout (little-endian): MAGIC, then four sorted string tables –
+symbols, alias keys, alias values (parallel to the keys), perps – each
+    u32 count | u32 offsets[count+1] | utf-8 blob
+"""
+from __future__ import annotations
+import json
+import os
+import pathlib
+import ssl
+import struct
+import threading
+import time
+import urllib.request
+from typing import Iterable, Iterator
+
+try:
+    import certifi
+except ImportError:  # optional – fall back to the system CA store
+    certifi = None
+
+SYMBOLS_JSON = "symbols.json"
+INDEX_PATH   = "symbols.idx"
+MAX_AGE      = 86_400
+COINGECKO_URL = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
+PERPS_URL     = "https://api.blofin.com/api/v1/market/instruments?instType=SWAP"
+MAGIC = b"RPSYMIX1"
+
+# Map common aliases or suffix variants to canonical symbols
+ALIAS_MAP = {
+    "BTCUSDT": "BTC",
+    "ETHUSDT": "ETH",
+    "PEPE3L": "PEPE",
+    "ORDIPERP": "ORDI",
+    "GMXUSDT": "GMX",
+    "APT-PERP": "APT",
+    "RNDRPERP": "RNDR",
+    "FLOKIUSDT": "FLOKI",
+    # Add more as needed
+}
+
+_U32 = struct.Struct("<I")
+_U32x2 = struct.Struct("<2I")
+
+
+# ── index file ───────────────────────────────────────────────
+def _pack_table(keys: list[str]) -> bytes:
+    blob = [k.encode("utf-8") for k in keys]
+    offs, pos = [0], 0
+    for b in blob:
+        pos += len(b)
+        offs.append(pos)
+    return _U32.pack(len(blob)) + struct.pack(f"<{len(offs)}I", *offs) + b"".join(blob)
+
+def build_index(symbols: Iterable[str], aliases: dict[str,str], perps: Iterable[str],
+                path: str|os.PathLike = INDEX_PATH) -> pathlib.Path:
+    """Write the binary index atomically and return its path."""
+    alias_keys = sorted(aliases)
+    data = b"".join([MAGIC,
+                     _pack_table(sorted(set(symbols))),
+                     _pack_table(alias_keys),
+                     _pack_table([aliases[k] for k in alias_keys]),
+                     _pack_table(sorted(set(perps)))])
+    p = pathlib.Path(path)
+    tmp = p.with_suffix(f"{p.suffix}.{os.getpid()}.tmp")   # parallel workers may race here
+    tmp.write_bytes(data)
+    os.replace(tmp, p)
+    return p
+
+class _Table:
+    """Sorted string table read in place from the index buffer."""
+
+    def __init__(self, buf: bytes, pos: int):
+        self.buf = buf
+        (self.n,) = _U32.unpack_from(buf, pos)
+        self.offs = pos + 4
+        self.blob = self.offs + 4 * (self.n + 1)
+        self.end = self.blob + _U32.unpack_from(buf, self.offs + 4 * self.n)[0]
+
+    def key(self, i: int) -> bytes:
+        a, b = _U32x2.unpack_from(self.buf, self.offs + 4 * i)
+        return self.buf[self.blob + a:self.blob + b]
+
+    def find(self, k: bytes) -> int:
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < k:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.n and self.key(lo) == k else -1
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.key(i).decode("utf-8") for i in range(self.n))
+
+_EMPTY = MAGIC + _pack_table([]) * 4
+
+def _read_tables(buf: bytes) -> tuple[_Table, _Table, _Table, _Table]:
+    """(symbols, alias keys, alias values, perps) from an index buffer."""
+    if not buf.startswith(MAGIC):
+        buf = _EMPTY
+    tables, pos = [], len(MAGIC)
+    for _ in range(4):
+        tables.append(_Table(buf, pos))
+        pos = tables[-1].end
+    return tuple(tables)
+
+
+# ── downloads ────────────────────────────────────────────────
+def _fetch_json(url: str, timeout: float = 10):
+    ctx = ssl.create_default_context(cafile=certifi.where() if certifi else None)
+    with urllib.request.urlopen(url, context=ctx, timeout=timeout) as r:
+        return json.load(r)
+
+def _download_symbols() -> list[str]:
+    return [d["symbol"].upper() for d in _fetch_json(COINGECKO_URL)]
+
+def _download_perps() -> list[str]:
+    data = _fetch_json(PERPS_URL).get("data") or []
+    return [d["instId"].split("-")[0].upper() for d in data if d.get("instId")]
+
+
+# ── universe ─────────────────────────────────────────────────
+class SymbolUniverse:
+    """Set-like view of the valid symbols; ``sym in UNIVERSE`` as before."""
+
+    def __init__(self, index: str|os.PathLike = INDEX_PATH, cache: str|os.PathLike = SYMBOLS_JSON,
+                 max_age: float = MAX_AGE, refresh: bool = True):
+        self.index = pathlib.Path(index)
+        self.cache = pathlib.Path(cache)
+        self.max_age = max_age
+        self.auto_refresh = refresh
+        self._tables = None
+        self._memo: dict[str,bool] = {}
+        self._lock = threading.Lock()
+        self._refreshing = None
+
+    # loading
+    def _load(self):
+        with self._lock:
+            if self._tables is not None:
+                return self._tables
+            if not self._index_current() and self.cache.exists():
+                # local rebuild only – symbols.json is newer than the index
+                try:
+                    syms = json.loads(self.cache.read_text())
+                    build_index(syms, ALIAS_MAP, self._perps_on_disk(), self.index)
+                except (OSError, ValueError) as e:
+                    print(f"[symbols] could not rebuild index: {e}")
+            self._open()
+            cold = self._tables[0].n == 0
+        if self.auto_refresh and (cold or self._stale()):
+            self.refresh(block=cold)        # nothing to look up yet: wait for the first build
+        return self._tables
+
+    def _open(self):
+        try:
+            buf = self.index.read_bytes()
+        except OSError:
+            buf = _EMPTY
+        # tables first: a reader holding the new memo then also sees the new tables
+        self._tables = _read_tables(buf)
+        self._memo = {}
+
+    def _index_current(self) -> bool:
+        try:
+            return (not self.cache.exists()
+                    or self.index.stat().st_mtime >= self.cache.stat().st_mtime)
+        except OSError:
+            return False
+
+    def _stale(self) -> bool:
+        # symbols.json is only rewritten by a successful download
+        try:
+            return time.time() - self.cache.stat().st_mtime > self.max_age
+        except OSError:
+            return True
+
+    def _perps_on_disk(self) -> list[str]:
+        if self._tables is None:
+            try:
+                return list(_read_tables(self.index.read_bytes())[3])
+            except OSError:
+                return []
+        return list(self._tables[3])
+
+    # refresh
+    def refresh(self, block: bool = False):
+        """Re-download symbols and perps; by default on a daemon thread."""
+        if self._refreshing and self._refreshing.is_alive():
+            if block:
+                self._refreshing.join()
+            return
+        self._refreshing = threading.Thread(target=self._refresh, name="symbol-refresh", daemon=True)
+        self._refreshing.start()
+        if block:
+            self._refreshing.join()
+
+    def _refresh(self):
+        try:
+            syms = _download_symbols()
+        except Exception as e:
+            print(f"[symbols] refresh skipped, using cached index: {e}")
+            return
+        try:
+            perps = _download_perps()
+        except Exception:
+            perps = self._perps_on_disk()
+        try:
+            self.cache.write_text(json.dumps(syms))
+            build_index(syms, ALIAS_MAP, perps, self.index)
+        except OSError as e:
+            print(f"[symbols] could not write index: {e}")
+            return
+        with self._lock:
+            self._open()
+
+    # lookups
+    def __contains__(self, sym) -> bool:
+        memo = self._memo           # taken before the tables, so a refresh cannot pair it with stale ones
+        hit = memo.get(sym)
+        if hit is None:
+            if not isinstance(sym, str):
+                return False
+            tables = self._tables or self._load()
+            hit = memo[sym] = tables[0].find(sym.encode("utf-8")) >= 0
+        return hit
+
+    def canonical(self, sym: str) -> str|None:
+        """Alias target for sym (e.g. BTCUSDT → BTC), or None."""
+        keys, vals = (self._tables or self._load())[1:3]
+        i = keys.find(sym.encode("utf-8"))
+        return vals.key(i).decode("utf-8") if i >= 0 else None
+
+    def is_perp(self, sym: str) -> bool:
+        """True if BloFin lists a perpetual for this base symbol."""
+        return (self._tables or self._load())[3].find(sym.encode("utf-8")) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter((self._tables or self._load())[0])
+
+    def __len__(self) -> int:
+        return (self._tables or self._load())[0].n
+
+UNIVERSE = SymbolUniverse()
+VALID_SYMBOLS = UNIVERSE
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import backtest
+from candle_store import CandleStore
+
+
+def _candles(tmp_path, symbol, rows):
+    CandleStore(tmp_path).ingest(symbol, pd.DataFrame(rows, columns=["ts", "open", "high", "low", "close"])
+                                 .assign(volume=0.0))
+
+
+def test_tp_sl_limit_and_sizing(tmp_path):
+    t0, h = 1_700_000_000_000, 3_600_000          # epoch ms
+    _candles(tmp_path, "BTC", [(t0, 100, 101, 99, 100), (t0 + h, 100.2, 101, 99.5, 100.5),
+                               (t0 + 2 * h, 100.5, 103, 99.9, 102), (t0 + 3 * h, 102, 111, 101, 110)])
+    _candles(tmp_path, "ETH", [(t0, 10, 10, 10, 10), (t0 + h, 10.3, 10.6, 9.5, 9.6),
+                               (t0 + 2 * h, 10.7, 10.8, 10.6, 10.7)])
+    trades = pd.DataFrame({
+        "trader": ["fatty", "nobody"], "symbol": ["BTC", "ETH"], "dir": [1, -1],
+        "entry": [100.0, 10.0], "tp": [110.0, 9.0], "sl": [95.0, 10.4], "ts": [t0 + 1, t0 + 1]})
+    gap = trades.iloc[[1]].assign(symbol="ETH", ts=t0 + h + 1)
+    res = backtest.run_backtest(trades, tmp_path, horizon=10, balance=1000).set_index("symbol")
+    gapped = backtest.run_backtest(gap, tmp_path, horizon=10, balance=1000).iloc[0]
+
+    btc = res.loc["BTC"]          # opens at 100.2 (0.2 % away): 50 % now, 50 % limit at 100
+    assert btc["outcome"] == "TP" and btc["exit_px"] == 110.0
+    assert btc["qty_now"] == btc["qty_limit"] == 0.2             # 1000 * 4 % / 100 / 2
+    assert abs(btc["pnl"] - (0.2 * 9.8 + 0.2 * 10.0)) < 1e-9      # limit filled on the 99.9 low
+
+    eth = res.loc["ETH"]          # opens 3 % away: 20 % at market, stop hit in the same candle
+    assert eth["outcome"] == "SL" and eth["qty_limit"] == 0.0
+    assert eth["qty_now"] == round(1000 * 0.01 / 10 * 0.2, 4)
+    assert abs(eth["pnl"] - (-1) * (10.4 - 10.3) * eth["qty_now"]) < 1e-9
+    assert gapped["outcome"] == "SL" and gapped["exit_px"] == 10.7      # opened through the stop
@@ -0,0 +1,59 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import blofin_async
+import blofin_live
+from blofin_mock_server import MockBlofinServer
+
+
+def test_place_orders_concurrent_under_cap(monkeypatch):
+    srv = MockBlofinServer(latency=0.05).start()
+    monkeypatch.setattr(blofin_live, "BASE_URL", srv.url)
+    orders = [{"symbol": "BTC-USDT", "side": "buy", "qty": i + 1} for i in range(12)]
+
+    async def run():
+        try:
+            return await blofin_async.place_orders(orders, concurrency=4)
+        finally:
+            await blofin_async.close_session()
+
+    try:
+        res = asyncio.run(run())
+    finally:
+        srv.shutdown()
+    assert [r["data"]["size"] for r in res] == [str(i + 1) for i in range(12)]
+    assert srv.peak_inflight == 4
+
+
+def test_same_surface_as_blofin_live(monkeypatch):
+    srv = MockBlofinServer().start()
+    monkeypatch.setattr(blofin_live, "BASE_URL", srv.url)
+
+    async def run():
+        try:
+            equity = await blofin_async.get_equity()
+            order = await blofin_async.place_order("ETH-USDT", "sell", 0.5, price=3000)
+            stop = await blofin_async.place_tpsl("ETH-USDT", "buy", 0.5, sl=3200)
+            moved = await blofin_async.move_sl(stop["data"]["tpslId"], 3150)     # new stop first, then cancel
+            amended = await blofin_async.amend_tpsl(moved["tpslId"], sl=3100)
+            gone = await blofin_async.cancel_order("nope")
+            return equity, order, moved, amended, gone
+        finally:
+            await blofin_async.close_session()
+
+    try:
+        equity, order, moved, amended, gone = asyncio.run(run())
+    finally:
+        srv.shutdown()
+    assert equity == 10000.0
+    assert order["data"]["price"] == "3000" and list(srv.orders) == [order["data"]["orderId"]]
+    assert list(srv.tpsl) == [moved["tpslId"]] and srv.tpsl[moved["tpslId"]]["side"] == "BUY"
+    assert amended["code"] == "0" and srv.tpsl[moved["tpslId"]]["slTriggerPrice"] == "3100"
+    assert gone is None
+    for name in ("place_order", "cancel_order", "get_equity", "move_sl",
+                 "place_tpsl", "amend_tpsl", "amend_tpsl_batch", "cancel_tpsl", "pending_tpsl"):
+        assert asyncio.iscoroutinefunction(getattr(blofin_async, name))
+        assert callable(getattr(blofin_live, name))
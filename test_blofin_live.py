@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import blofin_live
+
+
+def _serve(statuses, delay=0.0):
+    """Local API stand-in answering requests with the given status codes in turn."""
+    seen = {"ports": set(), "calls": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = 1 << 16
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            seen["ports"].add(self.client_address[1])
+            status = statuses[min(seen["calls"], len(statuses) - 1)]
+            seen["calls"] += 1
+            time.sleep(delay)
+            body = json.dumps({"code": status, "data": {"orderId": "1"}}).encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, seen
+
+
+def _point_at(monkeypatch, srv):
+    monkeypatch.setattr(blofin_live, "BASE_URL", f"http://127.0.0.1:{srv.server_port}")
+    monkeypatch.setattr(blofin_live, "BACKOFF", 0.001)
+    monkeypatch.setattr(blofin_live, "_metrics", {})
+    blofin_live.close_session()
+
+
+def test_orders_share_one_connection_and_retry_429(monkeypatch):
+    srv, seen = _serve([429, 200])
+    _point_at(monkeypatch, srv)
+    try:
+        for _ in range(5):
+            assert blofin_live.place_order("BTC-USDT", "buy", 0.01)["data"]["orderId"] == "1"
+    finally:
+        blofin_live.close_session()
+        srv.shutdown()
+    assert seen["calls"] == 6 and len(seen["ports"]) == 1
+    stats = blofin_live.latency_stats()["POST /api/v1/trade/order"]
+    assert stats["count"] == 5 and stats["retries"] == 1 and stats["errors"] == 0
+
+
+def test_order_not_resent_after_server_error(monkeypatch):
+    srv, seen = _serve([503])
+    _point_at(monkeypatch, srv)
+    try:
+        assert blofin_live.place_order("BTC-USDT", "buy", 0.01) is None
+    finally:
+        blofin_live.close_session()
+        srv.shutdown()
+    assert seen["calls"] == 1
+
+
+def test_read_timeout_retried_only_for_idempotent_calls(monkeypatch):
+    srv, seen = _serve([200], delay=0.2)
+    _point_at(monkeypatch, srv)
+    monkeypatch.setattr(blofin_live, "READ_TIMEOUT", 0.05)
+    monkeypatch.setattr(blofin_live, "MAX_RETRIES", 2)
+    try:
+        assert blofin_live.get_equity() is None
+        assert seen["calls"] == 3
+        assert blofin_live.place_order("BTC-USDT", "buy", 0.01) is None
+        assert seen["calls"] == 4
+    finally:
+        blofin_live.close_session()
+        srv.shutdown()
+    assert blofin_live.latency_stats()["GET /api/v1/account/balance"]["retries"] == 2
@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import candle_store
+import symbol_universe
+from candle_store import CandleStore
+
+
+def test_canonical_names(tmp_path, monkeypatch):
+    symbols = tmp_path / "symbols.json"
+    symbols.write_text(json.dumps(["BTC", "ETH", "APT", "SOL", "SUSD", "BUSD", "S", "USDT"]))
+    universe = symbol_universe.SymbolUniverse(tmp_path / "symbols.idx", symbols, refresh=False)
+    monkeypatch.setattr(candle_store, "UNIVERSE", universe)     # not the tracked symbols.json
+    assert [candle_store.canonical(s) for s in ("BTCUSDT", "btc-usdt-swap", "eth/usdt", "APT-PERP", "SOL")] \
+        == ["BTC", "BTC", "ETH", "APT", "SOL"]
+    assert [candle_store.canonical(s) for s in ("SUSD", "BUSD", "S-USDT", "USDT", "XYZQQUSDT")] \
+        == ["SUSD", "BUSD", "S", "USDT", "XYZQQUSDT"]                  # one suffix, onto a known base only
+    assert candle_store.symbol_from_path("dumps/BTCUSDT_1h.csv") == "BTC"
+
+
+def test_ingest_merge_and_views(tmp_path):
+    t0, h = 1_700_000_000_000, 3_600_000
+    pd.DataFrame({"timestamp": [t0 // 1000 + 3600 * i for i in (2, 0, 1)], "open": [3, 1, 2],
+                  "high": [3, 1, 2], "low": [3, 1, 2], "close": [3.5, 1.5, 2.5]}).to_csv(
+        tmp_path / "ETHUSDT_1h.csv", index=False)
+    (tmp_path / "eth.json").write_text(json.dumps(          # exchange klines, strings, newest first
+        {"data": [[str(t0 + 3 * h), "4", "4", "4", "4.5", "10"], [str(t0 + 2 * h), "9", "9", "9", "9.5", "7"]]}))
+
+    store = CandleStore(tmp_path / "store")
+    assert store.ingest_file(tmp_path / "ETHUSDT_1h.csv") == ("ETH", 3)
+    assert store.ingest_file(tmp_path / "eth.json", symbol="ETH-USDT") == ("ETH", 4)
+    assert store.symbols() == ["ETH"] and "ethusdt" in store
+
+    c = store.get("ETH")
+    assert c.ts.tolist() == [t0 + i * h for i in range(4)]
+    assert c.open.tolist() == [1, 2, 9, 4] and c.volume.tolist() == [0, 0, 7, 10]   # later ingest wins
+    assert isinstance(c.close.base, np.memmap) or isinstance(c.close, np.memmap)
+    assert store.get("ETH") is c                                                   # map reused
+
+    part = c.between(t0 + h, t0 + 3 * h)
+    assert part.close.tolist() == [2.5, 9.5] and np.shares_memory(part.close, c.close)
+    assert len(c.between(t0 + 10 * h)) == 0
+
+    assert store.price("ETH", t0 + 1) == 2.0             # open of the next candle
+    assert store.price("ETH") == 4.5 and store.price("ETH", t0 + 9 * h) == 4.5
+    assert store.price("DOGE") is None
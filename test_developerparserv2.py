@@ -0,0 +1,109 @@
+import json
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import developerparserv2 as dp
+
+
+def _reference_parse(txt):
+    """The original five-search parse_message, kept as the oracle."""
+    sym_m  = dp.SYMBOL_RE.search(txt)
+    side_m = dp.SIDE_RE.search(txt)
+    ent_m  = dp.ENTRY_RE.search(txt)
+    tp_m   = dp.TP_RE.search(txt)
+    sl_m   = dp.SL_RE.search(txt)
+    if not (sym_m and side_m and ent_m and tp_m and sl_m):
+        return None
+    side = "LONG" if side_m.group(1).upper() in ("LONG", "BUY") else "SHORT"
+    spans = sorted([(ent_m.start(), 'E', ent_m.end()),
+                    (tp_m.start(), 'T', tp_m.end()),
+                    (sl_m.start(), 'S', sl_m.end())])
+    blocks = {k: [float(x) for x in re.findall(dp.NUM_RE, txt[end: spans[i+1][0] if i+1 < len(spans) else len(txt)])]
+              for i, (_, k, end) in enumerate(spans)}
+    e, t, s = blocks['E'], blocks['T'], blocks['S']
+    if not (e and t and s):
+        return None
+    entry = dp._mid(e[0], e[1] if len(e) >= 2 else None)
+    if side == "LONG" and s[0] >= entry:
+        return None
+    if side == "SHORT" and s[0] <= entry:
+        return None
+    return {"symbol": sym_m.group(1).upper(), "side": side, "entry": round(entry, 8),
+            "tp": [round(x, 8) for x in t], "sl": round(s[0], 8)}
+
+
+CASES = [
+    "@Sheik Notif  $HBAR  LONG TRADE\n\nENTRY: 0.167 - 0.1655\n\nTARGET: 0.181\n\nSTOPLOSS: 0.16",
+    "$ETH short entry 3200-3250 tp1 3100 tp2 3000 sl 3300",
+    "Buy zone 1-2 tp 3 sl 0.5",
+    "Sell  Zone 5 tp 4 sl 6",
+    "tp1.5 entry 3 sl 1 long btc",
+    "tp1-2 entry 3 long sl 1",
+    "$long entry 5 tp2.5 6 sl 4",
+    "x\U0001F3AF5 entry 1 long sl 0.2",
+    "invalidation eth long entry 1 tp 2 sl 0.5",
+    "it's long entry 2 tp 3 4 stop loss 1",
+    "1e-5 entry 1e-5 tp 2e-5 sl 0.5e-5 long abc",
+    "gm everyone, no trades today",
+    "SOL long\nentry 150\ntargets 160, 170\ninvalid 140",
+]
+
+
+def test_parse_message_matches_reference():
+    for txt in CASES:
+        assert dp.parse_message(txt) == _reference_parse(txt), txt
+
+
+def test_group_messages_emits_each_message_once():
+    def msg(i, author, ts):
+        return {"id": str(i), "author": {"id": author}, "timestamp": ts, "content": str(i)}
+    msgs = [msg(1, "a", "2025-06-01T00:00:00+00:00"),
+            msg(2, "a", "2025-06-01T00:00:20+00:00"),
+            msg(3, "a", "2025-06-01T00:00:45+00:00"),   # 25 s gap, same run
+            msg(4, "b", "2025-06-01T00:00:50+00:00"),   # new author
+            msg(5, "b", "2025-06-01T00:02:00+00:00"),   # long pause
+            msg(6, "b", "2025-05-01T00:00:00+00:00")]   # earlier export file
+    groups = [[m["id"] for m in g] for g in dp._group_messages(iter(msgs))]
+    assert groups == [["1", "2", "3"], ["4"], ["5"], ["6"]]
+    assert all("_ts" in m for m in msgs)
+
+
+def test_extract_trades_carries_leading_updates():
+    prev = {"symbol": "ETH", "updates": []}
+    msgs = [{"author": {"id": "a"}, "timestamp": "2025-06-01T00:00:00+00:00",
+             "content": "Move SL to BE"}]
+    trades, skipped = dp.extract_trades(iter(msgs), last_trade=prev)
+    assert (trades, skipped) == ([], 0)
+    assert prev["updates"] == ["Move SL to BE"]
+
+
+def test_process_incremental_matches_full_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(dp, "VALID_SYMBOLS", {"ETH", "BTC"})
+    def msg(i, ts, content):
+        return {"id": str(i), "author": {"id": "a"}, "timestamp": f"2025-06-01T00:{ts}+00:00",
+                "content": content}
+    msgs = [msg(1, "00:00", "$BTC long entry 100 tp 110 sl 90"),
+            msg(2, "01:00", "BTC tp hit"),
+            msg(3, "05:00", "$ETH short entry 3200"),            # open group at the cut
+            msg(4, "05:10", "tp 3100 sl 3300"),
+            msg(5, "09:00", "Move SL to BE")]
+    export = tmp_path / "latest.json"
+    export.write_text(json.dumps({"messages": msgs}))
+    dp.process(export, tmp_path / "full.csv")
+
+    db, out = tmp_path / "state.db", tmp_path / "inc.csv"
+    offsets, read_items = [], dp.iter_json_items
+    monkeypatch.setattr(dp, "iter_json_items", lambda fh, offset: (offsets.append(offset), read_items(fh, offset))[1])
+    monkeypatch.setattr(dp, "_read_csv", lambda p: pytest.fail("the whole CSV was read back"))
+    monkeypatch.setattr(dp.seen_cache.SeenCache, "seen", lambda *a: pytest.fail("every processed id was loaded"))
+    for n in (3, 4, 5, 5):          # the last update lands on the previous run's last row
+        export.write_text(json.dumps({"messages": msgs[:n]}))
+        dp.process_incremental(export, out, db=db)
+    assert out.read_text() == (tmp_path / "full.csv").read_text()
+    assert offsets[0] == 0 and 0 < offsets[1] < offsets[2] < offsets[3]          # only the new bytes are decoded
+    assert "ETH,SHORT" in out.read_text() and "Move SL to BE" in out.read_text()
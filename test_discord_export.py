@@ -0,0 +1,41 @@
+import io
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import discord_export
+
+
+def test_iter_export_messages_matches_json_loads():
+    export = {"guild": {"id": "1"}, "channel": {"name": "x"},
+              "messages": [{"id": str(i), "content": "msg %d" % i} for i in range(500)],
+              "messageCount": 500}
+    raw = json.dumps(export).encode("utf-8") + b"\xff"      # stray byte is dropped
+    old = json.loads(raw.decode("utf-8", "ignore"))["messages"]
+    discord_export.CHUNK, chunk = 64, discord_export.CHUNK   # force many refills
+    try:
+        new = list(discord_export.iter_export_messages(io.BytesIO(raw)))
+    finally:
+        discord_export.CHUNK = chunk
+    assert new == old
+
+
+def test_iter_export_messages_without_messages():
+    assert list(discord_export.iter_export_messages(io.StringIO('{"messageCount": 0}'))) == []
+
+
+def test_iter_json_items_offsets_resume():
+    items = [{"id": str(i), "content": "🚀 café\r\n%d" % i} for i in range(50)]
+    raw = json.dumps({"messages": items}, ensure_ascii=False, indent=2).replace("\n", "\r\n").encode("utf-8")
+    discord_export.CHUNK, chunk = 64, discord_export.CHUNK
+    try:
+        pairs = list(discord_export.iter_json_items(io.BytesIO(raw)))
+        assert [p[0] for p in pairs] == items
+        for k in (0, 17, 49):
+            rest = [p[0] for p in discord_export.iter_json_items(io.BytesIO(raw), pairs[k][1])]
+            assert rest == items[k + 1:]
+    finally:
+        discord_export.CHUNK = chunk
+    assert list(discord_export.iter_json_items(io.BytesIO(b"[]"))) == []
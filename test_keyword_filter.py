@@ -0,0 +1,27 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import parserv1_2
+from keyword_filter import KeywordFilter, might_be_signal, phrases
+
+
+def test_phrase_expansion():
+    assert phrases(r"stop(?:\s*loss)?") == {"stop", "stop loss", "stoploss"}
+    assert phrases(r"t\.p\.?") == {"t.p.", "t.p"} and phrases(r"tp\d?") == {"tp"}
+    assert phrases(r"targets?") == {"target", "targets"} and phrases(r"s\b") == {"s"}
+
+
+def test_rejects_chatter_never_signals():
+    f = KeywordFilter({"SL": parserv1_2.SL_WORDS, "TP": parserv1_2.TP_WORDS,
+                       "ENTRY": parserv1_2.ENTRY_WORDS, "SIDE": parserv1_2.SIDE_WORDS})
+    assert f.missing("gm everyone, BTC looking strong today") == ["SL", "TP", "ENTRY", "SIDE"]
+    assert not f("Almost 1R up, move SL to BE")                 # no side / entry
+    for text in ("$SOL LONG\nEntry: 150\nTP1: 160 TP2: 170\nSL: 140",
+                 "ETH short | cmp 3200 | target 3100 | stoploss 3300",
+                 "long DOGE, buyzone 0.5, targets 0.6, exit if below 0.45"):
+        assert f(text) and might_be_signal(text)
+        assert all(r.search(text) for r in (parserv1_2.SIDE_RE, parserv1_2.ENTRY_RE,
+                                            parserv1_2.TP_RE, parserv1_2.SL_RE))
+    assert parserv1_2.parse_message("LONG BTC without numbers entry tp sl") is None
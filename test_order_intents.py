@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import order_intents
+from order_intents import OrderIntents, client_order_id
+
+
+def _exchange(results=None):
+    calls = []
+
+    def place_order(symbol, side, qty, price=None, client_order_id=None):
+        calls.append(client_order_id)
+        return results.pop(0) if results else {"data": {"orderId": str(len(calls))}}
+    return place_order, calls
+
+
+def test_client_order_ids_are_deterministic():
+    coid = client_order_id("1357", "entry")
+    assert coid == client_order_id(1357, "entry") != client_order_id("1357", "limit")
+    assert len(coid) <= 32 and coid.isalnum()
+
+
+def test_duplicates_never_reach_the_exchange(tmp_path):
+    db = tmp_path / "state.db"
+    place_order, calls = _exchange()
+    intents = OrderIntents(db)
+    barrier = threading.Barrier(8)
+
+    def burst():
+        barrier.wait()
+        intents.submit(place_order, "m1", "entry", "BTC-USDT", "buy", 0.01)
+    threads = [threading.Thread(target=burst) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [client_order_id("m1", "entry")] and intents.duplicates == 7
+    assert intents.submit(place_order, "m1", "limit", "BTC-USDT", "buy", 0.01, 100.0)["data"]["orderId"] == "2"
+
+    other = OrderIntents(db)                                 # another process, same state.db
+    assert other.submit(place_order, "m1", "entry", "BTC-USDT", "buy", 0.01) is None
+    assert len(calls) == 2 and other.status(client_order_id("m1", "entry")) == order_intents.PLACED
+    assert [(i["leg"], i["order_id"]) for i in other.in_flight()] == [("entry", "1"), ("limit", "2")]
+    other.filled(client_order_id("m1", "entry"))
+    assert [i["leg"] for i in other.in_flight()] == ["limit"]
+
+
+def test_failed_call_may_be_retried_with_the_same_id(tmp_path):
+    place_order, calls = _exchange([None])
+    intents = OrderIntents(tmp_path / "state.db")
+    assert intents.submit(place_order, "m2", "entry", "ETH-USDT", "sell", 1) is None
+    coid = client_order_id("m2", "entry")
+    assert intents.status(coid) == order_intents.FAILED
+
+    async def retry():
+        async def aplace(*args, **kw):
+            return place_order(*args, **kw)
+        return await intents.asubmit(aplace, "m2", "entry", "ETH-USDT", "sell", 1)
+    assert asyncio.run(retry())["data"]["orderId"] == "2"
+    assert calls == [coid, coid] and intents.get(coid)["order_id"] == "2"
+
+
+def test_listeners_hear_placements_and_fills(tmp_path):
+    place_order, calls = _exchange([{"data": {"orderId": "9"}}, None])
+    heard = []
+
+    class Listener:
+        def order_placed(self, intent):
+            heard.append(("placed", intent["leg"], intent["trader"], intent["reduce_only"]))
+            raise RuntimeError("risk store down")               # logged, the order still counts
+
+        def order_filled(self, intent, realized_pnl):
+            heard.append(("filled", intent["leg"], realized_pnl))
+    intents = OrderIntents(tmp_path / "state.db", listeners=[Listener()])
+    assert intents.submit(place_order, "m3", "entry", "BTC-USDT", "buy", 1, trader="khalil")["data"]["orderId"] == "9"
+    assert intents.submit(place_order, "m3", "limit", "BTC-USDT", "buy", 1) is None           # failed: not heard
+    intents.filled(client_order_id("m3", "entry"), -12.5)
+    assert heard == [("placed", "entry", "khalil", 0), ("filled", "entry", -12.5)]
@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from parse_cache import ParseCache
+
+SIGNAL = "$SOL LONG\nEntry: 150\nTP1: 160\nSL: 140"
+
+
+def _counting_parser():
+    calls = []
+
+    def parse(text):
+        calls.append(text)
+        return {"symbol": "SOL", "tp": [160.0]} if "SOL" in text else None
+    return parse, calls
+
+
+def test_memo_normalises_copies_and_evicts():
+    parse, calls = _counting_parser()
+    cache = ParseCache(parse, "t:1", maxsize=2)
+    first = cache(SIGNAL)
+    first["tp"].append(999)                              # callers own their result
+    assert cache("  $SOL LONG Entry: 150\n\nTP1: 160   SL: 140 ") == {"symbol": "SOL", "tp": [160.0]}
+    assert cache("gm") is None and cache("gm ") is None  # chatter is cached too
+    assert len(calls) == 2 and (cache.hits, cache.misses) == (2, 2)
+    cache("another message")                             # evicts the least recently used: SIGNAL
+    cache(SIGNAL)
+    assert len(calls) == 4
+
+
+def test_sqlite_persistence_and_version_change(tmp_path):
+    db = tmp_path / "state.db"
+    parse, calls = _counting_parser()
+    with ParseCache(parse, "t:1") as cache:
+        cache.attach(db)
+        cache(SIGNAL), cache("gm")
+    with ParseCache(parse, "t:1") as warm:
+        warm.attach(db)
+        assert warm(SIGNAL) == {"symbol": "SOL", "tp": [160.0]} and warm("gm") is None
+    assert len(calls) == 2
+    with ParseCache(parse, "t:2") as changed:           # new rules: old rows dropped, text re-parsed
+        changed.attach(db)
+        assert changed._con.execute("SELECT COUNT(*) FROM parse_cache").fetchone() == (0,)
+        changed(SIGNAL)
+    assert len(calls) == 3
@@ -0,0 +1,37 @@
+import json
+import os
+import sys
+import zipfile
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import parser_bench
+
+
+def test_trade_keys_agree_across_csv_styles():
+    a = parser_bench.trade_key({"symbol": "eth", "side": "SHORT", "entry": "3200", "tp": "[3100.0, 3000]", "sl": "3300"})
+    b = parser_bench.trade_key({"symbol": "ETH", "side": "short", "entry": "3200.0", "tp": "3100.0 | 3000.0",
+                                "sl": "3300.0", "updates": "tp1 hit"})
+    assert a == b and parser_bench.trade_key({"symbol": "ETH", "entry": "", "sl": "1"}) is None
+    got, want = Counter([a, a, ("BTC",)]), Counter([a, ("SOL",)])
+    assert parser_bench.agreement(got, want) == {"trades": 3, "baseline": 2, "matched": 1,
+                                                 "precision": 1 / 3, "recall": 0.5}
+
+
+def test_bench_runs_parsers_in_process(tmp_path):
+    msgs = [{"id": str(i), "author": {"id": "a", "name": "t"}, "timestamp": f"2025-06-01T0{i}:00:00+00:00",
+             "content": c} for i, c in enumerate(["$BTC long entry 100 tp 110 sl 90", "gm", "nice"])]
+    src = tmp_path / "Tiny.zip"
+    with zipfile.ZipFile(src, "w") as z:
+        z.writestr("export.json", json.dumps({"messages": msgs}))
+    (tmp_path / "Tiny_parsed.csv").write_text("symbol,side,entry,tp,sl,updates\nBTC,LONG,100.0,110.0,90.0,\n"
+                                              "ETH,LONG,1.0,2.0,0.5,\n")
+    rows = parser_bench.bench(["parserv1", "developerparserv2", "no_such_parser"], [src], repeat=1)
+    by_parser = {r["parser"]: r for r in rows}
+    for name in ("parserv1", "developerparserv2"):
+        r = by_parser[name]
+        assert (r["messages"], r["trades"], r["baseline"], r["matched"]) == (3, 1, 2, 1)
+        assert r["msgs_per_sec"] > 0 and r["peak_mb"] > 0
+    assert "error" in by_parser["no_such_parser"]
+    assert [t["recall"] for t in parser_bench.totals(rows)] == [0.5, 0.5]
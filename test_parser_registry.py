@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import fatty
+import parser_registry
+from parser_registry import ParserRegistry
+
+
+def _universal(text):
+    return {"symbol": "UNI", "side": "LONG", "entry": 1.0, "tp": [2.0], "sl": 0.5} if "uni" in text else None
+
+
+def test_routes_probe_and_fallback():
+    reg = ParserRegistry(_universal, channels={"1": "fatty", "2": "xvek"}, authors={"9": "fatty"})
+    assert set(reg.parsers) == {"fatty"}                        # stubs fail the probe
+    assert reg.parser_for(channel_id="2") is _universal          # routed, but only a stub
+    assert reg.parser_for(channel_id="3", author_id="4") is _universal
+
+    parse = reg.parser_for(channel_id=None, author_id="9")
+    assert parse("SHORT $SOL entry 150 tp1 140 tp2 130 stop 160") == {
+        "symbol": "SOL", "side": "SHORT", "entry": 150.0, "tp": [140.0, 130.0], "sl": 160.0}
+    assert parse("uni chatter")["symbol"] == "UNI"               # plugin miss → universal
+    assert parse("LONG $SOL entry 150 tp 160 sl 155") is None    # SL above a long entry
+
+
+def test_channel_from_path():
+    assert parser_registry.channel_from_path("x/export_1355605545775661127.json") == "1355605545775661127"
+    assert parser_registry.channel_from_path("xvek.zip") is None
+    assert fatty.extract_trade_from_message("LONG ETH/USDT entry 1.5")["coin"] == "ETH"
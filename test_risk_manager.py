@@ -3,9 +3,17 @@ import os
 import sys
 import traceback
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
 
-from core import risk_manager
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import risk_manager
+
+@pytest.fixture(autouse=True)
+def _account(tmp_path, monkeypatch):
+    # never the tracked state.db or a live balance
+    monkeypatch.setattr(risk_manager, "ACCOUNT", risk_manager.AccountState(
+        fetch_equity=lambda: 2000.0, store=risk_manager.RiskStore(tmp_path / "state.db")))
 
 def run_all_tests():
     print("[DEBUG] Starting test_risk_manager.py")
@@ -46,5 +54,22 @@ def test_staged_entry_qty():
         traceback.print_exc()
     print("[TEST] test_staged_entry_qty completed.\n")
 
+def test_account_state_caches_equity(tmp_path):
+    print("[TEST] Running test_account_state_caches_equity")
+    calls = []
+    acct = risk_manager.AccountState(fetch_equity=lambda: calls.append(1) or 2000.0, ttl=3600,
+                                     store=risk_manager.RiskStore(tmp_path / "state.db"))
+    for _ in range(100):
+        assert acct.equity() == 2000.0
+    assert len(calls) == 1
+    acct.invalidate_equity()                              # e.g. after a fill
+    acct._refreshing.join()
+    assert len(calls) == 2
+
+    acct.add_loss(12.5)
+    assert acct.add_loss(1.0) == 13.5
+    assert risk_manager.RiskStore(tmp_path / "state.db").get("daily_loss") == 13.5
+    print("[TEST] test_account_state_caches_equity completed.\n")
+
 if __name__ == "__main__":
     run_all_tests()
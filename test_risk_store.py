@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import risk_store
+
+
+def _hammer(db, n):
+    store = risk_store.RiskStore(db)
+    for _ in range(n):
+        store.add("daily_loss", 1.0)
+        store.add_exposure("fatty", "BTC", 2.0)
+    store.record_trade("fatty", "BTC")
+
+
+def test_concurrent_increments_are_not_lost(tmp_path):
+    db = tmp_path / "state.db"
+    store = risk_store.RiskStore(db)
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        list(pool.map(_hammer, [db] * 3, [200] * 3))
+    threads = [threading.Thread(target=_hammer, args=(db, 200)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.get("daily_loss") == 1200.0
+    assert store.exposure("fatty") == store.exposure("FATTY", "BTC") == 2400.0
+    assert store.trades_today("fatty") == 6 and store.trades_today() == 6
+
+
+def test_day_rollover(tmp_path):
+    now = [1_750_000_000.0]                  # 2025-06-15 UTC
+    store = risk_store.RiskStore(tmp_path / "state.db", clock=lambda: now[0])
+    store.add("daily_loss", 50.0)
+    store.record_trade("jotham")
+    now[0] += 86_400
+    assert store.get("daily_loss") == 0.0 and store.trades_today("jotham") == 0
+    store.add_exposure("jotham", "ETH", 10.0)
+    now[0] += 86_400 * (risk_store.KEEP_DAYS + 1)
+    assert store.get("daily_loss") == 0.0
+    assert store.exposure("jotham") == 10.0           # open positions carry over
+    con = store._con()
+    assert con.execute("SELECT COUNT(*) FROM risk_daily").fetchone()[0] == 0
+
+
+def test_imports_json_state_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "state.json").write_text(json.dumps({"daily_loss": 7.5}))
+    (tmp_path / "cooldown.json").write_text(json.dumps(
+        {"total_loss": 3.0, "cooldown_triggered": False, "timestamp": None,
+         "trades_today": [{"trader": "xvek", "symbol": "SOL"}]}))
+    store = risk_store.RiskStore("state.db")
+    assert store.get("daily_loss") == 7.5 and store.get("total_loss") == 3.0
+    assert store.trades_today("xvek") == 1
+    risk_store.RiskStore("state.db")
+    assert store.trades_today("xvek") == 1
+
+
+def test_stale_json_state_is_not_todays(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "state.json").write_text(json.dumps({"daily_loss": 7.5}))
+    (tmp_path / "cooldown.json").write_text(json.dumps(
+        {"total_loss": 3.0, "timestamp": "2025-07-07T10:00:00", "trades_today": [{"trader": "xvek"}]}))
+    yesterday = risk_store.time.time() - 86_400
+    os.utime(tmp_path / "state.json", (yesterday, yesterday))
+    store = risk_store.RiskStore("state.db")
+    assert store.get("daily_loss") == 0.0 and store.get("total_loss") == 0.0
+    assert store.trades_today("xvek") == 0
+
+    (tmp_path / "state.json").write_text(json.dumps({"daily_loss": 2.0, "date": risk_store.utc_day()}))
+    os.utime(tmp_path / "state.json", (yesterday, yesterday))
+    assert risk_store.RiskStore("fresh.db").get("daily_loss") == 2.0
@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import runner
+
+
+def _signal(i):
+    return {"trader": "fatty", "symbol": "ETHUSDT", "direction": "LONG", "entry": 1000 + i,
+            "stop": 990.0, "tp1": 1020, "timestamp": f"2025-06-26T22:46:{i:02d}"}
+
+
+def test_ingest_hands_on_only_appended_signals(tmp_path):
+    got = []
+    ing = runner.LiveIngestor(on_trade=got.append, db=tmp_path / "state.db")
+    latest = tmp_path / "fatty" / "latest.json"
+    latest.parent.mkdir()
+
+    latest.write_text(json.dumps([_signal(1), _signal(2)], indent=2))
+    assert ing.ingest(latest) == 2
+    latest.write_text(json.dumps([_signal(i) for i in range(1, 5)], indent=2))
+    assert ing.ingest(latest) == 2
+    assert ing.ingest(latest) == 0                      # repeated event, nothing new
+    assert [t["entry"] for t in got] == [1001, 1002, 1003, 1004]
+
+    # half-written file: the complete element is taken, the rest waits
+    full = json.dumps([_signal(i) for i in range(1, 7)], indent=2)
+    latest.write_text(full[:full.index('"2025-06-26T22:46:06"')])
+    assert ing.ingest(latest) == 1
+    latest.write_text(full)
+    assert ing.ingest(latest) == 1
+
+    # a rewritten file is re-read from the start but deduped on the processed table
+    latest.write_text(json.dumps([_signal(6), _signal(7)]))
+    assert ing.ingest(latest) == 1
+    assert [t["entry"] for t in got][-3:] == [1005, 1006, 1007]
+
+    # offsets survive a restart
+    ing2 = runner.LiveIngestor(on_trade=got.append, db=tmp_path / "state.db")
+    assert ing2.ingest(latest) == 0
+
+
+def test_updates_follow_the_latest_signal(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner.parser, "VALID_SYMBOLS", {"BTC"})
+
+    class Updates:
+        def __init__(self):
+            self.got = []
+
+        def add(self, key, text, trade=None, message_id=None):
+            self.got.append((key, text, trade["symbol"], message_id))
+    def msg(i, content):
+        return {"id": str(i), "author": {"id": "a"}, "timestamp": f"2025-06-01T00:0{i}:00+00:00", "content": content}
+    updates, got = Updates(), []
+    latest = tmp_path / "fatty" / "latest.json"
+    latest.parent.mkdir()
+    latest.write_text(json.dumps([msg(1, "$BTC long entry 100 tp 110 sl 90"), msg(2, "gm")]))
+    ing = runner.LiveIngestor(on_trade=got.append, db=tmp_path / "state.db", updates=updates)
+    assert ing.ingest(latest) == 1 and updates.got == []
+
+    latest.write_text(json.dumps([msg(1, "$BTC long entry 100 tp 110 sl 90"), msg(2, "gm"), msg(3, "TP1 hit, SL to BE")]))
+    restarted = runner.LiveIngestor(on_trade=got.append, db=tmp_path / "state.db", updates=updates)
+    assert restarted.ingest(latest) == 0                        # the signal it follows comes from the saved state
+    assert updates.got == [("1", "TP1 hit, SL to BE", "BTC", "3")] and len(got) == 1
+
+
+def test_split_signal_is_parsed_once_its_group_closes(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner.parser, "VALID_SYMBOLS", {"BTC"})
+
+    class Updates:
+        def __init__(self):
+            self.got = []
+
+        def add(self, key, text, trade=None, message_id=None):
+            self.got.append((key, text))
+    def msg(i, author, second, content):
+        return {"id": str(i), "author": {"id": author}, "timestamp": f"2025-06-01T00:00:{second:02d}+00:00",
+                "content": content}
+    start = runner.parser.isoparse("2025-06-01T00:00:00+00:00").timestamp()
+    now = [start + 5]
+    updates, got = Updates(), []
+    latest = tmp_path / "fatty" / "latest.json"
+    latest.parent.mkdir()
+    messages = [msg(1, "a", 0, "$BTC long")]
+    latest.write_text(json.dumps(messages))
+    ing = runner.LiveIngestor(on_trade=got.append, db=tmp_path / "state.db", updates=updates,
+                              clock=lambda: now[0])
+    assert ing.ingest(latest) == 0 and got == [] and updates.got == []       # group still open
+
+    messages.append(msg(2, "a", 10, "entry 100 tp 110 sl 90"))
+    latest.write_text(json.dumps(messages))
+    now[0] = start + 15
+    restarted = runner.LiveIngestor(on_trade=got.append, db=tmp_path / "state.db", updates=updates,
+                                    clock=lambda: now[0])
+    assert restarted.ingest(latest) == 0                                    # the open group survives a restart
+    now[0] = start + 60
+    assert restarted.ingest(latest) == 1                                    # closed by the clock
+    assert [(t["id"], t["symbol"], t["entry"], t["stop"], t["tp1"]) for t in got] == [("1", "BTC", 100, 90, 110)]
+    assert updates.got == []                                                # no piece went to the updates
+
+    messages += [msg(3, "b", 40, "gm"), msg(4, "a", 50, "SL to BE")]
+    latest.write_text(json.dumps(messages))
+    assert restarted.ingest(latest) == 0 and updates.got == []              # "SL to BE" may still grow
+    now[0] = start + 90
+    assert restarted.ingest(latest) == 0 and updates.got == [("1", "SL to BE")]
+    assert restarted.ingest(latest) == 0 and len(updates.got) == 1           # marked once closed
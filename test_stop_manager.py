@@ -0,0 +1,127 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import blofin_live
+from blofin_mock_server import MockBlofinServer
+from order_intents import client_order_id
+from stop_manager import StopManager
+
+
+def test_stops_amended_in_place_and_batched(monkeypatch, tmp_path):
+    srv = MockBlofinServer().start()
+    monkeypatch.setattr(blofin_live, "BASE_URL", srv.url)
+    monkeypatch.setattr(blofin_live, "AMEND_TPSL", True)
+    blofin_live.close_session()
+    try:
+        stops = StopManager(blofin_live, tmp_path / "state.db")
+        legs = stops.attach("m1", "BTC-USDT", "LONG", 3, entry=100, sl=95, tps=[110, 120, 130])
+        stops.attach("m1", "BTC-USDT", "LONG", 3, entry=100, sl=95, tps=[110, 120, 130])   # already there
+        assert sorted(legs) == ["sl", "tp1", "tp2", "tp3"] and stops.requests == 4
+        sl = srv.tpsl[legs["sl"]["tpsl_id"]]
+        assert (sl["side"], sl["size"], sl["slTriggerPrice"]) == ("SELL", "3", "95")
+        assert sl["clientOrderId"] == client_order_id("m1", "sl") and legs["tp2"]["size"] == 1
+        for i in range(2, 6):
+            stops.attach(f"m{i}", "ETH-USDT", "SHORT", 1, entry=10 * i, sl=11 * i)
+
+        before = len(srv.requests)
+        assert stops.move_sl("m1", 97) and len(srv.requests) == before + 1          # was GET + DELETE + POST
+        assert srv.requests[-1] == ("POST", "/api/v1/trade/amend-tpsl")
+        assert stops.breakeven(["m1", "m2", "m3", "m4", "m5", "nope"]) == \
+            {"m1": True, "m2": True, "m3": True, "m4": True, "m5": True, "nope": False}
+        assert srv.requests[before + 1:] == [("POST", "/api/v1/trade/batch-amend-tpsl")]
+        assert srv.tpsl[legs["sl"]["tpsl_id"]]["slTriggerPrice"] == "100"
+        assert stops.move_sls({"m2": 20}) == {"m2": True} and len(srv.requests) == before + 2   # no-op: no call
+
+        restarted = StopManager(blofin_live, tmp_path / "state.db")
+        assert restarted.sl("m5") == 50 and sorted(restarted.get("m1")) == ["sl", "tp1", "tp2", "tp3"]
+        assert restarted.detach("m1") and restarted.get("m1") == {}
+        assert len(srv.tpsl) == 4 and srv.requests[-1] == ("POST", "/api/v1/trade/cancel-tpsl")
+        del srv.tpsl[restarted.get("m2")["sl"]["tpsl_id"]]                           # triggered at the exchange
+        assert restarted.move_sls({"m2": 19, "m3": 29}) == {"m2": False, "m3": True}
+    finally:
+        blofin_live.close_session()
+        srv.shutdown()
+
+
+def test_stops_replaced_new_first_without_amend(monkeypatch, tmp_path):
+    srv = MockBlofinServer(amend_tpsl=False).start()
+    monkeypatch.setattr(blofin_live, "BASE_URL", srv.url)
+    blofin_live.close_session()
+    try:
+        stops = StopManager(blofin_live, tmp_path / "state.db")
+        for i in (1, 2, 3):
+            stops.attach(f"m{i}", "BTC-USDT", "LONG", 2, entry=100, sl=90)
+        old = stops.get("m1")["sl"]["tpsl_id"]
+
+        before = len(srv.requests)
+        assert stops.move_sl("m1", 95)                                  # not confirmed: no amend tried
+        assert srv.requests[before:] == [("POST", "/api/v1/trade/order-tpsl"), ("POST", "/api/v1/trade/cancel-tpsl")]
+        new = stops.get("m1")["sl"]["tpsl_id"]
+        assert old not in srv.tpsl and srv.tpsl[new]["slTriggerPrice"] == "95" and stops.sl("m1") == 95
+
+        monkeypatch.setattr(blofin_live, "AMEND_TPSL", True)            # confirmed, but the amend fails
+        del srv.tpsl[stops.get("m3")["sl"]["tpsl_id"]]                  # m3's stop triggered meanwhile
+        before = len(srv.requests)
+        assert stops.breakeven(["m2", "m3"]) == {"m2": True, "m3": True}
+        assert srv.requests[before:] == [("POST", "/api/v1/trade/batch-amend-tpsl"),
+                                         ("POST", "/api/v1/trade/order-tpsl"), ("POST", "/api/v1/trade/order-tpsl"),
+                                         ("POST", "/api/v1/trade/cancel-tpsl"), ("GET", "/api/v1/trade/orders-tpsl-pending")]
+        # m3's old stop is not open, so its new one stays: a stop too many beats none
+        assert sorted(t["slTriggerPrice"] for t in srv.tpsl.values()) == ["100", "100", "95"]
+        assert StopManager(blofin_live, tmp_path / "state.db").sl("m2") == 100
+    finally:
+        blofin_live.close_session()
+        srv.shutdown()
+
+
+class _LostCancel:
+    """blofin_live whose first `lost` cancel_tpsl answers never arrive; `send` says whether those got through."""
+
+    def __init__(self, send, lookup=True, lost=1):
+        self.send, self.lookup, self.lost = send, lookup, lost
+        self.cancels = []
+
+    def __getattr__(self, name):
+        return getattr(blofin_live, name)
+
+    def cancel_tpsl(self, tpsl_ids):
+        self.cancels.append(list(tpsl_ids))
+        if len(self.cancels) > self.lost:
+            return blofin_live.cancel_tpsl(tpsl_ids)
+        if self.send:
+            blofin_live.cancel_tpsl(tpsl_ids)
+        return None
+
+    def pending_tpsl(self, symbol=None):
+        return blofin_live.pending_tpsl(symbol) if self.lookup else None
+
+
+def test_unanswered_cancel_never_leaves_a_position_naked(monkeypatch, tmp_path):
+    srv = MockBlofinServer(amend_tpsl=False).start()
+    monkeypatch.setattr(blofin_live, "BASE_URL", srv.url)
+    blofin_live.close_session()
+    try:
+        book = StopManager(blofin_live, tmp_path / "state.db")
+        for i in (1, 2, 3):
+            book.attach(f"m{i}", "BTC-USDT", "LONG", 2, entry=100, sl=90)
+        old = {k: book.get(k)["sl"]["tpsl_id"] for k in ("m1", "m2", "m3")}
+
+        # cancel went through, answer lost: the old stop is gone, the new one is kept
+        assert StopManager(_LostCancel(send=True), tmp_path / "state.db").move_sl("m1", 95)
+        # cancel never arrived: the old stop is still open, so the new one is withdrawn
+        assert not StopManager(_LostCancel(send=False), tmp_path / "state.db").move_sl("m2", 95)
+        # cancel and lookup both unanswered: keep the new stop, cancel the old once more
+        blind = _LostCancel(send=False, lookup=False, lost=2)
+        assert StopManager(blind, tmp_path / "state.db").move_sl("m3", 95)
+        assert blind.cancels == [[old["m3"]], [old["m3"]]]
+
+        restarted = StopManager(blofin_live, tmp_path / "state.db")
+        assert restarted.sl("m1") == 95 and restarted.get("m1")["sl"]["tpsl_id"] in srv.tpsl
+        assert restarted.sl("m2") == 90 and restarted.get("m2")["sl"]["tpsl_id"] == old["m2"]
+        assert restarted.sl("m3") == 95 and restarted.get("m3")["sl"]["tpsl_id"] in srv.tpsl
+        assert old["m1"] not in srv.tpsl and len(srv.tpsl) == 4     # m1 new, m2 old, m3 old + new
+    finally:
+        blofin_live.close_session()
+        srv.shutdown()
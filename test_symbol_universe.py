@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import symbol_universe
+
+
+def test_index_round_trip(tmp_path):
+    idx = symbol_universe.build_index(["ETH", "BTC", "SOL", "BTC"], {"BTCUSDT": "BTC"}, ["BTC", "ETH"],
+                                      tmp_path / "symbols.idx")
+    u = symbol_universe.SymbolUniverse(idx, tmp_path / "missing.json", refresh=False)
+    assert "BTC" in u and "SOL" in u and "DOGE" not in u
+    assert sorted(u) == ["BTC", "ETH", "SOL"] and len(u) == 3
+    assert u.canonical("BTCUSDT") == "BTC" and u.canonical("BTC") is None
+    assert u.is_perp("ETH") and not u.is_perp("SOL")
+
+
+def test_rebuilds_from_symbols_json_offline(tmp_path):
+    cache = tmp_path / "symbols.json"
+    cache.write_text(json.dumps(["BTC", "PEPE"]))
+    u = symbol_universe.SymbolUniverse(tmp_path / "symbols.idx", cache, refresh=False)
+    assert u._tables is None                    # nothing read until the first lookup
+    assert "PEPE" in u and "ETH" not in u
+    assert (tmp_path / "symbols.idx").exists()
+
+
+def test_missing_everything_is_empty(tmp_path):
+    u = symbol_universe.SymbolUniverse(tmp_path / "symbols.idx", tmp_path / "symbols.json", refresh=False)
+    assert "BTC" not in u and len(u) == 0
+
+
+def test_cold_start_waits_for_the_first_build(tmp_path, monkeypatch):
+    monkeypatch.setattr(symbol_universe, "_download_symbols", lambda: ["BTC", "ETH"])
+    monkeypatch.setattr(symbol_universe, "_download_perps", lambda: ["BTC"])
+    u = symbol_universe.SymbolUniverse(tmp_path / "symbols.idx", tmp_path / "symbols.json")
+    assert "BTC" in u and u.is_perp("BTC") and "DOGE" not in u      # no index, no symbols.json: blocks once
+    assert json.loads((tmp_path / "symbols.json").read_text()) == ["BTC", "ETH"]
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import trade_format
+from trade_format import TradeWriter, read_trades
+from trade_index import TradeIndex
+
+
+def _trades(n):
+    return [{"symbol": "BTC", "side": "LONG", "entry": 100 + i, "tp": [110.0, 120.5], "sl": 95,
+             "ts": f"2025-06-01T0{i % 10}:00:00.250+01:00"} for i in range(n)]
+
+
+def test_ndjson_streams_and_holds_back_newest(tmp_path):
+    out = tmp_path / "fatty.ndjson"
+    trades = _trades(5)
+    with TradeWriter(out, row_group=2) as w:
+        for i, t in enumerate(trades):
+            w.write(t, "fatty", str(i))
+            if i == 2:
+                assert w.count == 2 and not out.exists()        # trade 2 is still open
+                t["updates"] = ["TP1 hit"]                       # an update arriving late is kept
+    rows = read_trades(out)
+    assert w.count == 5 and [r["message_id"] for r in rows] == ["0", "1", "2", "3", "4"]
+    assert rows[2]["updates"] == ["TP1 hit"] and rows[0]["updates"] == []
+    assert rows[0]["tp"] == [110.0, 120.5] and rows[0]["ts"] == "2025-05-31T23:00:00.250000+00:00"
+    assert rows[0]["trader"] == "fatty" and rows[0]["chart"] is None
+
+    with pytest.raises(RuntimeError):
+        with TradeWriter(tmp_path / "broken.ndjson") as w:
+            w.write(trades[0])
+            raise RuntimeError
+    assert list(tmp_path.iterdir()) == [out]
+
+    (tmp_path / "empty.ndjson").write_text("")                      # a trader with no signals yet
+    assert list(trade_format.read_frame(tmp_path / "empty.ndjson", ["symbol", "tp", "ts"])) == ["symbol", "tp", "ts"]
+    assert tuple(trade_format.read_frame(tmp_path / "empty.ndjson")) == trade_format.FIELDS
+
+
+def test_parquet_and_arrow_typed_columns(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    trades = _trades(5)
+    trades[1]["tp"] = "110.0 | 120.5"                           # CSV-style cells are split
+    for name in ("t.parquet", "t.arrow"):
+        with TradeWriter(tmp_path / name, row_group=2) as w:
+            for i, t in enumerate(trades):
+                w.write(t, "tyler", str(i))
+        rows = read_trades(tmp_path / name)
+        assert [r["entry"] for r in rows] == [100, 101, 102, 103, 104]
+        assert rows[1]["tp"] == [110.0, 120.5] and rows[4]["ts"] == "2025-06-01T03:00:00.250000+00:00"
+    meta = pq.ParquetFile(tmp_path / "t.parquet").metadata
+    tp_type = meta.schema.to_arrow_schema().field("tp").type
+    assert meta.num_row_groups == 3 and str(tp_type.value_type) == "double"
+    df = trade_format.read_frame(tmp_path / "t.arrow", ["symbol", "ts"])
+    assert list(df.columns) == ["symbol", "ts"] and str(df["ts"].dt.tz) == "UTC"
+
+
+def test_trade_index_reads_columnar_output(tmp_path):
+    with TradeWriter(tmp_path / "sn06.ndjson") as w:
+        for t in _trades(3):
+            w.write(t, "sn06", "1")
+    idx = TradeIndex(tmp_path, check_interval=0)
+    total, _, page = idx.query(trader="sn06", order=[("entry", "desc")])
+    assert total == 3 and page[0]["entry"] == 102 and page[0]["tp"] == [110.0, 120.5]
@@ -0,0 +1,57 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from trade_index import TradeIndex
+
+
+def _write(path, trades, mtime):
+    path.write_text(json.dumps(trades))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_filters_sort_page_and_refresh(tmp_path):
+    _write(tmp_path / "fatty_parsed.json", [
+        {"symbol": "BTC", "side": "LONG", "entry": 100, "tp": [110], "sl": 95},
+        {"symbol": "ETH", "side": "SHORT", "entry": "10", "tp": [9], "sl": None},
+        {"Trader": "Khalil", "symbol": "BTC", "side": "SHORT", "entry": 105, "tp": [100], "sl": ""},
+    ], 1_000)
+    idx = TradeIndex(tmp_path, check_interval=0)
+
+    total, matched, page = idx.query(symbol="btc")
+    assert (total, matched) == (3, 2) and [t["trader"] for t in page] == ["fatty", "Khalil"]
+    assert idx.query(missing_sl=True, side="short")[1] == 2
+    assert idx.query(trader="KHALIL", missing_sl=True)[2][0]["entry"] == 105
+    assert [t["entry"] for t in idx.query(order=[("entry", "desc")], start=1, length=1)[2]] == [100]
+    assert [t["symbol"] for t in idx.query(order=[("bogus", "desc")])[2]] == ["BTC", "ETH", "BTC"]
+
+    assert idx.refresh() == 0                                   # nothing changed
+    _write(tmp_path / "fatty_parsed.json", [{"symbol": "SOL", "side": "LONG", "entry": 1, "sl": 0.9}], 2_000)
+    _write(tmp_path / "tyler_parsed.json", [{"symbol": "SOL", "side": "LONG", "entry": 2, "sl": 1.8}], 2_000)
+    assert idx.query(symbol="sol")[:2] == (2, 2)
+    (tmp_path / "tyler_parsed.json").unlink()
+    assert idx.query()[:2] == (1, 1)
+
+
+def test_search_and_streamed_export(tmp_path):
+    _write(tmp_path / "a.json", [{"trader": "fatty", "symbol": s, "side": "LONG", "sl": 1}
+                                 for s in ("BTC", "ETH", "PEPE", "BTC", "100%")], 1_000)
+    idx = TradeIndex(tmp_path, check_interval=0)
+    assert idx.query(search="bt")[1] == 2 and idx.query(search="fat")[1] == 5
+    assert [t["symbol"] for t in idx.query(search="%")[2]] == ["100%"]      # wildcards are literal
+    assert [t["symbol"] for t in idx.iter_query(symbol="btc", batch=1)] == ["BTC", "BTC"]
+    assert len(list(idx.iter_query(batch=2))) == 5
+
+
+def test_folder_emptied_and_refilled(tmp_path):
+    _write(tmp_path / "a.json", [{"trader": "fatty", "symbol": "BTC", "side": "LONG", "sl": 1}], 1_000)
+    idx = TradeIndex(tmp_path, check_interval=0)
+    assert idx.query()[:2] == (1, 1)
+    (tmp_path / "a.json").unlink()
+    assert idx.query()[:2] == (0, 0)
+    _write(tmp_path / "b.json", [{"trader": "tyler", "symbol": "ETH", "side": "SHORT", "sl": 2}], 2_000)
+    assert idx.query(trader="tyler")[:2] == (1, 1)                # indexes are not built a second time
+    _write(tmp_path / "c.json", [{"trader": "tyler", "symbol": "SOL", "side": "LONG"}], 3_000)
+    assert idx.query(trader="tyler", missing_sl=True)[1] == 1
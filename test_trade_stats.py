@@ -0,0 +1,40 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from trade_index import TradeIndex
+from trade_stats import TradeStats
+
+
+def test_rollups_follow_file_changes(tmp_path):
+    f = tmp_path / "fatty_parsed.json"
+    f.write_text(json.dumps([
+        {"symbol": "BTC", "side": "LONG", "entry": 100, "tp": [110, 120], "sl": 95,
+         "timestamp": "2025-03-01T10:00:00+00:00", "updates": ["TP1 Here 🔥 @Notif"]},
+        {"symbol": "btc", "side": "SHORT", "entry": 100, "tp": "90 | 80", "sl": 110,
+         "timestamp": "2025-03-01T12:00:00+00:00", "updates": "TP1 UPDATED"},
+        {"symbol": "ETH", "side": "LONG", "entry": 10, "tp": [11], "sl": None,
+         "timestamp": "2025-03-02T09:00:00+00:00"},
+    ]))
+    os.utime(f, ns=(1_000, 1_000))
+    stats = TradeStats()
+    idx = TradeIndex(tmp_path, check_interval=0, listeners=[stats])
+    idx.refresh()
+
+    fatty = stats.get("trader", "FATTY")
+    assert fatty["signals"] == 3 and fatty["tp_hits"] == 1 and fatty["missing_sl"] == 1
+    assert fatty["mean_rr"] == (2.0 + 1.0) / 2                  # ETH has no SL, so no R:R
+    assert stats.get("symbol", "btc")["tp_hit_ratio"] == 0.5
+    assert stats.get("cell", "fatty|btc|2025-03-01")["signals"] == 2
+    assert set(stats.table("day")) == {"2025-03-01", "2025-03-02"}
+
+    f.write_text(json.dumps([{"symbol": "ETH", "side": "LONG", "entry": 10, "tp": [11], "sl": 9,
+                              "timestamp": "2025-03-02T09:00:00+00:00"}]))
+    os.utime(f, ns=(2_000, 2_000))
+    idx.refresh()
+    assert stats.get("symbol", "BTC") is None and stats.get("trader", "fatty")["missing_sl_rate"] == 0.0
+    f.unlink()
+    idx.refresh()
+    assert stats.table("trader") == {}
@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from trade_store import TradeStore
+
+SIGNAL = {"symbol": "btc", "side": "LONG", "entry": 100.0, "tp": [110.0, 120.0, 130.0], "sl": 95.0,
+          "ts": "2025-06-01T00:00:00+00:00"}
+
+
+def test_widens_old_tables_and_imports_legacy_rows(tmp_path):
+    db, legacy = tmp_path / "state.db", tmp_path / "db.sqlite"
+    con = sqlite3.connect(db)
+    con.execute("CREATE TABLE trades(ts INT, symbol TEXT, side TEXT, entry REAL, "
+                "tp1 REAL, tp2 REAL, sl REAL, qty_now REAL, qty_limit REAL)")
+    con.execute("INSERT INTO trades VALUES (1748736000000, 'ETH', 'SHORT', 10, 9, 8, 11, 1, 0)")
+    con.commit(); con.close()
+    con = sqlite3.connect(legacy)
+    con.execute("CREATE TABLE trades(ts INT, symbol TEXT, side TEXT, entry REAL, sl REAL, tp1 REAL, tp2 REAL, order_id TEXT)")
+    con.execute("INSERT INTO trades VALUES (1748736000000, 'SOL', 'LONG', 150, 140, 160, 170, 'A1')")
+    con.commit(); con.close()
+
+    with TradeStore(db) as store:
+        assert store.import_sqlite(legacy) == 1 and store.import_sqlite(legacy) == 1   # updated in place
+        rows = store.query(start=1748736000000, end=1748736000001)
+    assert [(r["symbol"], r["status"]) for r in rows] == [("ETH", None), ("SOL", "executed")]
+    assert rows[1]["sl"] == 140 and rows[1]["tp2"] == 170 and rows[1]["order_id"] == "A1"
+
+
+def test_batched_dedupe_and_executions(tmp_path):
+    db = tmp_path / "state.db"
+    with TradeStore(db, batch=2) as store:
+        store.add_parsed(SIGNAL, "Fatty", "m1")
+        assert not store.has("m1")                         # buffered
+        store.add_parsed(SIGNAL, "fatty", "m1")            # same message twice: stored once
+        assert store.has("m1")                             # the batch went out
+        store.add_parsed({**SIGNAL, "symbol": "ETH", "tp": "3100.0 | 3000.0"}, "khalil")
+        store.add_executed(SIGNAL, qty_now=0.2, qty_limit=0.0, order_id="o1", trader="fatty", message_id="m1")
+        store.add_executed(SIGNAL, qty_now=0.5, qty_limit=0.5, trader="fatty", message_id="m1")
+    store = TradeStore(db)
+    assert store.insert_many([SIGNAL, SIGNAL], trader="fatty") == 1          # no message id: hashed key
+    btc = store.query(symbol="BTC", trader="FATTY")
+    assert [(r["status"], r["qty_now"], r["order_id"]) for r in btc] == \
+        [("parsed", None, None), ("executed", 0.5, "o1"), ("parsed", None, None)]
+    assert (btc[0]["tp1"], btc[0]["tp2"], btc[0]["ts"]) == (110.0, 120.0, 1748736000000)
+    assert store.query(trader="khalil")[0]["tp1"] == 3100.0
+    plan = store._con().execute("EXPLAIN QUERY PLAN SELECT * FROM trades WHERE symbol = 'BTC' AND ts > 0").fetchall()
+    assert "trades_symbol_ts" in plan[0][-1]
+    store.close()
+
+
+def test_entry_fills_recorded_through_order_router(tmp_path, monkeypatch):
+    import blofin_mock
+    import order_router
+    from order_intents import OrderIntents, client_order_id
+    from stop_manager import StopManager
+    monkeypatch.chdir(tmp_path)                                 # blofin_mock logs to the cwd
+    db = tmp_path / "state.db"
+    monkeypatch.setattr(order_router, "STOPS", StopManager(blofin_mock, db))
+    store = TradeStore(db)
+    intents = OrderIntents(db, listeners=[order_router.StoreHooks(store)])
+    ids = iter(["o1", "o2", "o3"])
+    place = lambda symbol, side, qty, price=None, client_order_id=None, reduce_only=False: {"data": {"orderId": next(ids)}}
+
+    intents.submit(place, "m1", "entry", "BTC-USDT", "buy", 0.2, trader="Fatty")
+    intents.submit(place, "m1", "limit", "BTC-USDT", "buy", 0.2, 100.0, trader="Fatty")
+    intents.submit(place, "m1", "close", "BTC-USDT", "sell", 0.4, reduce_only=True)
+    order_router.STOPS.attach("m1", "BTC-USDT", "LONG", 0.4, entry=100.0, sl=95.0, tps=[110.0, 120.0])
+    for leg in ("entry", "limit", "close"):
+        intents.filled(client_order_id("m1", leg))
+    rows = store.query(status="executed")
+    assert [(r["symbol"], r["side"], r["trader"], r["message_id"]) for r in rows] == [("BTC-USDT", "LONG", "fatty", "m1")]
+    assert (rows[0]["qty_now"], rows[0]["qty_limit"], rows[0]["order_id"]) == (0.2, 0.2, "o2")
+    assert (rows[0]["entry"], rows[0]["sl"], rows[0]["tp1"], rows[0]["tp2"]) == (100.0, 95.0, 110.0, 120.0)
+    store.close()
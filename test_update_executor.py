@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import blofin_live
+import blofin_mock
+import order_router
+from blofin_mock_server import MockBlofinServer
+from order_intents import OrderIntents
+from stop_manager import StopManager
+from update_executor import UpdateExecutor, classify
+
+TRADE = {"symbol": "POPCAT", "side": "LONG", "entry": 1.0, "tp": [1.1, 1.2, 1.3], "sl": 0.9}
+
+
+def _kinds(text, trade=TRADE):
+    return [(a["action"], a.get("leg") or a.get("sl") or a.get("fraction")) for a in classify(text, trade)]
+
+
+def test_classify_updates():
+    assert _kinds("Ondo filled and up 28% tp1 taken here 2R done stops breakeven @Illusion Notif") == \
+        [("partial", "tp1"), ("move_sl", "be")]
+    assert _kinds("you can move sl be and book little bit 15% just to lockin some money") == \
+        [("partial", 0.15), ("move_sl", "be")]
+    assert _kinds("Adjust SL to 1.213 @Tyler Notif") == [("move_sl", 1.213)]
+    assert _kinds("Cancel popcat limit\nNot gonna long anything\nCancel the $POPCAT LIMIT") == [("cancel", None)]
+    assert _kinds("Tp3 taken on popcat") == [("close", None)]                    # last target: the rest goes
+    assert _kinds("$RARE SL HIT. -3% -1R") == []                                # another coin
+    assert _kinds("Fuck this coin sl smashed") == [("close", None)]
+    for text in ("Its close to 1R", "if 4h close above the trendline i will close it",
+                 "No longer closing be at any trade", "personally changing my sl to 15min close above 94267",
+                 "Entry: 0.02034\nSL: 0.02120 (4%)"):
+        assert classify(text, TRADE) == [], text
+
+    btc = {"symbol": "BTC", "side": "LONG", "entry": 63000, "tp": [65000, 66000, 67000], "sl": 62000}
+    assert _kinds("sl to 64,500", btc) == [("move_sl", 64500)]                    # thousands separator
+    assert _kinds("moved stops to 64k", btc) == [("move_sl", 64000)]
+    assert _kinds("Stops to 0,95") == [("move_sl", 0.95)]                         # decimal comma
+    assert _kinds("move pepe sl to 13244", {**TRADE, "symbol": "FWOG"}) == []     # another coin, no $
+    for text in ("close 50% here", "closing half", "Close half of the position"):
+        assert _kinds(text, btc) == [("partial", 0.5)], text
+    assert _kinds("closing 100% here", btc) == [("close", None)]
+    assert _kinds("invalidation moved to 62000", btc) == [("move_sl", 62000)]
+    assert _kinds("SL moved to 62000, invalidation below 61k", btc) == [("move_sl", 62000)]
+
+
+def test_updates_coalesced_and_dispatched(monkeypatch, tmp_path):
+    srv = MockBlofinServer().start()
+    monkeypatch.setattr(blofin_live, "BASE_URL", srv.url)
+    monkeypatch.setattr(blofin_live, "AMEND_TPSL", True)
+    blofin_live.close_session()
+    db = tmp_path / "state.db"
+    monkeypatch.setattr(order_router, "STOPS", StopManager(blofin_live, db))
+    monkeypatch.setattr(order_router, "INTENTS", OrderIntents(db))
+    monkeypatch.setattr(order_router, "place_order", blofin_live.place_order)
+    monkeypatch.setattr(order_router, "cancel_order", blofin_live.cancel_order)
+    try:
+        for key in ("m1", "m2", "m3"):
+            order_router.attach_stops(key, "POPCAT-USDT", "LONG", 3, entry=1.0, sl=0.9)
+        limit = order_router.submit_order("m3", "limit", "POPCAT-USDT", "buy", 3, 0.95)["data"]["orderId"]
+        before = len(srv.requests)
+
+        ex = UpdateExecutor(order_router, window=0.05)
+        ex.add("m1", "$POPCAT tp1 taken here", TRADE, "u1")
+        ex.add("m1", "SL to BE", TRADE, "u2")
+        ex.add("m2", "move stops breakeven", TRADE, "u3")
+        ex.add("m1", "$POPCAT tp1 taken here", TRADE, "u1")                       # repeated in the export
+        ex.add("m3", "cancel the limit", TRADE, "u4")
+        deadline = time.monotonic() + 5
+        while len(srv.requests) < before + 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        sent = srv.requests[before:]
+        assert sorted(sent) == sorted([("POST", "/api/v1/trade/order"), ("DELETE", f"/api/v1/trade/order/{limit}"),
+                                       ("POST", "/api/v1/trade/cancel-tpsl"),
+                                       ("POST", "/api/v1/trade/batch-amend-tpsl")])       # both stops, one request
+        trim = [o for o in srv.orders.values() if o.get("reduceOnly")]
+        assert [(o["side"], o["size"]) for o in trim] == [("SELL", "1.0")]
+        assert [order_router.STOPS.sl(k) for k in ("m1", "m2", "m3")] == [1.0, 1.0, None]
+
+        ex.window = 0                                                             # dispatched inside add()
+        ex.add("m1", "$POPCAT tp1 taken here", TRADE, "u1")                       # already sent: order_intents
+        ex.add("m1", "closing popcat here", TRADE, "u5")
+        closes = [o for o in srv.orders.values() if o.get("reduceOnly")]
+        assert [o["size"] for o in closes] == ["1.0", "2.0"] and order_router.STOPS.get("m1") == {}
+    finally:
+        blofin_live.close_session()
+        srv.shutdown()
+
+
+def test_closed_fraction_survives_restart_and_bad_stops_refused(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)                                                   # blofin_mock's order log
+    db = tmp_path / "state.db"
+    monkeypatch.setattr(order_router, "STOPS", StopManager(blofin_mock, db))
+    monkeypatch.setattr(order_router, "INTENTS", OrderIntents(db))
+    monkeypatch.setattr(order_router, "place_order", blofin_mock.place_order)
+    order_router.attach_stops("m1", "POPCAT-USDT", "LONG", 4, entry=1.0, sl=0.9)
+
+    def send(ex, text, uid):
+        ex.add("m1", text, TRADE, uid)
+        return [r["ok"] for r in ex.flush()]
+    ex = UpdateExecutor(order_router, window=60, price=lambda symbol: 1.2)       # flushed by hand
+    assert send(ex, "closing half", "u1") == [True]
+    assert send(ex, "sl to 1.25", "u2") == [False]                               # above the price: would fire at once
+    assert send(ex, "sl to 13244", "u3") == [False]                              # a misread, far from entry
+    assert send(ex, "sl to 1.1", "u4") == [True] and order_router.STOPS.sl("m1") == 1.1
+
+    restarted = UpdateExecutor(order_router, window=60, price=lambda symbol: None)
+    assert send(restarted, "close here", "u5") == [True]
+    closes = [i["qty"] for i in order_router.INTENTS.for_message("m1") if i["leg"].startswith("close")]
+    assert closes == [2.0, 2.0]                                                   # half, then the other half
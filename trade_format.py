@@ -0,0 +1,215 @@
+"""
+trade_format.py  –  typed, columnar parser output: Parquet, Arrow IPC, NDJSON
+---------------------------------------------------------------------------
+• one schema for parsed trades: tp is list<double> and updates list<string>
+  (no " | "-joined strings to re-split), ts a UTC timestamp, plus trader,
+  message id and chart
+• TradeWriter streams trades out in row groups of ROW_GROUP as they are
+  parsed; the newest trade is held back until the next one arrives, since
+  update messages still attach to it until then
+• written to <out>.tmp and renamed on close, so readers never see half a file
+• read_trades / read_frame load any of the formats (and the old CSV) back –
+  for the dashboard (trade_index) and backtest.py
+• Parquet / Arrow need pyarrow; NDJSON and CSV do not
+usage:
+    with TradeWriter("illusion.parquet") as w:
+        for t in trades: w.write(t, trader="illusion", message_id="1357…")
+    df = read_frame("illusion.parquet", ["symbol", "tp", "ts"])
+"""
+from __future__ import annotations
+import csv
+import json
+import os
+import pathlib
+from datetime import datetime, timezone
+
+from dateutil.parser import isoparse
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional – only the parquet / arrow formats need it
+    pa = pq = None
+
+FORMATS = ("csv", "parquet", "arrow", "ndjson")
+SUFFIXES = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow",
+            ".feather": "arrow", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+ROW_GROUP = 10_000          # trades per Parquet row group / Arrow record batch / NDJSON write
+COMPRESSION = "zstd"
+FIELDS = ("symbol", "side", "entry", "tp", "sl", "ts", "trader", "message_id", "chart", "updates")   # schema() order
+
+
+def _need_pyarrow(fmt: str):
+    if pa is None:
+        raise ImportError(f"the {fmt} format needs pyarrow (pip install pyarrow)")
+
+def schema():
+    _need_pyarrow("parquet / arrow")
+    return pa.schema([("symbol", pa.string()), ("side", pa.string()), ("entry", pa.float64()),
+                      ("tp", pa.list_(pa.float64())), ("sl", pa.float64()),
+                      ("ts", pa.timestamp("ms", tz="UTC")), ("trader", pa.string()),
+                      ("message_id", pa.string()), ("chart", pa.string()),
+                      ("updates", pa.list_(pa.string()))])
+
+def format_for(path: str|os.PathLike, default: str = "csv") -> str:
+    """Output format implied by a file name (illusion.parquet → parquet)."""
+    return SUFFIXES.get(pathlib.Path(path).suffix.lower(), default)
+
+
+# ── rows ──────────────────────────────────────────────────────
+def _float(v) -> float|None:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+def _ts(v) -> datetime|None:
+    if isinstance(v, datetime) or v is None:
+        return v
+    try:
+        return datetime.fromisoformat(v)        # Discord's format; C-fast
+    except (TypeError, ValueError):
+        pass
+    try:
+        return isoparse(str(v))
+    except ValueError:
+        return None
+
+def _split(v) -> list:
+    # CSV cells hold " | "-joined lists
+    if v is None or isinstance(v, list):
+        return v or []
+    return [s for s in str(v).split(" | ") if s]
+
+def to_row(t: dict, trader: str|None = None, message_id: str|None = None) -> dict:
+    """A parse result (or a CSV row) in schema form."""
+    return {"symbol": t.get("symbol"), "side": t.get("side"), "entry": _float(t.get("entry")),
+            "tp": [x for x in map(_float, _split(t.get("tp"))) if x is not None],
+            "sl": _float(t.get("sl")), "ts": _ts(t.get("ts")),
+            "trader": trader or t.get("trader"), "message_id": message_id or t.get("message_id"),
+            "chart": t.get("chart"), "updates": [str(u) for u in _split(t.get("updates"))]}
+
+def _json_row(row: dict) -> dict:
+    ts = row["ts"]
+    return {**row, "ts": ts.astimezone(timezone.utc).isoformat() if ts is not None else None}
+
+
+# ── writing ───────────────────────────────────────────────────
+class TradeWriter:
+    """Streams trades to a Parquet / Arrow / NDJSON file (format from fmt or the file name)."""
+
+    def __init__(self, out: str|os.PathLike, fmt: str|None = None, row_group: int = ROW_GROUP):
+        self.out = pathlib.Path(out)
+        self.fmt = fmt or format_for(self.out, "ndjson")
+        if self.fmt not in FORMATS or self.fmt == "csv":
+            raise ValueError(f"TradeWriter writes parquet, arrow or ndjson, not {self.fmt}")
+        if self.fmt != "ndjson":
+            _need_pyarrow(self.fmt)
+        self.row_group = row_group
+        self.count = 0
+        self._tmp = self.out.with_name(self.out.name + ".tmp")
+        self._pending: list[tuple[dict, str|None, str|None]] = []
+        self._sink = self._writer = self._schema = None
+        self.out.parent.mkdir(parents=True, exist_ok=True)
+        if self.fmt == "ndjson":
+            self._sink = self._tmp.open("w", encoding="utf-8", newline="\n")
+        else:
+            self._schema = schema()
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self._tmp, self._schema, compression=COMPRESSION)
+            else:
+                self._sink = pa.OSFile(str(self._tmp), "wb")
+                self._writer = pa.ipc.new_file(self._sink, self._schema)
+
+    def write(self, trade: dict, trader: str|None = None, message_id: str|None = None):
+        self._pending.append((trade, trader, message_id))
+        if len(self._pending) > self.row_group:          # keep the newest: it may still get updates
+            self._flush(self._pending[:-1])
+            del self._pending[:-1]
+
+    def _flush(self, items):
+        if not items:
+            return
+        rows = [to_row(*item) for item in items]
+        if self.fmt == "ndjson":
+            self._sink.writelines(json.dumps(_json_row(r), ensure_ascii=False) + "\n" for r in rows)
+        elif self.fmt == "parquet":
+            self._writer.write_table(pa.Table.from_pylist(rows, schema=self._schema))
+        else:
+            self._writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=self._schema))
+        self.count += len(rows)
+
+    def close(self):
+        """Write what is left and move the file into place."""
+        try:
+            self._flush(self._pending)
+            self._pending.clear()
+            self._release()
+        except BaseException:
+            self.abort()
+            raise
+        os.replace(self._tmp, self.out)
+
+    def abort(self):
+        self._pending.clear()
+        self._release()
+        self._tmp.unlink(missing_ok=True)
+
+    def _release(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# ── reading ───────────────────────────────────────────────────
+def _table(path: pathlib.Path, fmt: str, columns=None):
+    _need_pyarrow(fmt)
+    if fmt == "parquet":
+        return pq.read_table(path, columns=columns)
+    with pa.memory_map(str(path)) as src:
+        table = pa.ipc.open_file(src).read_all()
+    return table.select(columns) if columns else table
+
+def read_trades(path: str|os.PathLike) -> list[dict]:
+    """Trades from any output format as dicts: tp / updates lists, ts an ISO string."""
+    path = pathlib.Path(path)
+    fmt = format_for(path)
+    if fmt == "ndjson":
+        with path.open(encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    if fmt == "csv":
+        with path.open(newline="", encoding="utf-8") as f:
+            return [_json_row(to_row(r)) for r in csv.DictReader(f)]
+    rows = _table(path, fmt).to_pylist()
+    for r in rows:
+        if r.get("ts") is not None:
+            r["ts"] = r["ts"].astimezone(timezone.utc).isoformat()
+    return rows
+
+def read_frame(path: str|os.PathLike, columns=None):
+    """A pandas DataFrame of a Parquet / Arrow / NDJSON file (tp and updates as lists)."""
+    import pandas as pd
+    path = pathlib.Path(path)
+    fmt = format_for(path)
+    if fmt == "ndjson":
+        df = pd.read_json(path, lines=True, dtype=False)
+        if df.columns.empty:                    # no rows, so no columns either
+            df = pd.DataFrame(columns=list(columns or FIELDS))
+        if "ts" in df:
+            df["ts"] = pd.to_datetime(df["ts"], utc=True, format="ISO8601")
+        return df[columns] if columns else df
+    if fmt == "csv":
+        raise ValueError("read_frame is for the columnar formats; use pandas.read_csv")
+    return _table(path, fmt, columns).to_pandas()
@@ -0,0 +1,220 @@
+"""
+trade_index.py  –  indexed, incrementally refreshed view of parsed_results/*.json
+--------------------------------------------------------------------------------
+• reads the JSON trade lists and the parser's typed .parquet / .arrow /
+  .ndjson output (trade_format) alike
+• trades are loaded once into an in-memory SQLite table with indexes on
+  trader, symbol, side and a missing-SL flag
+• files are tracked by (mtime, size); a refresh re-reads only files that
+  changed and drops the rows of files that are gone, and runs at most once
+  per CHECK_INTERVAL, so a request costs the same however many files exist
+• query() filters, sorts and pages in SQL over the indexed columns only; each
+  trade is stored as its JSON text in the row, and only the requested page
+  is decoded – no trade dicts are held between requests
+• counts per filter are cached until the next change
+• listeners (e.g. trade_stats.TradeStats) are told which file's trades were
+  loaded or dropped, so derived views update incrementally too
+• iter_query() streams every match in id order, EXPORT_BATCH rows at a time,
+  without holding the lock between batches
+usage:
+    idx = TradeIndex("parsed_results")
+    total, matched, page = idx.query(trader="fatty", missing_sl=True, order=[("entry", "desc")])
+    for t in idx.iter_query(symbol="BTC"): ...
+"""
+from __future__ import annotations
+import itertools
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+
+import trade_format
+
+DATA_FOLDER = "parsed_results"
+PATTERNS = ("*.json", "*.parquet", "*.arrow", "*.ndjson")
+CHECK_INTERVAL = 1.0        # seconds between directory scans
+MAX_LENGTH = 1000           # largest page query() returns
+EXPORT_BATCH = 500          # rows per step of iter_query()
+
+# sortable columns (request name → SQL column)
+SORT_COLUMNS = {"trader": "trader", "symbol": "symbol", "side": "side",
+                "entry": "entry", "sl": "sl", "timestamp": "ts"}
+
+TABLE = """
+CREATE TABLE trades(
+    id INTEGER PRIMARY KEY, file TEXT NOT NULL,
+    trader TEXT COLLATE NOCASE, symbol TEXT COLLATE NOCASE, side TEXT COLLATE NOCASE,
+    entry REAL, sl REAL, missing_sl INTEGER NOT NULL, ts TEXT, doc TEXT NOT NULL
+)"""
+INDEXES = """
+CREATE INDEX trades_file ON trades(file);
+CREATE INDEX trades_trader ON trades(trader);
+CREATE INDEX trades_symbol ON trades(symbol);
+CREATE INDEX trades_side ON trades(side);
+CREATE INDEX trades_missing_sl ON trades(missing_sl);
+CREATE INDEX trades_entry ON trades(entry);
+CREATE INDEX trades_ts ON trades(ts);
+ANALYZE;
+"""
+
+
+def _num(v) -> float|None:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+def _trader(t: dict, path: pathlib.Path) -> str:
+    # older exports use "Trader"; fall back to the file name (fatty_parsed.json → fatty)
+    return str(t.get("trader") or t.get("Trader") or path.stem.split("_")[0])
+
+
+class TradeIndex:
+    """Thread-safe; one shared connection guarded by a lock (reads are short)."""
+
+    def __init__(self, folder: str|os.PathLike = DATA_FOLDER, pattern: str|tuple = PATTERNS,
+                 check_interval: float = CHECK_INTERVAL, listeners=()):
+        self.folder = pathlib.Path(folder)
+        self.listeners = list(listeners)    # file_loaded(path, trades) / file_dropped(path)
+        self.patterns = (pattern,) if isinstance(pattern, str) else tuple(pattern)
+        self.check_interval = check_interval
+        self._con = sqlite3.connect(":memory:", check_same_thread=False)
+        self._con.execute(TABLE)
+        self._files: dict[str, tuple[int, int]] = {}     # path -> (mtime_ns, size)
+        self._ids = itertools.count(1)                   # row ids follow file order
+        self._counts: dict[tuple, int] = {}
+        self._checked = None
+        self._indexed = False               # INDEXES built (after the first load, never again)
+        self._lock = threading.RLock()
+
+    # ── loading ───────────────────────────────────────────────
+    def _rows(self, path: pathlib.Path, trades: list):
+        try:
+            if path.suffix == ".json":
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            else:
+                data = trade_format.read_trades(path)
+        except (OSError, ValueError, ImportError) as e:
+            print(f"[trades] {path.name} skipped: {e}")
+            return
+        if isinstance(data, dict):
+            data = data.get("trades") or []
+        for t in data:
+            if not isinstance(t, dict):
+                continue
+            t["trader"] = _trader(t, path)
+            trades.append(t)
+            ts = t.get("timestamp") or t.get("ts")
+            yield (next(self._ids), str(path), t["trader"], t.get("symbol"), t.get("side"), _num(t.get("entry")),
+                   _num(t.get("sl")), int(not t.get("sl")), None if ts is None else str(ts),
+                   json.dumps(t, default=str))
+
+    def refresh(self, force: bool = False) -> int:
+        """Reload changed files; returns how many files were (re)loaded or dropped."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._checked is not None and now - self._checked < self.check_interval:
+                return 0
+            self._checked = now
+            current = {}
+            for p in sorted({p for pattern in self.patterns for p in self.folder.glob(pattern)}):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                current[str(p)] = (st.st_mtime_ns, st.st_size)
+            changed = [p for p, sig in current.items() if self._files.get(p) != sig]
+            gone = [p for p in self._files if p not in current]
+            if not changed and not gone:
+                return 0
+            bulk = not self._indexed        # first load: build the indexes once, afterwards
+            with self._con:
+                for p in gone + changed:
+                    self._con.execute("DELETE FROM trades WHERE file = ?", (p,))
+                loaded = {}
+                for p in changed:
+                    loaded[p] = trades = []     # for the listeners only, dropped after this refresh
+                    self._con.executemany(
+                        "INSERT INTO trades(id, file, trader, symbol, side, entry, sl, missing_sl, ts, doc) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._rows(pathlib.Path(p), trades))
+            if bulk:
+                self._con.executescript(INDEXES)
+                self._indexed = True
+            for listener in self.listeners:
+                for p in gone:
+                    listener.file_dropped(p)
+                for p, trades in loaded.items():
+                    listener.file_loaded(p, trades)
+            self._counts.clear()
+            for p in gone:
+                del self._files[p]
+            self._files.update((p, current[p]) for p in changed)
+            return len(changed) + len(gone)
+
+    # ── queries ───────────────────────────────────────────────
+    @staticmethod
+    def _where(trader=None, symbol=None, side=None, missing_sl=False, search=None) -> tuple[str, list]:
+        clauses, args = [], []
+        for col, val in (("trader", trader), ("symbol", symbol), ("side", side)):
+            if val:
+                clauses.append(f"{col} = ?")
+                args.append(val)
+        if missing_sl:
+            clauses.append("missing_sl = 1")
+        if search:
+            like = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            clauses.append("(trader LIKE ? ESCAPE '\\' OR symbol LIKE ? ESCAPE '\\' OR side LIKE ? ESCAPE '\\')")
+            args += [like] * 3
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+    def query(self, trader: str|None = None, symbol: str|None = None, side: str|None = None,
+              missing_sl: bool = False, start: int = 0, length: int = 50,
+              order: list[tuple[str, str]]|None = None, search: str|None = None) -> tuple[int, int, list[dict]]:
+        """(total trades, trades matching the filters, the requested page of them).
+
+        Filters are case-insensitive exact matches; `search` is a substring
+        of trader, symbol or side. `order` is a list of (column,
+        "asc"|"desc") over SORT_COLUMNS; ties keep file order.
+        """
+        self.refresh()
+        where, args = self._where(trader, symbol, side, missing_sl, search)
+        keys = [f"{SORT_COLUMNS[c]} {'DESC' if str(d).lower() == 'desc' else 'ASC'}"
+                for c, d in order or () if c in SORT_COLUMNS]
+        sql = f"SELECT doc FROM trades{where} ORDER BY {', '.join(keys + ['id'])} LIMIT ? OFFSET ?"
+        length = max(0, min(int(length), MAX_LENGTH))
+        with self._lock:
+            total = self._count("", [])
+            matched = self._count(where, args) if where else total
+            docs = self._con.execute(sql, args + [length, max(0, int(start))]).fetchall()
+        return total, matched, [json.loads(d) for (d,) in docs]
+
+    def iter_query(self, trader: str|None = None, symbol: str|None = None, side: str|None = None,
+                   missing_sl: bool = False, search: str|None = None, batch: int = EXPORT_BATCH):
+        """Every matching trade in file order; memory is bounded by `batch`.
+
+        Batches are keyset-paged on the row id, so a file reloaded mid-export
+        never shifts the pages; its new rows follow at the end.
+        """
+        self.refresh()
+        where, args = self._where(trader, symbol, side, missing_sl, search)
+        # walk the table in rowid order: each batch resumes where the last stopped
+        sql = f"SELECT id, doc FROM trades NOT INDEXED{where} {'AND' if where else 'WHERE'} id > ? ORDER BY id LIMIT ?"
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._con.execute(sql, args + [last, batch]).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            for _, doc in rows:
+                yield json.loads(doc)
+
+    def _count(self, where: str, args: list) -> int:
+        key = (where, *(a.lower() if isinstance(a, str) else a for a in args))
+        n = self._counts.get(key)
+        if n is None:
+            n = self._counts[key] = self._con.execute(f"SELECT COUNT(*) FROM trades{where}", args).fetchone()[0]
+        return n
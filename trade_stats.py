@@ -0,0 +1,126 @@
+"""
+trade_stats.py  –  incremental per-trader / symbol / day performance rollups
+---------------------------------------------------------------------------
+• one running sum per key: signals, TP hits, risk/reward sum and count,
+  missing SLs – kept for every trader, symbol, day and trader|symbol|day cell
+• fed by TradeIndex as files load or drop: each file's contribution is kept,
+  so a rewritten file is subtracted and re-added, never rescanned
+• reading a rollup is a dict lookup plus four divisions
+• TP hit = an update that reports a target reached ("TP1 here", "TP2 hit",
+  "profit booked"); R:R = |tp1 − entry| / |entry − sl|
+usage:
+    stats = TradeStats(); TradeIndex("parsed_results", listeners=[stats])
+    stats.get("trader", "fatty")    stats.table("symbol")
+"""
+from __future__ import annotations
+import re
+import threading
+
+DIMENSIONS = ("trader", "symbol", "day", "cell")
+TP_HIT_RGX = re.compile(r"\b(?:tp\s*\d*|target\s*\d*)\s*(?:is\s+)?(?:here|hit|reached|done|achieved|smashed)\b"
+                        r"|\bprofits?\s+booked\b", re.I)
+
+# running sums: [signals, tp_hits, rr_sum, rr_count, missing_sl]
+_N, _TP, _RR, _RR_N, _NO_SL = range(5)
+
+
+def _num(v) -> float|None:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+def _first(v):
+    if isinstance(v, list):
+        return v[0] if v else None
+    if isinstance(v, str) and "|" in v:
+        return v.split("|", 1)[0]
+    return v
+
+def risk_reward(t: dict) -> float|None:
+    entry, tp, sl = _num(t.get("entry")), _num(_first(t.get("tp"))), _num(t.get("sl"))
+    if entry is None or tp is None or not sl or entry == sl:
+        return None
+    return abs(tp - entry) / abs(entry - sl)
+
+def tp_hit(t: dict) -> bool:
+    ups = t.get("updates")
+    text = " | ".join(map(str, ups)) if isinstance(ups, list) else str(ups or "")
+    return bool(TP_HIT_RGX.search(text))
+
+def _keys(t: dict) -> tuple[str, str, str]:
+    trader = str(t.get("trader") or t.get("Trader") or "unknown").lower()
+    symbol = str(t.get("symbol") or "unknown").upper()
+    day = str(t.get("timestamp") or t.get("ts") or "")[:10] or "unknown"
+    return trader, symbol, day
+
+
+class TradeStats:
+    """Rollups kept current through file_loaded / file_dropped (TradeIndex listener)."""
+
+    def __init__(self):
+        self._sums: dict[str, dict[str, list]] = {d: {} for d in DIMENSIONS}
+        self._files: dict[str, dict[tuple[str, str], list]] = {}   # file -> its contribution
+        self._lock = threading.Lock()
+
+    # ── updates ───────────────────────────────────────────────
+    def file_loaded(self, path: str, trades: list[dict]):
+        contrib: dict[tuple[str, str], list] = {}
+        for t in trades:
+            trader, symbol, day = _keys(t)
+            rr = risk_reward(t)
+            row = (1, int(tp_hit(t)), rr or 0.0, int(rr is not None), int(not t.get("sl")))
+            for key in (("trader", trader), ("symbol", symbol), ("day", day),
+                        ("cell", f"{trader}|{symbol}|{day}")):
+                acc = contrib.get(key)
+                if acc is None:
+                    acc = contrib[key] = [0, 0, 0.0, 0, 0]
+                for i, v in enumerate(row):
+                    acc[i] += v
+        with self._lock:
+            self._apply(self._files.pop(path, {}), -1)
+            self._files[path] = contrib
+            self._apply(contrib, 1)
+
+    def file_dropped(self, path: str):
+        with self._lock:
+            self._apply(self._files.pop(path, {}), -1)
+
+    def _apply(self, contrib: dict, sign: int):
+        for (dim, key), acc in contrib.items():
+            sums = self._sums[dim]
+            cur = sums.get(key)
+            if cur is None:
+                cur = sums[key] = [0, 0, 0.0, 0, 0]
+            for i, v in enumerate(acc):
+                cur[i] += sign * v
+            if cur[_N] <= 0:
+                del sums[key]
+
+    # ── reads ─────────────────────────────────────────────────
+    @staticmethod
+    def _view(acc: list) -> dict:
+        n = acc[_N]
+        return {"signals": n, "tp_hits": acc[_TP], "tp_hit_ratio": acc[_TP] / n if n else 0.0,
+                "mean_rr": acc[_RR] / acc[_RR_N] if acc[_RR_N] else None,
+                "missing_sl": acc[_NO_SL], "missing_sl_rate": acc[_NO_SL] / n if n else 0.0}
+
+    def get(self, dim: str, key: str) -> dict|None:
+        """Rollup for one trader / symbol / day (YYYY-MM-DD) / trader|symbol|day cell."""
+        if dim not in self._sums:
+            raise KeyError(dim)
+        if dim == "cell":
+            trader, symbol, day = (key.split("|") + ["", ""])[:3]
+            key = f"{trader.lower()}|{symbol.upper()}|{day}"
+        elif dim != "day":
+            key = key.upper() if dim == "symbol" else key.lower()
+        with self._lock:
+            acc = self._sums[dim].get(key)
+            return None if acc is None else self._view(acc)
+
+    def table(self, dim: str) -> dict[str, dict]:
+        """Every rollup of one dimension, keyed by trader / symbol / day / cell."""
+        if dim not in self._sums:
+            raise KeyError(dim)
+        with self._lock:
+            return {k: self._view(acc) for k, acc in self._sums[dim].items()}
@@ -0,0 +1,267 @@
+"""
+trade_store.py  –  parsed and executed trades in state.db (WAL mode)
+-------------------------------------------------------------------
+• one trades table for both: state.db's (ts, symbol, side, entry, tp1, tp2,
+  sl, qty_now, qty_limit) plus db.sqlite's order_id and trader, message_id,
+  status ('parsed' / 'executed') and a dedupe key; an older table is widened
+  in place with ALTER TABLE, and db.sqlite's rows are imported by column name
+• writes are buffered and go out as one executemany per BATCH rows, each
+  batch a single transaction; the statements are fixed strings, so sqlite3
+  reuses the prepared statement for every row
+• (status, key) is unique: a message parsed twice (a re-run, an archive and
+  latest.json) is stored once, and an execution updates its row in place
+  (each fill sets the quantity it carries); key = message id, or a hash of
+  the trade when there is none
+• order_router records every entry fill here (order_intents listener)
+• indexes on (symbol, ts) and (trader, ts) serve the history queries
+usage:
+    with TradeStore() as store:
+        store.add_parsed(t, trader="illusion", message_id="1357…")   # buffered
+        store.add_executed(t, qty_now=0.2, qty_limit=0.0, order_id="8812", message_id="1357…")
+    TradeStore().query(symbol="BTC", start=1_746_000_000_000)
+    python trade_store.py import *_parsed.csv db.sqlite      # backfill
+    python trade_store.py query --symbol BTC --trader khalil
+"""
+from __future__ import annotations
+import argparse
+import csv
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import trade_format
+from trade_format import _float, _ts
+
+DB_PATH = "state.db"
+LEGACY_DB = "db.sqlite"
+BATCH = 500             # rows per executemany / transaction
+
+# name → type; the first nine are the original state.db table, in its order
+COLUMNS = {"ts": "INT", "symbol": "TEXT", "side": "TEXT", "entry": "REAL", "tp1": "REAL", "tp2": "REAL",
+           "sl": "REAL", "qty_now": "REAL", "qty_limit": "REAL", "trader": "TEXT", "order_id": "TEXT",
+           "message_id": "TEXT", "status": "TEXT", "key": "TEXT"}
+INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS trades_status_key ON trades(status, key);
+CREATE INDEX IF NOT EXISTS trades_symbol_ts ON trades(symbol, ts);
+CREATE INDEX IF NOT EXISTS trades_trader_ts ON trades(trader, ts);
+"""
+_FIELDS = tuple(COLUMNS)
+_INSERT_PARSED = (f"INSERT OR IGNORE INTO trades({', '.join(_FIELDS)}) "
+                  f"VALUES ({', '.join('?' * len(_FIELDS))})")
+_UPSERT_EXECUTED = (f"INSERT INTO trades({', '.join(_FIELDS)}) VALUES ({', '.join('?' * len(_FIELDS))}) "
+                    "ON CONFLICT(status, key) DO UPDATE SET qty_now = COALESCE(excluded.qty_now, qty_now), "
+                    "qty_limit = COALESCE(excluded.qty_limit, qty_limit), "
+                    "order_id = COALESCE(excluded.order_id, order_id)")
+
+
+def epoch_ms(v) -> int|None:
+    """ISO-8601 text, a datetime, or epoch seconds / ms → epoch ms."""
+    if v is None or v == "":
+        return None
+    x = None if isinstance(v, datetime) else _float(v)
+    if x is not None:
+        return int(x if x > 1e11 else x * 1000)
+    d = _ts(v)
+    if d is None:
+        return None
+    return int((d if d.tzinfo else d.replace(tzinfo=timezone.utc)).timestamp() * 1000)
+
+def trade_key(t: dict, trader: str|None = None) -> str:
+    """Dedupe key of a trade without a message id."""
+    fields = (trader or t.get("trader"), str(t.get("symbol") or "").upper(), str(t.get("side") or "").upper(),
+              _float(t.get("entry")), _float(t.get("sl")), epoch_ms(t.get("ts") or t.get("timestamp")))
+    return "h:" + hashlib.blake2b(json.dumps(fields).encode(), digest_size=10).hexdigest()
+
+def to_row(t: dict, status: str, trader: str|None = None, message_id: str|None = None,
+           qty_now: float|None = None, qty_limit: float|None = None, order_id: str|None = None) -> tuple:
+    """A parse result, CSV row or signal dict as a trades row (in COLUMNS order).
+
+    Fields are read by trade_format.to_row; signal dicts' direction / stop /
+    tp1, tp2 / timestamp stand in for side / sl / tp / ts.
+    """
+    trader = trader or t.get("trader")
+    message_id = message_id or t.get("message_id") or t.get("id")
+    tp = t.get("tp") if t.get("tp") is not None else [t.get("tp1"), t.get("tp2")]
+    r = trade_format.to_row({"symbol": t.get("symbol"), "side": t.get("side") or t.get("direction"),
+                             "entry": t.get("entry"), "tp": tp, "sl": t.get("sl") or t.get("stop")})
+    tps = r["tp"] + [None, None]
+    return (epoch_ms(t.get("ts") or t.get("timestamp")), str(r["symbol"] or "").upper() or None,
+            str(r["side"] or "").upper() or None, r["entry"], tps[0], tps[1], r["sl"],
+            qty_now, qty_limit, str(trader).lower() if trader else None, order_id,
+            str(message_id) if message_id else None, status,
+            str(message_id) if message_id else trade_key(t, trader))
+
+
+class TradeStore:
+    """Thread-safe handle; each thread gets its own connection and write buffer."""
+
+    def __init__(self, db: str|os.PathLike = DB_PATH, batch: int = BATCH):
+        self.db = str(db)
+        self.batch = batch
+        self._local = threading.local()
+        con = self._con()
+        con.execute("BEGIN IMMEDIATE")      # one process creates or widens the table
+        try:
+            have = {r[1] for r in con.execute("PRAGMA table_info(trades)")}
+            if not have:
+                con.execute(f"CREATE TABLE trades({', '.join(f'{c} {t}' for c, t in COLUMNS.items())})")
+            for col, typ in COLUMNS.items():
+                if have and col not in have:
+                    con.execute(f"ALTER TABLE trades ADD COLUMN {col} {typ}")
+            for stmt in INDEXES.split(";"):
+                if stmt.strip():
+                    con.execute(stmt)
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+
+    def _con(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            # autocommit; batches open their own transaction
+            con = sqlite3.connect(self.db, timeout=10, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+            self._local.pending = {_INSERT_PARSED: [], _UPSERT_EXECUTED: []}
+        return con
+
+    def close(self):
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            self.flush()
+            con.close()
+            self._local.con = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── writes ────────────────────────────────────────────────
+    def _write(self, sql: str, rows: list[tuple]) -> int:
+        con, n = self._con(), 0
+        for i in range(0, len(rows), self.batch):
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                n += con.executemany(sql, rows[i:i + self.batch]).rowcount
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+        return n
+
+    def _stage(self, sql: str, row: tuple):
+        self._con()
+        pending = self._local.pending[sql]
+        pending.append(row)
+        if len(pending) >= self.batch:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write this thread's buffered rows; returns how many rows changed."""
+        if getattr(self._local, "con", None) is None:
+            return 0
+        n = 0
+        for sql, rows in self._local.pending.items():
+            if rows:
+                n += self._write(sql, rows)
+                rows.clear()
+        return n
+
+    def add_parsed(self, t: dict, trader: str|None = None, message_id: str|None = None):
+        """Buffer a parsed trade; one already stored under the same key is left alone."""
+        self._stage(_INSERT_PARSED, to_row(t, "parsed", trader, message_id))
+
+    def add_executed(self, t: dict, qty_now: float|None = None, qty_limit: float|None = None,
+                     order_id: str|None = None, trader: str|None = None, message_id: str|None = None):
+        """Buffer an execution; a later one for the same key updates quantities and order id."""
+        self._stage(_UPSERT_EXECUTED, to_row(t, "executed", trader, message_id, qty_now, qty_limit, order_id))
+
+    def insert_many(self, trades, status: str = "parsed", trader: str|None = None) -> int:
+        """Bulk-load an iterable of trades now, BATCH rows per transaction; returns rows added."""
+        sql = _INSERT_PARSED if status == "parsed" else _UPSERT_EXECUTED
+        return self._write(sql, [to_row(t, status, trader) for t in trades])
+
+    # ── backfill ──────────────────────────────────────────────
+    def import_csv(self, path: str|os.PathLike, trader: str|None = None) -> int:
+        """A *_parsed.csv (trader from the file name unless given)."""
+        path = pathlib.Path(path)
+        trader = trader or path.stem.removesuffix("_parsed").lower()
+        with path.open(newline="", encoding="utf-8") as f:
+            return self.insert_many(csv.DictReader(f), "parsed", trader)
+
+    def import_sqlite(self, path: str|os.PathLike = LEGACY_DB) -> int:
+        """The trades of another database with either schema (db.sqlite's are executed orders)."""
+        src = sqlite3.connect(f"file:{pathlib.Path(path).as_posix()}?mode=ro", uri=True)
+        try:
+            cols = [r[1] for r in src.execute("PRAGMA table_info(trades)")]
+            if not cols:
+                return 0
+            rows = [dict(zip(cols, r)) for r in src.execute(f"SELECT {', '.join(cols)} FROM trades")]
+        finally:
+            src.close()
+        out = []
+        for r in rows:
+            status = r.get("status") or ("executed" if r.get("order_id") or r.get("qty_now") else "parsed")
+            out.append(to_row(r, status, r.get("trader"), r.get("message_id"), r.get("qty_now"),
+                              r.get("qty_limit"), r.get("order_id")))
+        return self._write(_UPSERT_EXECUTED, out)
+
+    # ── reads ─────────────────────────────────────────────────
+    def has(self, key: str, status: str = "parsed") -> bool:
+        """Whether a message id (or trade_key) is stored already."""
+        return self._con().execute("SELECT 1 FROM trades WHERE status = ? AND key = ?",
+                                   (status, str(key))).fetchone() is not None
+
+    def query(self, symbol: str|None = None, trader: str|None = None, status: str|None = None,
+              start: int|None = None, end: int|None = None, limit: int|None = None) -> list[dict]:
+        """Trades by symbol and / or trader in ts order; start / end are epoch ms (end exclusive)."""
+        clauses, args = [], []
+        for col, val in (("symbol", symbol and symbol.upper()), ("trader", trader and trader.lower()),
+                         ("status", status)):
+            if val:
+                clauses.append(f"{col} = ?")
+                args.append(val)
+        if start is not None:
+            clauses.append("ts >= ?")
+            args.append(start)
+        if end is not None:
+            clauses.append("ts < ?")
+            args.append(end)
+        sql = f"SELECT {', '.join(_FIELDS)} FROM trades"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(zip(_FIELDS, r)) for r in self._con().execute(sql, args)]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default=DB_PATH)
+    ap.add_argument("--batch", type=int, default=BATCH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="load *_parsed.csv files and legacy .sqlite databases")
+    imp.add_argument("paths", nargs="+")
+    q = sub.add_parser("query")
+    q.add_argument("--symbol")
+    q.add_argument("--trader")
+    q.add_argument("--status", choices=("parsed", "executed"))
+    q.add_argument("--limit", type=int, default=50)
+    a = ap.parse_args()
+    with TradeStore(a.db, a.batch) as store:
+        if a.cmd == "import":
+            for p in a.paths:
+                n = store.import_sqlite(p) if p.endswith((".sqlite", ".db")) else store.import_csv(p)
+                print(f"[OK] {p}: {n} rows added")
+        else:
+            for r in store.query(a.symbol, a.trader, a.status, limit=a.limit):
+                print(json.dumps(r))
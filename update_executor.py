@@ -0,0 +1,297 @@
+"""
+update_executor.py  –  trader follow-ups ("TP1 hit", "SL to BE", "cancel") → orders
+----------------------------------------------------------------------------------
+• classify() maps one update text to actions: move_sl (to breakeven or a
+  price), partial (a tp leg or "book 15%"), close, cancel; conditional or
+  negated sentences ("will close if 4h closes above", "no longer closing")
+  are dropped, updates naming only other coins ($PEPE, "move pepe sl")
+  give nothing; "close 50%" / "closing half" are partials, not closes
+• prices read 64,500 and 64k as 64500; a stop move more than
+  MAX_SL_DISTANCE from entry, or on the wrong side of the current price
+  (the entry when no candles are stored), is refused
+• UpdateExecutor queues actions per position (the signal's message id) and
+  dispatches after a short WINDOW, so a burst of follow-ups is coalesced:
+  cancel / close win over everything else, the last stop move wins,
+  repeated partials go out once
+• every stop move of a flush goes to the exchange as one batch amend
+  (stop_manager); closes and partials are reduce-only market orders through
+  order_router.submit_order, so a repeated update never closes twice
+• a partial for a tp leg that is attached at the exchange is left to it;
+  how much is closed already comes from the close_* intents in state.db,
+  so it survives a restart
+usage:
+    classify("tp1 taken here, stops breakeven")   # [partial tp1, move_sl be]
+    ex = UpdateExecutor()                         # order_router on first use
+    ex.add("1357…", "SL to BE", trade)            # dispatched WINDOW seconds later
+    ex.close()                                    # flush what is pending
+"""
+from __future__ import annotations
+import hashlib
+import os
+import re
+import threading
+
+from order_intents import CANCELED, FAILED, FILLED, PLACED
+from stop_manager import close_side
+from symbol_universe import UNIVERSE
+
+MOVE_SL, PARTIAL, CLOSE, CANCEL = "move_sl", "partial", "close", "cancel"
+BE = "be"               # move_sl target: the position's entry
+WINDOW = float(os.getenv("UPDATE_WINDOW", "0.25"))   # seconds actions wait for their burst to finish
+TRIM_FRACTION = 0.25    # "booked some profit" without a number
+MAX_SL_DISTANCE = 0.5   # a new stop further than this from entry (fraction) is a misread
+
+_NUM = r"[1-9]\d{0,2}(?:,\d{3})+(?:\.\d+)?|\d+(?:[.,]\d+)?|\.\d+"
+_THOUSANDS = re.compile(r"[1-9]\d{0,2}(?:,\d{3})+(?:\.\d+)?")
+_TF = r"\d+\s*(?:[hmdw]|mins?|hrs?|hours?|days?)\b"     # a timeframe: 4h, 15min …
+_CLAUSE = re.compile(r"[\n.!?;]+(?!\d)")
+_NOISE = re.compile(rf"@\w+\s+notif|\b(?:daily|weekly|candle|{_TF})\s*clos\w*"
+                    r"|\bclos\w*\s+(?:to|above|below|under|over)\b", re.I)
+_COND = re.compile(r"\b(?:if|unless|will|gonna|would)\b", re.I)
+_NEG = re.compile(r"\b(?:no\s+longer|not|never|don'?t|didn'?t|won'?t)\s+(?:\w+\s+)?"
+                  r"(?:clos|cancel|mov|book|exit|tak|trim)", re.I)
+_TICKER = re.compile(r"\$([A-Za-z]{2,10})\b")
+# a coin named without $: "move pepe sl", "pepe sl to", "taken on pepe", "cancel pepe limit"
+_BARE = re.compile(r"\b(?:move|moving|trail\w*|adjust\w*|set|put)\s+([A-Za-z]{2,10})\s+(?:sl|stops?)\b"
+                   r"|\b([A-Za-z]{2,10})\s+(?:sl|stops?)\s+(?:to|at|@|hit)\b"
+                   r"|\b(?:on|for)\s+([A-Za-z]{2,10})\b"
+                   r"|\b(?:cancel\w*|clos\w*|exit\w*)\s+([A-Za-z]{2,10})\s+(?:limit|long|short|position|trade)", re.I)
+_WORDS = frozenset("a all an and any be both by entry every first for her here his i im in it its just last me move "
+                   "my new next no not now of on one our position profit put quick rest runner same second set "
+                   "some that the their this to trade up we you your".split())
+_CANCEL = re.compile(r"\bcancel\w*\b|\binvalidated\b", re.I)
+_CLOSE = re.compile(r"\b(?:clos(?:e|ed|ing)|exit(?:ed|ing)?|full\s+tp|all\s+tps?\s+(?:hit|done|taken)|stopped\s+out)\b"
+                    r"|\b(?:sl|stop)\s*(?:hit|smash\w*)|\bhit\s+(?:the\s+)?(?:sl|stop)\b", re.I)
+_BE = re.compile(r"\b(?:sl|stops?(?:\s*loss)?)\b\W*(?:(?:to|at|is|on|in|@)\W+)?(?:be|break\W?even|entry)\b", re.I)
+_SL_PRICE = re.compile(rf"(?:\b(?:move|moving|trail\w*|new|adjust\w*)\s+(?:sl|stops?(?:\s*loss)?)\s*(?:to|at|@)?"
+                       rf"|\b(?:sl|stops?|invalidation)\s+(?:(?:moved|moving|now|is|adjusted|updated|trailed)\s+)*(?:to|@)"
+                       rf"|\binvalidation\s+(?:(?:moved|now|is)\s+)*at)"
+                       rf"\s*\$?({_NUM})(?!\d)(?:\s*(k)\b)?(?!\s*(?:[hmdw%r]|mins?|hrs?|hours?)\b)", re.I)
+_TP_HIT = re.compile(r"\btp\s*(\d)\b(?=[^.\n]{0,25}?\b(?:hit|taken|take|here|done|smash\w*|book\w*|secured|reached)\b)"
+                     r"|\b(?:hit|taken|take|booking|booked|book|secured|reached)\s+tp\s*(\d)\b", re.I)
+_TRIM = re.compile(r"\b(?:book\w*|trim\w*|take\s+(?:some\s+)?profits?|partials?|secur\w*\s+(?:some\s+)?profits?)\b", re.I)
+_PCT = re.compile(r"\b(?:book\w*|trim\w*|clos\w*|take|taking)\D{0,20}?(\d{1,2}(?:\.\d+)?)\s*%", re.I)
+_HALF = re.compile(r"\b(?:book\w*|trim\w*|clos\w*|take|taking|secur\w*)\s+(?:\w+\s+)?half\b|\bhalf\s+(?:off|out|clos\w*)\b", re.I)
+
+
+def _num(s: str, k: str|None = None) -> float:
+    # 64,500 is a thousands separator, 0,5 a decimal comma; 64k is 64000
+    v = float(s.replace(",", "") if _THOUSANDS.fullmatch(s) else s.replace(",", "."))
+    return v * 1000 if k else v
+
+def _tickers(t: str) -> set[str]:
+    found = {x.upper() for x in _TICKER.findall(t)}
+    for m in _BARE.finditer(t):
+        w = next(g for g in m.groups() if g)
+        if w.lower() not in _WORDS and w.upper() in UNIVERSE:
+            found.add(w.upper())
+    return found
+
+def _market_price(symbol: str) -> float|None:
+    """Latest close from the local candle store, or None."""
+    try:
+        from candle_store import default_store      # numpy / pandas only when a stop moves
+        return default_store().price(symbol)
+    except (ImportError, OSError, ValueError):
+        return None
+
+def classify(text: str, trade: dict|None = None) -> list[dict]:
+    """Actions one update asks for, in message order; [] when there is nothing to do.
+
+    trade (the signal the update belongs to) supplies the symbol, so updates
+    about another $ticker are ignored, and the tp count, so a partial on the
+    last target closes the rest.
+    """
+    # conditional / negated sentences ("will close if 4h closes above") are dropped
+    t = "\n".join(c for c in _CLAUSE.split(_NOISE.sub(" ", text)) if not (_COND.search(c) or _NEG.search(c)))
+    sym = str((trade or {}).get("symbol") or "").upper()
+    tickers = _tickers(t)
+    if sym and tickers and sym not in tickers:
+        return []
+    if _CANCEL.search(t):
+        return [{"action": CANCEL}]
+    pct, half = _PCT.search(t), _HALF.search(t)
+    if not (pct or half) and _CLOSE.search(t):      # "close 50%" / "closing half" are partials
+        return [{"action": CLOSE}]
+
+    actions = []
+    tps = (trade or {}).get("tp") or []
+    hit = _TP_HIT.search(t)
+    if hit:
+        n = int(hit.group(1) or hit.group(2))
+        if tps and n >= len(tps):
+            return [{"action": CLOSE}]
+        actions.append({"action": PARTIAL, "leg": f"tp{n}", "fraction": 1 / len(tps) if tps else TRIM_FRACTION})
+    elif pct or half or _TRIM.search(t):
+        fraction = _num(pct.group(1)) / 100 if pct else 0.5 if half else TRIM_FRACTION
+        actions.append({"action": PARTIAL, "leg": None, "fraction": fraction})
+
+    price = _SL_PRICE.search(t)
+    if _BE.search(t):
+        actions.append({"action": MOVE_SL, "sl": BE})
+    elif price:
+        actions.append({"action": MOVE_SL, "sl": _num(price.group(1), price.group(2))})
+    return actions
+
+def coalesce(actions: list[dict]) -> list[dict]:
+    """One position's queued actions, reduced to what still has to be sent."""
+    for final in (CANCEL, CLOSE):
+        if any(a["action"] == final for a in actions):
+            return [next(a for a in actions if a["action"] == final)]
+    out, seen, move = [], set(), None
+    for a in actions:
+        if a["action"] == MOVE_SL:
+            move = a
+        elif a["action"] == PARTIAL:
+            k = a["leg"] or a.get("id")
+            if k not in seen:
+                seen.add(k)
+                out.append(a)
+    return out + ([move] if move else [])
+
+
+class UpdateExecutor:
+    """Thread-safe; add() returns at once, a timer thread dispatches each burst."""
+
+    def __init__(self, router=None, window: float = WINDOW, price=_market_price):
+        self._router = router           # order_router, imported on first dispatch
+        self.window = window
+        self.price = price              # symbol -> current price or None, for the stop sanity check
+        self._pending: dict[str, list[dict]] = {}
+        self._lock = threading.Lock()
+        self._dispatching = threading.Lock()
+        self._timer: threading.Timer|None = None
+
+    @property
+    def router(self):
+        if self._router is None:
+            import order_router
+            self._router = order_router
+        return self._router
+
+    def add(self, key, text: str, trade: dict|None = None, message_id=None) -> list[dict]:
+        """Queue the actions of one update to position key; returns them."""
+        actions = classify(text, trade)
+        if key is None or not actions:
+            return []
+        uid = str(message_id) if message_id is not None else hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+        with self._lock:
+            self._pending.setdefault(str(key), []).extend({**a, "id": uid} for a in actions)
+            if self.window > 0 and self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if self.window <= 0:
+            self.flush()
+        return actions
+
+    def flush(self) -> list[dict]:
+        """Dispatch everything queued; returns one result dict per action sent."""
+        with self._dispatching:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            return self._dispatch(batch) if batch else []
+
+    def close(self):
+        self.flush()
+
+    # ── dispatch ──────────────────────────────────────────────
+    def _dispatch(self, batch: dict[str, list[dict]]) -> list[dict]:
+        r = self.router
+        results, moves = [], {}
+        for key, actions in batch.items():
+            if not r.STOPS.get(key) and not r.INTENTS.for_message(key):
+                print(f"[updates] {key}: no orders or stops for this signal, {len(actions)} action(s) dropped")
+            for a in coalesce(actions):
+                res = {"key": key, **a}
+                if a["action"] == MOVE_SL:
+                    sl = r.STOPS.entry(key) if a["sl"] == BE else a["sl"]
+                    if self._sane_sl(r, key, sl, a["sl"] == BE):
+                        moves[key] = sl
+                    else:
+                        res["ok"] = False
+                elif a["action"] == PARTIAL:
+                    res["ok"] = self._partial(r, key, a)
+                elif a["action"] == CLOSE:
+                    res["ok"] = self._close(r, key)
+                else:
+                    res["ok"] = self._cancel(r, key)
+                results.append(res)
+        if moves:
+            done = r.move_stops(moves)          # every stop of the burst in one request
+            for res in results:
+                if res["action"] == MOVE_SL and res["key"] in moves:
+                    res["ok"] = done.get(res["key"], False)
+        return results
+
+    def _sane_sl(self, r, key: str, sl: float|None, be: bool = False) -> bool:
+        """False for a stop that is a misread: far from entry, or beyond the current price."""
+        legs = r.STOPS.get(key)
+        if sl is None or not legs:
+            return sl is not None
+        row = next(iter(legs.values()))
+        entry, long = r.STOPS.entry(key), row["side"] in ("LONG", "BUY")
+        if entry and abs(sl / entry - 1) > MAX_SL_DISTANCE:
+            print(f"[updates] {key}: stop {sl} refused, entry {entry}")
+            return False
+        ref, what = self.price(row["symbol"]), "price"
+        if ref is None and not be:
+            ref, what = entry, "entry"          # no candles: the entry is the best guess
+        if ref and (sl >= ref if long else sl <= ref):
+            print(f"[updates] {key}: stop {sl} refused, {what} {ref}")
+            return False
+        return True
+
+    def _closed(self, r, key: str, size: float) -> float:
+        """Fraction of the position closed by partials so far (close_* intents, in state.db)."""
+        qty = sum(i["qty"] or 0.0 for i in r.INTENTS.for_message(key)
+                  if i["leg"].startswith("close_") and i["status"] not in (FAILED, CANCELED))
+        return min(1.0, qty / size) if size else 0.0
+
+    def _position(self, r, key: str) -> tuple[str, str, float]|None:
+        legs = r.STOPS.get(key)
+        if not legs:
+            return None
+        row = next(iter(legs.values()))
+        return row["symbol"], row["side"], r.STOPS.size(key)
+
+    def _partial(self, r, key: str, a: dict) -> bool:
+        pos = self._position(r, key)
+        if pos is None:
+            return False
+        if a["leg"] in r.STOPS.get(key):
+            return True                         # the exchange-side tp order takes it
+        symbol, side, size = pos
+        fraction = min(a["fraction"], 1.0 - self._closed(r, key, size))
+        if fraction <= 1e-9:
+            return False
+        leg = f"close_{a['leg'] or a['id']}"
+        return r.submit_order(key, leg, symbol, close_side(side), size * fraction, reduce_only=True) is not None
+
+    def _close(self, r, key: str) -> bool:
+        pos = self._position(r, key)
+        if pos is None:
+            return False
+        symbol, side, size = pos
+        rest = size * (1.0 - self._closed(r, key, size))
+        if rest > 1e-12 and r.submit_order(key, "close", symbol, close_side(side), rest, reduce_only=True) is None:
+            return False
+        r.STOPS.detach(key)
+        return True
+
+    def _cancel(self, r, key: str) -> bool:
+        """Cancel the signal's unfilled orders; its stops go too unless something filled."""
+        intents = r.INTENTS.for_message(key)
+        ok = True
+        for i in intents:
+            if i["status"] == PLACED and i["order_id"]:
+                if r.cancel_order(i["order_id"]) is None:
+                    ok = False
+                else:
+                    r.INTENTS.canceled(i["coid"])
+        if ok and not any(i["status"] == FILLED for i in intents):
+            r.STOPS.detach(key)
+        return ok